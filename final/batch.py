@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Run a simulation from the command line without a user interface.
+
+This script parses a definition file, runs the network for a number of
+cycles and writes the monitored signals to the console, a CSV file or a VCD
+file. It does not import wx or OpenGL, so it starts quickly and needs no
+display.
+
+Usage
+-----
+Show help: batch.py -h
+Run a simulation: batch.py [options] <file path>
+
+Options
+-------
+-n <cycles>: number of cycles to run, 10 by default.
+-s <switch>=<state>: sets a switch to 0 or 1 before running. May be repeated.
+-e <engine>: simulation engine, as for logsim.py.
+-f <format>: text (the default), csv or vcd.
+-o <output path>: file to write to. Text and CSV go to the console if it is
+                  not given. VCD output needs a file.
+-r, --seed <seed>: seeds the random start-up state of the clocks and D-types,
+                   so that runs can be repeated.
+
+Errors are written to stderr, so they never mix with the signals, and the
+exit status is non-zero.
+"""
+import contextlib
+import csv
+import getopt
+import random
+import sys
+
+from netcache import NetlistCache
+from vcd import VcdWriter
+
+usage_message = ("Usage:\n"
+                 "Show help: batch.py -h\n"
+                 "Run a simulation: batch.py [options] <file path>\n"
+                 "Options:\n"
+                 "    -n <cycles>          cycles to run, 10 by default\n"
+                 "    -s <switch>=<state>  set a switch to 0 or 1, may be "
+                 "repeated\n"
+                 "    -e <engine>          iterative, levelized, event, "
+                 "vector or generated\n"
+                 "    -f <format>          text, csv or vcd\n"
+                 "    -o <output path>     file to write the signals to\n"
+                 "    -r, --seed <seed>    seed the random start-up state")
+
+engine_names = {"iterative": "ITERATIVE", "levelized": "LEVELIZED",
+                "event": "EVENT_DRIVEN", "vector": "VECTORIZED",
+                "generated": "GENERATED"}
+
+output_formats = ["text", "csv", "vcd"]
+
+
+def print_error(message, show_usage=False):
+    """Print an error message to stderr, followed by the usage if asked.
+
+    Errors never go to stdout, where they would mix with CSV or text output.
+    """
+    if show_usage:
+        message += "\n\n" + usage_message
+    print(message, file=sys.stderr)
+
+
+def set_switches(names, devices, switch_settings):
+    """Set each switch in switch_settings, a list of "<switch>=<state>".
+
+    Return True if successful.
+    """
+    for switch_setting in switch_settings:
+        switch_name, equals, state = switch_setting.partition("=")
+        switch_id = names.query(switch_name)
+        if not equals or state not in ["0", "1"] or switch_id is None or \
+                not devices.set_switch(switch_id, int(state)):
+            print_error("Error: invalid switch setting {}".format(
+                switch_setting))
+            return False
+    return True
+
+
+def run_network(network, monitors, cycles, csv_writer=None):
+    """Run the network for cycles, recording the monitored signals.
+
+    If csv_writer is given, each cycle's signals are written to it as a row
+    instead of being recorded in the traces. Return True if successful.
+    """
+    devices = monitors.devices
+    csv_values = {devices.LOW: "0", devices.HIGH: "1", devices.RISING: "1",
+                  devices.FALLING: "0", devices.BLANK: ""}
+    monitor_list = list(monitors.monitors_dictionary)
+    for cycle in range(cycles):
+        if not network.execute_network():
+            print_error("Error: network oscillating at cycle {}".format(
+                cycle))
+            if network.oscillating_devices:
+                print_error("Oscillating devices: " +
+                            network.get_oscillating_names())
+            return False
+        if csv_writer is None:
+            monitors.record_signals()
+        else:
+            csv_writer.writerow([cycle] + [
+                csv_values[network.get_output_signal(device_id, output_id)]
+                for device_id, output_id in monitor_list])
+    return True
+
+
+def main(arg_list):
+    """Parse the command line options and run the simulation.
+
+    Return the exit status: 0 if successful, 1 if the definition file has
+    errors or the network cannot be simulated, and 2 for invalid options.
+    """
+    try:
+        options, arguments = getopt.getopt(arg_list, "hn:s:e:f:o:r:",
+                                           ["seed="])
+    except getopt.GetoptError:
+        print_error("Error: invalid command line arguments", show_usage=True)
+        return 2
+
+    cycles = 10
+    switch_settings = []
+    engine_name = "iterative"
+    output_format = "text"
+    output_path = None
+    seed = None
+    for option, value in options:
+        if option == "-h":
+            print(usage_message)
+            return 0
+        elif option == "-n":
+            if not value.isdigit():
+                print_error("Error: invalid number of cycles", show_usage=True)
+                return 2
+            cycles = int(value)
+        elif option == "-s":
+            switch_settings.append(value)
+        elif option == "-e":
+            if value not in engine_names:
+                print_error("Error: invalid engine", show_usage=True)
+                return 2
+            engine_name = value
+        elif option == "-f":
+            if value not in output_formats:
+                print_error("Error: invalid output format", show_usage=True)
+                return 2
+            output_format = value
+        elif option == "-o":
+            output_path = value
+        elif option in ["-r", "--seed"]:
+            if not value.isdigit():
+                print_error("Error: invalid seed", show_usage=True)
+                return 2
+            seed = int(value)
+
+    if len(arguments) != 1:
+        print_error("Error: one definition file path is required",
+                    show_usage=True)
+        return 2
+    if output_format == "vcd" and output_path is None:
+        print_error("Error: VCD output needs an output path", show_usage=True)
+        return 2
+
+    try:
+        [names, devices, network, monitors,
+         error_list] = NetlistCache().load_network(arguments[0])
+    except FileNotFoundError:
+        print_error("Error: cannot read {}".format(arguments[0]))
+        return 1
+    if error_list:
+        for error in error_list:
+            print_error(error)
+        return 1
+    if not network.set_engine(getattr(network, engine_names[engine_name])):
+        print_error("Error: the {} engine needs NumPy".format(engine_name))
+        return 1
+    if not set_switches(names, devices, switch_settings):
+        return 1
+    if seed is not None:
+        random.seed(seed)
+    devices.cold_startup()
+
+    try:
+        with contextlib.ExitStack() as stack:
+            if output_path is None:
+                output_file = sys.stdout
+            elif output_format != "vcd":
+                output_file = stack.enter_context(
+                    open(output_path, 'w', newline=''))
+
+            if output_format == "vcd":
+                monitors.start_vcd(VcdWriter(output_path, devices))
+                stack.callback(monitors.stop_vcd)
+                return 0 if run_network(network, monitors, cycles) else 1
+
+            if output_format == "csv":
+                csv_writer = csv.writer(output_file)
+                csv_writer.writerow(["cycle"] + [
+                    devices.get_signal_name(device_id, output_id)
+                    for device_id, output_id in monitors.monitors_dictionary])
+                return 0 if run_network(network, monitors, cycles,
+                                        csv_writer) else 1
+
+            if not run_network(network, monitors, cycles):
+                return 1
+            with contextlib.redirect_stdout(output_file):
+                monitors.display_signals()
+            return 0
+    except OSError:
+        print_error("Error: cannot write to {}".format(output_path))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark the memory used by a large network, its symbols and traces.
+
+Usage
+-----
+python benchmarks/bench_memory.py [no_of_devices] [cycles]
+"""
+import sys
+import tracemalloc
+from array import array
+
+from circuits import build_network
+import devices as devices_module
+from scanner import Symbol
+from monitors import SignalRuns
+
+
+class DictDevice:
+
+    """Device with its properties and ports stored in dictionaries.
+
+    This is how Device was stored before it had slots and PortMaps, and is
+    kept here as the baseline for comparison.
+    """
+
+    def __init__(self, device_id, port_layouts=None):
+        """Initialise device properties."""
+        self.device_id = device_id
+        self.inputs = {}
+        self.outputs = {}
+        self.device_kind = None
+        self.clock_half_period = None
+        self.clock_counter = None
+        self.switch_state = None
+        self.dtype_memory = None
+        self.waveform = None
+        self.duration = None
+        self.RC_counter = None
+        self.sig_counter = None
+
+
+class DictSymbol:
+
+    """Symbol with its properties stored in a dictionary, as a baseline."""
+
+    def __init__(self):
+        """Initialise symbol properties."""
+        self.type = None
+        self.id = None
+
+
+def measure(function):
+    """Return (result, bytes allocated) for calling function."""
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def measure_network(no_of_devices, device_class):
+    """Return the bytes per device of a network built with device_class."""
+    saved_class = devices_module.Device
+    devices_module.Device = device_class
+    try:
+        [names, devices, network, monitors], size = measure(
+            lambda: build_network(no_of_devices))
+    finally:
+        devices_module.Device = saved_class
+    return size / len(devices.devices_list)
+
+
+def measure_symbols(no_of_symbols, symbol_class):
+    """Return the bytes per symbol of a list of symbol_class objects."""
+    symbol_list, size = measure(
+        lambda: [symbol_class() for number in range(no_of_symbols)])
+    return size / len(symbol_list)
+
+
+def measure_trace(cycles, trace, half_period=1):
+    """Return the bytes per cycle of appending a signal to trace each cycle.
+
+    The signals alternate between LOW and HIGH every half_period cycles, as a
+    clock's would.
+    """
+    def record_signals():
+        for number in range(cycles):
+            trace.append((number // half_period) & 1)
+    size = measure(record_signals)[1]
+    return size / cycles
+
+
+def main(arg_list):
+    """Measure the memory per device, per symbol and per trace cycle."""
+    no_of_devices = int(arg_list[0]) if arg_list else 100000
+    cycles = int(arg_list[1]) if len(arg_list) > 1 else 1000000
+
+    print("Devices: {}".format(no_of_devices))
+    print("Network, dictionary devices: {:.0f} bytes per device".format(
+        measure_network(no_of_devices, DictDevice)))
+    print("Network, slotted devices:    {:.0f} bytes per device".format(
+        measure_network(no_of_devices, devices_module.Device)))
+    print("Symbol, dictionary: {:.0f} bytes per symbol".format(
+        measure_symbols(no_of_devices, DictSymbol)))
+    print("Symbol, slotted:    {:.0f} bytes per symbol".format(
+        measure_symbols(no_of_devices, Symbol)))
+    print("Cycles: {}".format(cycles))
+    print("Trace, list:        {:.1f} bytes per cycle".format(
+        measure_trace(cycles, [])))
+    print("Trace, array('b'):  {:.1f} bytes per cycle".format(
+        measure_trace(cycles, array('b'))))
+    print("Trace, run-length, changing every cycle: {:.2f} bytes per "
+          "cycle".format(measure_trace(cycles, SignalRuns())))
+    print("Trace, run-length, changing every 1000:  {:.3f} bytes per "
+          "cycle".format(measure_trace(cycles, SignalRuns(), 1000)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Benchmark the per-cycle cost of executing a large network.
+
+Usage
+-----
+python benchmarks/bench_network.py [no_of_devices] [cycles]
+"""
+import sys
+import timeit
+
+from circuits import build_network
+
+
+def linear_find_devices(devices, device_kind):
+    """Return device IDs of device_kind by scanning every device.
+
+    This is how Devices.find_devices worked before the per-kind index, and is
+    kept here as the baseline for comparison.
+    """
+    return [device.device_id for device in devices.devices_list
+            if device.device_kind == device_kind]
+
+
+def main(arg_list):
+    """Time device lookup and network execution for a generated circuit."""
+    no_of_devices = int(arg_list[0]) if arg_list else 10000
+    cycles = int(arg_list[1]) if len(arg_list) > 1 else 10
+    names, devices, network, monitors = build_network(no_of_devices)
+
+    kinds = [devices.CLOCK, devices.SWITCH, devices.D_TYPE, devices.SIGGEN,
+             devices.RC] + list(devices.gate_types)
+    repeats = 20
+
+    before = timeit.timeit(
+        lambda: [linear_find_devices(devices, kind) for kind in kinds],
+        number=repeats) / repeats
+    after = timeit.timeit(
+        lambda: [devices.find_devices(kind) for kind in kinds],
+        number=repeats) / repeats
+    engine_times = []
+    for engine_name in ["ITERATIVE", "LEVELIZED", "EVENT_DRIVEN",
+                        "VECTORIZED", "GENERATED"]:
+        if not network.set_engine(getattr(network, engine_name)):
+            continue  # NumPy is not installed
+        # The first cycle compiles the network, so it is not timed
+        network.execute_network()
+        cycle = timeit.timeit(network.execute_network, number=cycles) / cycles
+        engine_times.append((engine_name, cycle))
+
+    print("Devices: {}".format(len(devices.devices_list)))
+    print("find_devices per cycle, linear scan: {:.3f} ms".format(
+        before * 1000))
+    print("find_devices per cycle, kind index:  {:.3f} ms".format(
+        after * 1000))
+    for engine_name, cycle in engine_times:
+        print("execute_network per cycle, {}: {:.3f} ms".format(
+            engine_name, cycle * 1000))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Benchmark parsing a large generated definition file, and loading it from
+the netlist cache instead.
+
+Usage
+-----
+python benchmarks/bench_parser.py [no_of_devices]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from circuits import write_definition_file
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+from netcache import NetlistCache
+
+
+def parse_file(path, netlist_cache):
+    """Parse the file, save it to the cache and return the errors found."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    scanner = Scanner(path, names)
+    parser = Parser(names, devices, network, monitors, scanner)
+    parser.parse_network()
+    netlist_cache.save(scanner.file_hash, names, devices, network, monitors)
+    return scanner.error_count
+
+
+def main(arg_list):
+    """Time parsing a generated definition file."""
+    no_of_devices = int(arg_list[0]) if arg_list else 50000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "circuit.txt")
+        write_definition_file(path, no_of_devices)
+        size = os.path.getsize(path)
+        netlist_cache = NetlistCache(directory)
+        error_counts = []
+        parse_time = timeit.timeit(
+            lambda: error_counts.append(parse_file(path, netlist_cache)),
+            number=1)
+        load_time = timeit.timeit(lambda: netlist_cache.load(path),
+                                  number=1)
+
+    print("Devices: {}, file size: {:.1f} MB, errors: {}".format(
+        no_of_devices, size / 1e6, error_counts[0]))
+    print("Scan and parse: {:.3f} s".format(parse_time))
+    print("Load from the netlist cache: {:.3f} s".format(load_time))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark scanning a large generated definition file.
+
+Usage
+-----
+python benchmarks/bench_scanner.py [no_of_devices]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from circuits import write_definition_file
+from names import Names
+from scanner import Scanner
+
+
+class ReadOneScanner(Scanner):
+
+    """Scanner that reads the file one character at a time.
+
+    This is how the Scanner worked before the file was read into memory and
+    scanned by index, and is kept here as the baseline for comparison.
+    """
+
+    # Counted as each character is read, instead of worked out on demand
+    current_line = 0
+    current_character_number = 0
+
+    def __init__(self, path, names):
+        """Open the file as well as reading it."""
+        super().__init__(path, names)
+        self.input_file = open(path, 'r')
+
+    def advance(self):
+        """Advance to the next character by reading it from the file."""
+        if self.current_character == '\n':
+            self.current_line += 1
+            self.current_character_number = 0
+        if self.current_character == '\t':
+            while (self.current_character_number % 4) != 0:
+                self.current_character_number += 1
+        self.current_character = self.input_file.read(1)
+        self.current_character_number += 1
+        return self.current_character
+
+    def skip_spaces(self):
+        """Advance one character at a time until a non space character."""
+        while self.current_character.isspace():
+            self.current_character = self.advance()
+
+    def get_name(self):
+        """Return the whole word, one character at a time."""
+        name = self.current_character
+        while self.advance().isalnum():
+            name = name + self.current_character
+        return [name, self.current_character]
+
+    def get_number(self):
+        """Return the whole number, one character at a time."""
+        number = self.current_character
+        while self.advance().isdigit():
+            number = number + self.current_character
+        return [number, self.current_character]
+
+
+def scan_file(scanner_class, path):
+    """Return the number of symbols scanned from the file."""
+    scanner = scanner_class(path, Names())
+    no_of_symbols = 0
+    while scanner.get_symbol().type != scanner.EOF:
+        no_of_symbols += 1
+    return no_of_symbols
+
+
+def main(arg_list):
+    """Time scanning a generated definition file."""
+    no_of_devices = int(arg_list[0]) if arg_list else 10000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "circuit.txt")
+        write_definition_file(path, no_of_devices)
+        size = os.path.getsize(path)
+
+        before = timeit.timeit(lambda: scan_file(ReadOneScanner, path),
+                               number=1)
+        after = timeit.timeit(lambda: scan_file(Scanner, path), number=1)
+
+    print("Devices: {}, file size: {:.1f} MB".format(no_of_devices,
+                                                     size / 1e6))
+    print("Scan, read one character at a time: {:.3f} s".format(before))
+    print("Scan, whole file in memory:         {:.3f} s".format(after))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,107 @@
+"""Generate large circuits for the Logic Simulator benchmarks.
+
+Used by the benchmark scripts to build networks of a chosen size, either
+directly through the Devices and Network classes or as a definition file for
+the parser.
+
+Functions
+---------
+build_network(no_of_gates): Returns names, devices, network and monitors for a
+                            generated circuit.
+
+get_gate_inputs(number, no_of_outputs): Returns the positions of the outputs
+                                        driving a gate.
+
+write_definition_file(path, no_of_gates): Writes the same circuit as a
+                                          definition file.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from names import Names  # noqa: E402
+from devices import Devices  # noqa: E402
+from network import Network  # noqa: E402
+from monitors import Monitors  # noqa: E402
+
+
+def build_network(no_of_gates, no_of_switches=16):
+    """Return (names, devices, network, monitors) for a generated circuit.
+
+    The circuit has no_of_switches switches, one clock, and no_of_gates
+    two-input gates. Each gate takes its inputs from two earlier outputs, so
+    the circuit is acyclic and settles in a bounded number of iterations.
+    """
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    switch_ids = names.lookup(["SW" + str(i) for i in range(no_of_switches)])
+    for switch_id in switch_ids:
+        devices.make_switch(switch_id, switch_id % 2)
+    [clock_id] = names.lookup(["CLK"])
+    devices.make_clock(clock_id, 2)
+
+    gate_kinds = devices.gate_types
+    [I1, I2] = names.lookup(["I1", "I2"])
+    outputs = switch_ids + [clock_id]
+    gate_ids = names.lookup(["G" + str(i) for i in range(no_of_gates)])
+    for number, gate_id in enumerate(gate_ids):
+        devices.make_gate(gate_id, gate_kinds[number % len(gate_kinds)], 2)
+        [first_number, second_number] = get_gate_inputs(number,
+                                                        len(outputs))
+        network.make_connection(outputs[first_number], None, gate_id, I1)
+        network.make_connection(outputs[second_number], None, gate_id, I2)
+        outputs.append(gate_id)
+
+    for gate_id in gate_ids[-8:]:
+        monitors.make_monitor(gate_id, None)
+
+    return names, devices, network, monitors
+
+
+def get_gate_inputs(number, no_of_outputs):
+    """Return the positions of the outputs driving gate number."""
+    return [(number * 7) % no_of_outputs, (number * 13 + 1) % no_of_outputs]
+
+
+def write_definition_file(path, no_of_gates, no_of_switches=16):
+    """Write the circuit made by build_network as a definition file."""
+    gate_strings = ["AND", "OR", "NAND", "NOR", "XOR"]
+    output_names = ["SW" + str(i) for i in range(no_of_switches)] + ["CLK"]
+    gate_names = ["G" + str(i) for i in range(no_of_gates)]
+
+    lines = ["DEVICES ["]
+    for number, switch_name in enumerate(output_names[:-1]):
+        lines.append("    {} = SWITCH {};".format(switch_name, number % 2))
+    lines.append("    CLK = CLOCK 2;")
+    for number, gate_name in enumerate(gate_names):
+        gate_string = gate_strings[number % len(gate_strings)]
+        if gate_string == "XOR":
+            lines.append("    {} = XOR;".format(gate_name))
+        else:
+            lines.append("    {} = {} 2;".format(gate_name, gate_string))
+    lines.append("]")
+
+    lines.append("CONNECTIONS [")
+    for number, gate_name in enumerate(gate_names):
+        [first_number, second_number] = get_gate_inputs(number,
+                                                        len(output_names))
+        lines.append("    device {} {{".format(gate_name))
+        lines.append("        {} -> {}.I1;".format(output_names[first_number],
+                                                   gate_name))
+        lines.append("        {} -> {}.I2;".format(
+            output_names[second_number], gate_name))
+        lines.append("    }")
+        output_names.append(gate_name)
+    lines.append("]")
+
+    lines.append("MONITORS [")
+    lines.append("    {};".format(", ".join(gate_names[-8:])))
+    lines.append("]")
+
+    with open(path, "w") as definition_file:
+        definition_file.write("\n".join(lines) + "\n")
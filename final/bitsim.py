@@ -0,0 +1,270 @@
+"""Simulate the network for many sets of switch states at once.
+
+Used in the Logic Simulator project to run the same network with several sets
+of switch states in a single pass. Each signal is held as an integer whose
+bits are the signal levels for each set of switch states, so one evaluation of
+a gate computes every set at once.
+
+Classes
+-------
+BitSimulator - simulates a network with many sets of switch states in
+               parallel.
+"""
+import collections
+from array import array
+
+
+class BitSimulator:
+
+    """Simulate a network with many sets of switch states in parallel.
+
+    Each set of switch states is given a lane: a bit position in the integer
+    that holds every signal. Devices are evaluated in the order of the
+    network's compiled schedule, as in the levelized engine, so every lane
+    gives the same signals as running Network.execute_network with the
+    LEVELIZED engine and that lane's switch states. The devices are not
+    changed by the simulation.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+
+    Public methods
+    --------------
+    run(self, switch_settings, cycles): Runs the network for the specified
+                                        number of cycles with each set of
+                                        switch states and returns the monitor
+                                        traces of each one.
+
+    settle_loop(self, device_id_list): Evaluates the devices of a feedback
+                                       loop until they settle and returns
+                                       True if they do.
+
+    evaluate_device(self, device_id): Evaluates a device in every lane and
+                                      returns True if its outputs changed.
+    """
+
+    def __init__(self, names, devices, network, monitors):
+        """Initialise the simulation state."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+
+        # Devices of the feedback loop that did not settle in the last run
+        self.oscillating_devices = []
+
+        self.mask = 0  # one bit set for every lane
+        self.net_index = {}  # {(device_id, output_id): index in signal lists}
+        self.current = []  # signal levels of every output, one bit per lane
+        self.start = []  # signal levels at the start of the cycle
+        self.memory = {}  # {device_id: D-type memory, one bit per lane}
+        self.switch_words = {}  # {device_id: switch states, one bit per lane}
+
+    def run(self, switch_settings, cycles):
+        """Run the network for each set of switch states.
+
+        switch_settings is a list of dictionaries of {switch_id: state}, one
+        for each lane. Switches not in a dictionary keep their current state.
+        Return a list with one monitors dictionary per lane, in the format of
+        Monitors.monitors_dictionary. Return None if the network has an
+        unconnected input or oscillates, storing the devices of the
+        oscillating feedback loop in oscillating_devices.
+        """
+        devices = self.devices
+        network = self.network
+        self.oscillating_devices = []
+        if network.schedule is None:
+            network.compile_network()
+        if not network.check_network():
+            return None
+
+        lanes = len(switch_settings)
+        self.mask = (1 << lanes) - 1
+
+        self.net_index = {}
+        self.current = []
+        for device in devices.devices_list:
+            for output_id, signal in device.outputs.items():
+                self.net_index[(device.device_id, output_id)] = len(
+                    self.current)
+                if network.get_signal_level(signal) == devices.HIGH:
+                    self.current.append(self.mask)
+                else:
+                    self.current.append(0)
+
+        self.switch_words = {}
+        for switch_id in devices.find_devices(devices.SWITCH):
+            switch_state = devices.get_device(switch_id).switch_state
+            word = 0
+            for lane, switch_states in enumerate(switch_settings):
+                if switch_states.get(switch_id, switch_state) == devices.HIGH:
+                    word |= 1 << lane
+            self.switch_words[switch_id] = word
+
+        self.memory = {}
+        for device_id in devices.find_devices(devices.D_TYPE):
+            if devices.get_device(device_id).dtype_memory == devices.HIGH:
+                self.memory[device_id] = self.mask
+            else:
+                self.memory[device_id] = 0
+
+        # Clocks, RC devices and siggens are the same in every lane, so their
+        # counters are copied and stepped once per cycle
+        clocks = [[self.net_index[(device_id, None)],
+                   devices.get_device(device_id).clock_half_period,
+                   devices.get_device(device_id).clock_counter]
+                  for device_id in devices.find_devices(devices.CLOCK)]
+        rc_devices = [[self.net_index[(device_id, None)],
+                       devices.get_device(device_id).duration,
+                       devices.get_device(device_id).RC_counter]
+                      for device_id in devices.find_devices(devices.RC)]
+        siggens = [[self.net_index[(device_id, None)],
+                    devices.get_device(device_id).waveform,
+                    devices.get_device(device_id).sig_counter]
+                   for device_id in devices.find_devices(devices.SIGGEN)]
+
+        monitor_keys = list(self.monitors.monitors_dictionary)
+        traces = [collections.OrderedDict((key, array('b'))
+                                          for key in monitor_keys)
+                  for lane in range(lanes)]
+
+        for _ in range(cycles):
+            self.start = list(self.current)
+
+            for clock in clocks:
+                [index, half_period, counter] = clock
+                if counter == half_period:
+                    counter = 0
+                    self.current[index] ^= self.mask
+                clock[2] = counter + 1
+
+            for rc_device in rc_devices:
+                [index, duration, counter] = rc_device
+                if counter == duration:
+                    self.current[index] = 0
+                rc_device[2] = counter + 1
+
+            for siggen in siggens:
+                [index, waveform, counter] = siggen
+                if waveform[counter] == "1":
+                    self.current[index] = self.mask
+                else:
+                    self.current[index] = 0
+                # Siggens change level without an edge, so D-types clocked by
+                # them do not store data
+                self.start[index] = self.current[index]
+                siggen[2] = (counter + 1) % len(waveform)
+
+            for device_id_list, is_feedback_loop in network.schedule:
+                if not is_feedback_loop:
+                    self.evaluate_device(device_id_list[0])
+                    continue
+
+                if not self.settle_loop(device_id_list):
+                    self.oscillating_devices = list(device_id_list)
+                    return None
+
+            for key in monitor_keys:
+                word = self.current[self.net_index[key]]
+                for lane in range(lanes):
+                    # Bit values match the signal levels LOW (0) and HIGH (1)
+                    traces[lane][key].append((word >> lane) & 1)
+
+        return traces
+
+    def settle_loop(self, device_id_list):
+        """Evaluate the devices of a feedback loop until they settle.
+
+        The words of the loop's outputs and D-type memories are stored after
+        each iteration, so the loop is known to oscillate in some lane as soon
+        as they repeat. Return True if they settle within the network's
+        iteration limit.
+        """
+        previous_states = set()
+        loop_indices = None
+        for iteration in range(self.network.get_iteration_limit()):
+            steady_state = True
+            for device_id in device_id_list:
+                if self.evaluate_device(device_id):
+                    steady_state = False
+            if steady_state:
+                return True
+            if loop_indices is None:
+                loop_indices = [self.net_index[(device_id, output_id)]
+                                for device_id in device_id_list
+                                for output_id in self.devices.get_device(
+                                    device_id).outputs]
+            state = (tuple([self.current[index] for index in loop_indices]),
+                     tuple([self.memory.get(device_id)
+                            for device_id in device_id_list]))
+            if state in previous_states:
+                return False
+            previous_states.add(state)
+        return False
+
+    def evaluate_device(self, device_id):
+        """Evaluate a device in every lane.
+
+        Return True if any of its outputs changed.
+        """
+        devices = self.devices
+        device = devices.get_device(device_id)
+        current = self.current
+        mask = self.mask
+        input_words = {}
+        for input_id, connected_output in device.inputs.items():
+            input_words[input_id] = current[self.net_index[connected_output]]
+
+        if device.device_kind in [devices.AND, devices.NAND]:
+            word = mask
+            for input_word in input_words.values():
+                word &= input_word
+            if device.device_kind == devices.NAND:
+                word ^= mask
+            outputs = {None: word}
+
+        elif device.device_kind in [devices.OR, devices.NOR]:
+            word = 0
+            for input_word in input_words.values():
+                word |= input_word
+            if device.device_kind == devices.NOR:
+                word ^= mask
+            outputs = {None: word}
+
+        elif device.device_kind == devices.XOR:
+            word = 0
+            for input_word in input_words.values():
+                word ^= input_word
+            outputs = {None: word}
+
+        elif device.device_kind == devices.D_TYPE:
+            clock_index = self.net_index[device.inputs[devices.CLK_ID]]
+            data_index = self.net_index[device.inputs[devices.DATA_ID]]
+            rising = current[clock_index] & ~self.start[clock_index] & mask
+            # On a rising edge, store the data level from the start of the
+            # cycle, then apply SET and CLEAR
+            memory = self.memory[device_id]
+            memory = (memory & ~rising) | (self.start[data_index] & rising)
+            memory |= input_words[devices.SET_ID]
+            memory &= ~input_words[devices.CLEAR_ID] & mask
+            self.memory[device_id] = memory
+            outputs = {devices.Q_ID: memory,
+                       devices.QBAR_ID: memory ^ mask}
+
+        elif device.device_kind == devices.SWITCH:
+            outputs = {None: self.switch_words[device_id]}
+
+        else:
+            return False
+
+        changed = False
+        for output_id, word in outputs.items():
+            index = self.net_index[(device_id, output_id)]
+            if current[index] != word:
+                current[index] = word
+                changed = True
+        return changed
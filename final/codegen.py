@@ -0,0 +1,295 @@
+"""Generate and compile a Python function that simulates the network.
+
+Used in the Logic Simulator project as the GENERATED engine of the
+network.Network() class. The network is translated into the source of one
+straight-line Python function, with a local variable for each signal and an
+expression for each gate in the order of the compiled schedule.
+
+Classes
+-------
+CodeGenerator - generates, compiles and runs the cycle function.
+"""
+import collections
+
+
+class CodeGenerator:
+
+    """Generate, compile and run a Python function for the network.
+
+    The generated function, execute_cycle, runs one simulation cycle with the
+    same results as the LEVELIZED engine. Each signal is held as a local
+    variable with level LOW (0) or HIGH (1), so a gate is a single bitwise
+    expression of its input variables. Switches, gates and D-types are
+    evaluated once in the order of the network's schedule, feedback loops are
+    evaluated in a loop until their signals settle, and the settled signals
+    are written back to the devices at the end of the cycle.
+
+    Compiled functions are cached by the hash of the definition file the
+    network was parsed from, so loading the same file again reuses them. Only
+    the code_cache_size most recently used definitions are kept.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+
+    Public methods
+    --------------
+    generate_source(self): Returns the source of the cycle function.
+
+    generate_device(self, device_id, indent): Returns the source lines that
+                                              evaluate a scheduled device.
+
+    compile_network(self): Compiles the cycle function for the network.
+
+    execute_network(self): Executes all the devices in the network for one
+                           simulation cycle.
+    """
+
+    code_cache_size = 16  # number of compiled definitions kept
+
+    # code_cache stores {definition file hash: compiled code object}, least
+    # recently used first
+    code_cache = collections.OrderedDict()
+
+    def __init__(self, names, devices, network):
+        """Initialise the compiled function."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+
+        self.schedule = None  # the network schedule the function was made for
+        self.iteration_limit = None  # the network's limit when it was made
+        self.connected = False  # True if every input is connected
+        self.execute_cycle = None  # the compiled cycle function
+        self.device_list = None  # the devices passed to execute_cycle
+        self.device_numbers = {}  # {device_id: position in devices_list}
+        self.loop_ids = set()  # IDs of the devices in feedback loops
+
+        # Tables of the level each signal is at or moving to, and the level
+        # it had at the start of the cycle
+        self.signal_levels = {
+            devices.LOW: devices.LOW, devices.HIGH: devices.HIGH,
+            devices.RISING: devices.HIGH, devices.FALLING: devices.LOW}
+        self.start_levels = {
+            devices.LOW: devices.LOW, devices.HIGH: devices.HIGH,
+            devices.RISING: devices.LOW, devices.FALLING: devices.HIGH}
+
+    def get_variable(self, prefix, connected_output):
+        """Return the variable name for a signal in the generated source."""
+        (device_id, output_id) = connected_output
+        number = self.device_numbers[device_id]
+        if output_id is None:
+            return "{}{}".format(prefix, number)
+        return "{}{}_{}".format(prefix, number, output_id)
+
+    def generate_source(self):
+        """Return the source of the cycle function for the network.
+
+        execute_cycle(device_list, LEVEL, START) takes the devices in the
+        order of devices_list and the signal level tables. It returns None if
+        successful. If a feedback loop oscillates, its signals repeat or fail
+        to settle within the network's iteration limit, and the position of
+        the loop in the schedule is returned with the devices left unchanged.
+        """
+        devices = self.devices
+        network = self.network
+        if network.schedule is None:
+            network.compile_network()
+        self.device_numbers = {}
+        for device in devices.devices_list:
+            self.device_numbers[device.device_id] = len(self.device_numbers)
+
+        scheduled_ids = set(network.device_ranks)
+        self.loop_ids = set()
+        for device_id_list, is_feedback_loop in network.schedule:
+            if is_feedback_loop:
+                self.loop_ids.update(device_id_list)
+
+        # Start levels are only read by D-types
+        start_outputs = set()
+        for device_id in devices.devices_by_kind.get(devices.D_TYPE, []):
+            device = devices.get_device(device_id)
+            start_outputs.add(device.inputs[devices.CLK_ID])
+            start_outputs.add(device.inputs[devices.DATA_ID])
+
+        lines = ["def execute_cycle(device_list, LEVEL, START):"]
+        device_variables = ["d{}".format(number)
+                            for number in range(len(devices.devices_list))]
+        if device_variables:
+            lines.append("    ({},) = device_list".format(
+                ", ".join(device_variables)))
+
+        # Load the signals set before the schedule runs, and the start levels
+        for device in devices.devices_list:
+            number = self.device_numbers[device.device_id]
+            for output_id in device.outputs:
+                connected_output = (device.device_id, output_id)
+                signal = "d{}.outputs.signals[{}]".format(
+                    number, device.outputs.port_index[output_id])
+                if device.device_id not in scheduled_ids or \
+                        device.device_id in self.loop_ids:
+                    lines.append("    {} = LEVEL[{}]".format(
+                        self.get_variable("n", connected_output), signal))
+                if connected_output in start_outputs:
+                    lines.append("    {} = START[{}]".format(
+                        self.get_variable("t", connected_output), signal))
+
+        iteration_limit = network.get_iteration_limit()
+        for position, (device_id_list, is_feedback_loop) in enumerate(
+                network.schedule):
+            if not is_feedback_loop:
+                lines.extend(self.generate_device(device_id_list[0], 1))
+                continue
+
+            loop_outputs = [self.get_variable("n", (device_id, output_id))
+                            for device_id in device_id_list
+                            for output_id in devices.get_device(
+                                device_id).outputs]
+            state = "({},)".format(", ".join(loop_outputs))
+            for device_id in device_id_list:
+                if devices.get_device(device_id).device_kind == \
+                        devices.D_TYPE:
+                    number = self.device_numbers[device_id]
+                    lines.append("    m{0} = d{0}.dtype_memory".format(
+                        number))
+            lines.append("    previous_states = set()")
+            lines.append("    for iteration in range({}):".format(
+                iteration_limit))
+            lines.append("        previous = {}".format(state))
+            for device_id in device_id_list:
+                lines.extend(self.generate_device(device_id, 2))
+            lines.append("        current = {}".format(state))
+            lines.append("        if current == previous:")
+            lines.append("            break")
+            lines.append("        if current in previous_states:")
+            lines.append("            return {}".format(position))
+            lines.append("        previous_states.add(current)")
+            lines.append("    else:")
+            lines.append("        return {}".format(position))
+
+        # Write the settled signals back to the devices
+        for device in devices.devices_list:
+            number = self.device_numbers[device.device_id]
+            if device.device_kind == devices.D_TYPE:
+                lines.append("    d{0}.dtype_memory = m{0}".format(number))
+            for output_id in device.outputs:
+                lines.append("    d{}.outputs.signals[{}] = {}".format(
+                    number, device.outputs.port_index[output_id],
+                    self.get_variable("n", (device.device_id, output_id))))
+        lines.append("    return None")
+        return "\n".join(lines) + "\n"
+
+    def generate_device(self, device_id, indent):
+        """Return the source lines that evaluate a scheduled device."""
+        devices = self.devices
+        device = devices.get_device(device_id)
+        number = self.device_numbers[device_id]
+        prefix = "    " * indent
+        output = self.get_variable("n", (device_id, None))
+        inputs = [self.get_variable("n", connected_output)
+                  for connected_output in device.inputs.values()]
+
+        if device.device_kind == devices.SWITCH:
+            return ["{}{} = d{}.switch_state".format(prefix, output, number)]
+
+        elif device.device_kind in [devices.AND, devices.NAND]:
+            expression = " & ".join(inputs)
+            if device.device_kind == devices.NAND:
+                expression = "({}) ^ 1".format(expression)
+            return ["{}{} = {}".format(prefix, output, expression)]
+
+        elif device.device_kind in [devices.OR, devices.NOR]:
+            expression = " | ".join(inputs)
+            if device.device_kind == devices.NOR:
+                expression = "({}) ^ 1".format(expression)
+            return ["{}{} = {}".format(prefix, output, expression)]
+
+        elif device.device_kind == devices.XOR:
+            return ["{}{} = {}".format(prefix, output, " ^ ".join(inputs))]
+
+        # D-type: on a rising clock edge, store the data level from the start
+        # of the cycle, then apply SET and CLEAR
+        [clock, data, set_level, clear] = [
+            device.inputs[input_id] for input_id in [
+                devices.CLK_ID, devices.DATA_ID, devices.SET_ID,
+                devices.CLEAR_ID]]
+        lines = []
+        if device_id not in self.loop_ids:
+            lines.append("{0}m{1} = d{1}.dtype_memory".format(prefix, number))
+        lines.extend([
+            "{}if {} and not {}:".format(prefix,
+                                         self.get_variable("n", clock),
+                                         self.get_variable("t", clock)),
+            "{}    m{} = {}".format(prefix, number,
+                                    self.get_variable("t", data)),
+            "{}if {}:".format(prefix, self.get_variable("n", set_level)),
+            "{}    m{} = {!r}".format(prefix, number, devices.HIGH),
+            "{}if {}:".format(prefix, self.get_variable("n", clear)),
+            "{}    m{} = {!r}".format(prefix, number, devices.LOW),
+            "{}{} = m{}".format(prefix, self.get_variable(
+                "n", (device_id, devices.Q_ID)), number),
+            "{}{} = m{} ^ 1".format(prefix, self.get_variable(
+                "n", (device_id, devices.QBAR_ID)), number)])
+        return lines
+
+    def compile_network(self):
+        """Compile the cycle function for the network.
+
+        Return True if every input in the network is connected.
+        """
+        network = self.network
+        if network.schedule is None:
+            network.compile_network()
+        self.schedule = network.schedule
+        self.connected = network.check_network()
+        if not self.connected:
+            return False
+
+        # The code is only cached if its iteration limit is sized from the
+        # netlist, and so is the same whenever the file is loaded
+        self.iteration_limit = network.iteration_limit
+        definition_hash = network.definition_hash
+        if self.iteration_limit is not None:
+            definition_hash = None
+        if definition_hash in self.code_cache:
+            self.code_cache.move_to_end(definition_hash)
+            code = self.code_cache[definition_hash]
+        else:
+            code = compile(self.generate_source(), "<network>", "exec")
+            if definition_hash is not None:
+                self.code_cache[definition_hash] = code
+                while len(self.code_cache) > self.code_cache_size:
+                    self.code_cache.popitem(last=False)
+        namespace = {}
+        exec(code, namespace)
+        self.execute_cycle = namespace["execute_cycle"]
+        self.device_list = tuple(self.devices.devices_list)
+        return True
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        Return True if successful and the network does not oscillate.
+        """
+        network = self.network
+        if self.schedule is None or self.schedule is not network.schedule or \
+                self.iteration_limit != network.iteration_limit:
+            self.compile_network()
+        if not self.connected:
+            return False
+
+        network.update_clocks()
+        network.update_rc()
+        network.update_siggen()
+        network.oscillating_devices = []
+        loop_position = self.execute_cycle(self.device_list,
+                                           self.signal_levels,
+                                           self.start_levels)
+        if loop_position is not None:
+            network.oscillating_devices = list(
+                network.schedule[loop_position][0])
+            return False
+        network.steady_state = True
+        return True
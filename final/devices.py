@@ -5,10 +5,117 @@ properties.
 
 Classes
 -------
+PortMap - stores the signals of a device's ports.
 Device - stores device properties.
 Devices - makes and stores all the devices in the logic network.
 """
 import random
+from collections.abc import Mapping
+
+
+class PortMap(Mapping):
+
+    """Store the signals of a device's ports.
+
+    A PortMap is used like a dictionary of {port_id: signal}, but only keeps
+    a list of signals. The tuple of port IDs, and the dictionary of their
+    positions in the list, are interned in a layouts dictionary shared by the
+    PortMaps of one Devices instance, so that all its gates with the same
+    number of inputs share one copy. The layouts are freed with the devices.
+
+    The simulation engines read and set signals on their hot paths by
+    indexing signals with the positions in port_index, which avoids calling
+    the mapping methods. Ports are only added while a device is made, so the
+    positions and the signals list of a device do not change after that.
+
+    Parameters
+    ----------
+    layouts: dictionary of {port_ids: (port_ids, {port_id: position})} to
+             intern the port layouts in, or None for a map of its own.
+
+    Public methods
+    --------------
+    setdefault(self, port_id, signal=None): Adds the port if it is missing and
+                                            returns its signal.
+
+    values(self): Returns a list of the port signals.
+
+    items(self): Returns an iterator over (port_id, signal) pairs.
+
+    copy(self): Returns a new PortMap with the same ports and signals.
+    """
+
+    __slots__ = ("port_ids", "port_index", "signals", "layouts")
+
+    def __init__(self, layouts=None):
+        """Initialise an empty map."""
+        if layouts is None:
+            layouts = {}
+        # layouts stores {port_ids: (port_ids, {port_id: position in signals})}
+        self.layouts = layouts
+        (self.port_ids, self.port_index) = layouts.setdefault((), ((), {}))
+        self.signals = ()  # becomes a list when the first port is added
+
+    def __getitem__(self, port_id):
+        """Return the signal of the specified port."""
+        return self.signals[self.port_index[port_id]]
+
+    def __setitem__(self, port_id, signal):
+        """Set the signal of the specified port, adding the port if needed."""
+        position = self.port_index.get(port_id)
+        if position is not None:
+            self.signals[position] = signal
+            return
+        port_ids = self.port_ids + (port_id,)
+        if port_ids not in self.layouts:
+            port_index = dict(self.port_index)
+            port_index[port_id] = len(self.port_ids)
+            self.layouts[port_ids] = (port_ids, port_index)
+        (self.port_ids, self.port_index) = self.layouts[port_ids]
+        # Ports are only added while the network is built, so the list is
+        # copied to its exact size instead of growing with spare capacity
+        self.signals = [*self.signals, signal]
+
+    def __contains__(self, port_id):
+        """Return True if the map has the specified port."""
+        return port_id in self.port_index
+
+    def __iter__(self):
+        """Iterate over the port IDs in the order they were added."""
+        return iter(self.port_ids)
+
+    def __len__(self):
+        """Return the number of ports."""
+        return len(self.port_ids)
+
+    def __repr__(self):
+        """Return the map in the form of a dictionary."""
+        return "PortMap({!r})".format(dict(self.items()))
+
+    def setdefault(self, port_id, signal=None):
+        """Add the port with signal if it is missing and return its signal."""
+        if port_id not in self.port_index:
+            self[port_id] = signal
+        return self[port_id]
+
+    def values(self):
+        """Return a list of the port signals."""
+        return list(self.signals)
+
+    def items(self):
+        """Return an iterator over (port_id, signal) pairs.
+
+        Signals may be set while iterating, but ports must not be added.
+        """
+        return zip(self.port_ids, self.signals)
+
+    def copy(self):
+        """Return a new PortMap with the same ports and signals."""
+        port_map = PortMap(self.layouts)
+        port_map.port_ids = self.port_ids
+        port_map.port_index = self.port_index
+        port_map.signals = list(self.signals)
+        return port_map
 
 
 class Device:
@@ -18,23 +125,30 @@ class Device:
     Parameters
     ----------
     device_id: device ID.
+    port_layouts: dictionary the port layouts of the device are interned in,
+                  shared by the devices of a Devices instance.
 
     Public methods
     --------------
     No public methods.
     """
 
-    def __init__(self, device_id):
+    __slots__ = ("device_id", "inputs", "outputs", "device_kind",
+                 "clock_half_period", "clock_counter", "switch_state",
+                 "dtype_memory", "waveform", "duration", "RC_counter",
+                 "sig_counter")
+
+    def __init__(self, device_id, port_layouts=None):
         """Initialise device properties."""
 
         self.device_id = device_id
 
-        # inputs dictionary stores
+        # inputs stores
         # {input_id: (connected_output_device_id, connected_output_port_id)}
-        self.inputs = {}
+        self.inputs = PortMap(port_layouts)
 
-        # outputs dictionary stores {output_id: output_signal}
-        self.outputs = {}
+        # outputs stores {output_id: output_signal}
+        self.outputs = PortMap(port_layouts)
 
         self.device_kind = None
         self.clock_half_period = None
@@ -52,7 +166,9 @@ class Devices:
     """Make and store devices.
 
     This class contains many functions for making devices and ports.
-    It stores all the devices in a list.
+    It stores all the devices in a dictionary indexed by device ID, and keeps
+    an ordered list of them for iteration, along with the IDs of the devices
+    of each kind.
 
     Parameters
     ----------
@@ -112,8 +228,17 @@ class Devices:
 
         self.names = names
 
+        # devices_dictionary stores {device_id: Device}, devices_list keeps
+        # the devices in the order they were added
+        self.devices_dictionary = {}
         self.devices_list = []
 
+        # devices_by_kind stores {device_kind: [device_id, ...]}
+        self.devices_by_kind = {}
+
+        # Port layouts shared by the PortMaps of these devices
+        self.port_layouts = {}
+
         gate_strings = ["AND", "OR", "NAND", "NOR", "XOR"]
         device_strings = ["CLOCK", "SWITCH", "DTYPE", "RC", "SIGGEN"]
         dtype_inputs = ["CLK", "SET", "CLEAR", "DATA"]
@@ -138,11 +263,11 @@ class Devices:
         self.max_gate_inputs = 16
 
     def get_device(self, device_id):
-        """Return the Device object corresponding to device_id."""
-        for device in self.devices_list:
-            if device.device_id == device_id:
-                return device
-        return None
+        """Return the Device object corresponding to device_id.
+
+        Return None if there is no such device.
+        """
+        return self.devices_dictionary.get(device_id)
 
     def find_devices(self, device_kind=None):
         """Return a list of device IDs of the specified device_kind.
@@ -150,19 +275,22 @@ class Devices:
         Return a list of all device IDs in the network if no device_kind is
         specified.
         """
-        device_id_list = []
-        for device in self.devices_list:
-            if device_kind is None:
-                device_id_list.append(device.device_id)
-            elif device.device_kind == device_kind:
-                device_id_list.append(device.device_id)
-        return device_id_list
+        if device_kind is None:
+            return list(self.devices_dictionary)
+        return list(self.devices_by_kind.get(device_kind, []))
 
     def add_device(self, device_id, device_kind):
-        """Add the specified device to the network."""
-        new_device = Device(device_id)
+        """Add the specified device to the network.
+
+        If a device with the same ID already exists, it is left unchanged.
+        """
+        if device_id in self.devices_dictionary:
+            return
+        new_device = Device(device_id, self.port_layouts)
         new_device.device_kind = device_kind
+        self.devices_dictionary[device_id] = new_device
         self.devices_list.append(new_device)
+        self.devices_by_kind.setdefault(device_kind, []).append(device_id)
 
     def add_input(self, device_id, input_id):
         """Add the specified input to the specified device.
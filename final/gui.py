@@ -12,16 +12,15 @@ Gui - configures the main window and all the widgets.
 import wx
 import wx.glcanvas as wxcanvas
 import ntpath
+import itertools
 import math
 import time
-from OpenGL import GL, GLUT
+from OpenGL import GL
 
-from names import Names
-from devices import Devices
-from network import Network
-from monitors import Monitors
-from scanner import Scanner
-from parse import Parser
+from netcache import NetlistCache
+from textatlas import TextAtlas
+from tracegeometry import TraceGeometry
+from worker import SimulationWorker
 
 
 class MyGLCanvas(wxcanvas.GLCanvas):
@@ -44,6 +43,13 @@ class MyGLCanvas(wxcanvas.GLCanvas):
     on_paint(self, event): Handles the paint event.
     on_size(self, event): Handles the canvas resize event.
     on_mouse(self, event): Handles mouse events.
+    update_trace_buffers(self): Uploads the changed trace vertices to
+                                vertex buffers.
+    draw_trace(self, monitor, x_pos, y_pos, first_cycle, last_cycle,
+               cycle_width): Draws the visible cycles of a trace.
+    get_grid_step(self, cycle_width): Returns the number of cycles between
+                                      grid lines.
+    zoom_canvas(self, mouse_x, factor): Scales the width of each cycle.
     render_text(self, text, x_pos, y_pos): Handles text drawing
                                            operations.
     on_keydown(self, event): Handles left and right keydown
@@ -66,7 +72,6 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                          attribList=[wxcanvas.WX_GL_RGBA,
                                      wxcanvas.WX_GL_DOUBLEBUFFER,
                                      wxcanvas.WX_GL_DEPTH_SIZE, 16, 0])
-        GLUT.glutInit()
         self.init = False
         self.context = wxcanvas.GLContext(self)
 
@@ -76,8 +81,21 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         self.last_mouse_x = 0  # previous mouse x position
         self.last_mouse_y = 0  # previous mouse y position
 
-        # Initialise variables for zooming
+        # Initialise variables for zooming, which scales the width of each
+        # cycle from 20 pixels
         self.zoom = 1
+        self.zoom_limits = (1e-5, 4)
+        self.offset = 0  # length of the longest device name
+        self.cycles = 0  # number of cycles in the traces
+
+        # Trace vertices, and trace_buffers stores
+        # {(device_id, output_id): (vertex buffer ID, capacity in doubles)}
+        self.trace_geometry = TraceGeometry(monitors)
+        self.trace_buffers = {}
+        self.summary_buffer = None  # vertex buffer for the summary blocks
+
+        # Glyph textures and cached labels for drawing text
+        self.text_atlas = TextAtlas()
 
         # Bind events to the canvas
         self.Bind(wx.EVT_PAINT, self.on_paint)
@@ -134,99 +152,174 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                 longest_name_len = len(max(self.device_list, key=len))
             self.offset = longest_name_len
 
-            # Draw signal traces
-            j = 1
-            for device_id, output_id in self.monitors.monitors_dictionary:
-                j += 1
+            # Draw the signal traces, but only the cycles and monitor rows
+            # that are on the canvas
+            self.update_trace_buffers()
+            monitor_list = list(self.monitors.monitors_dictionary)
+            self.cycles = max([len(trace) for trace in
+                               self.monitors.monitors_dictionary.values()],
+                              default=0)
+            self.last_horizontal = 50 * len(monitor_list)
+            x_start = longest_name_len * 20  # x position of cycle 0
+            cycle_width = 20 * self.zoom
+            first_cycle = max(int((-self.pan_x - x_start) // cycle_width), 0)
+            last_cycle = min(int((size.width - self.pan_x - x_start) //
+                                 cycle_width) + 1, self.cycles)
+            grid_step = self.get_grid_step(cycle_width)
+            grid_cycles = range(first_cycle - first_cycle % grid_step,
+                                last_cycle + 1, grid_step)
+
+            # Row j, from y = (50 * j) - 60 to 50 * j, shows monitor j - 2
+            first_row = max(int(-self.pan_y // 50), 2)
+            last_row = min(int((size.height - self.pan_y + 60) // 50),
+                           len(monitor_list) + 1)
+            for j in range(first_row, last_row + 1):
+                (device_id, output_id) = monitor_list[j - 2]
                 monitor_name = self.devices.get_signal_name(
                     device_id, output_id)
-                signal_list = self.monitors.monitors_dictionary[
-                    (device_id, output_id)]
                 self.render_text(monitor_name, 10, (50 * j) - 18, 24)
-                self.cycles = len(signal_list)
 
                 # seperator line between traces
                 GL.glColor3f(0.870, 0.411, 0.129)
                 GL.glLineWidth(1)
                 GL.glBegin(GL.GL_LINES)
-                # for i in range(len(signal_list)):
                 GL.glVertex2f(0, (50 * j))
-                GL.glVertex2f(self.cycles * 20 + 1000, (50 * j))
-                GL.glEnd()
-
-                GL.glBegin(GL.GL_LINES)
-                # for i in range(len(signal_list)):
+                GL.glVertex2f(self.cycles * cycle_width + 1000, (50 * j))
                 GL.glVertex2f(0, (50 * j) - 50)
-                GL.glVertex2f(self.cycles * 20 + 1000, (50 * j) - 50)
-                self.last_horizontal = (50 * j) - 50
+                GL.glVertex2f(self.cycles * cycle_width + 1000, (50 * j) - 50)
                 GL.glEnd()
 
-                # vertical lines
-                for i in range(len(signal_list) + 1):
-
-                    if i % 5 == 0 and j == 2:
-                        if i == 0 or i == 5:
-                            x = (i * 20) + (longest_name_len * 20) - 2.5
-                        else:
-                            x = (i * 20) + (longest_name_len * 20) - 5
+                # cycle labels above the first trace
+                if j == 2:
+                    for i in grid_cycles:
+                        x = (i * cycle_width) + x_start - 2.5 * len(str(i))
                         self.render_text(str(i), x, (50 * j) - 60, 24)
 
+                # vertical lines
                 GL.glBegin(GL.GL_LINES)
-                GL.glColor3f(0.870, 0.411, 0.129)
-
-                for i in range(len(signal_list) + 1):
-
-                    if i % 5 == 0:
-                        x = (i * 20) + (longest_name_len * 20)
-                        GL.glVertex2f(x, (50 * j))
-                        GL.glVertex2f(x, (50 * j) - 55)
-
+                for i in grid_cycles:
+                    x = (i * cycle_width) + x_start
+                    GL.glVertex2f(x, (50 * j))
+                    GL.glVertex2f(x, (50 * j) - 55)
                 GL.glEnd()
 
-                # signal trace
+                # signal trace, drawn from its vertex buffer
                 GL.glColor3f(0.086, 0.356, 0.458)
                 GL.glLineWidth(2)
-                GL.glBegin(GL.GL_LINES)
-                first_run = True
-                blank = False
-                for i in range(len(signal_list)):
-                    GL.glColor3f(0.086, 0.356, 0.458)
-                    x = (i * 20) + (longest_name_len * 20)
-                    x_next = (i * 20) + (longest_name_len * 20) + 20
-                    base_y = (50*j) - 11
-                    if signal_list[i] == self.devices.HIGH:
-                        y = base_y - 25
-                    elif signal_list[i] == self.devices.LOW:
-                        y = base_y - 5
-                    elif signal_list[i] == self.devices.RISING:
-                        y = base_y - 25
-                    elif signal_list[i] == self.devices.FALLING:
-                        y = base_y - 5
-                    elif signal_list[i] == self.devices.BLANK:
-                        blank = True
-                    if first_run is False:
-                        GL.glVertex2f(x, y)
-                        GL.glVertex2f(x, y)
-                        GL.glVertex2f(x_next, y)
-                        GL.glColor3f(0.086, 0.356, 0.458)
-                        GL.glVertex2f(x_next, y)
-                    elif blank is True:
-                        blank = False
-                        pass
-                    else:
-                        GL.glVertex2f(x, y)
-                        GL.glVertex2f(x_next, y)
-                        GL.glColor3f(0.086, 0.356, 0.458)
-                        GL.glVertex2f(x_next, y)
-                        first_run = False
+                self.draw_trace((device_id, output_id), x_start,
+                                (50 * j) - 16, first_cycle, last_cycle,
+                                cycle_width)
 
-                GL.glEnd()
+        # Draw the text of the labels added by render_text in one batch
+        self.text_atlas.draw_labels()
 
         # We have been drawing to the back buffer, flush the graphics pipeline
         # and swap the back buffer to the front
         GL.glFlush()
         self.SwapBuffers()
 
+    def update_trace_buffers(self):
+        """Upload the trace vertices that have changed to vertex buffers.
+
+        Only the vertices from the first changed one are uploaded, and the
+        capacity of a buffer is doubled when it is full, so recording more
+        cycles rarely reallocates it.
+        """
+        for monitor in list(self.trace_buffers):
+            if monitor not in self.monitors.monitors_dictionary:
+                buffer_id, capacity = self.trace_buffers.pop(monitor)
+                GL.glDeleteBuffers(1, [buffer_id])
+
+        for monitor, first_changed in self.trace_geometry.update().items():
+            vertices = self.trace_geometry.get_vertices(monitor)
+            buffer_id, capacity = self.trace_buffers.get(monitor, (None, 0))
+            if buffer_id is None:
+                buffer_id = GL.glGenBuffers(1)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, buffer_id)
+            if len(vertices) > capacity:
+                capacity = max(2 * capacity, len(vertices), 1024)
+                GL.glBufferData(GL.GL_ARRAY_BUFFER,
+                                capacity * vertices.itemsize, None,
+                                GL.GL_DYNAMIC_DRAW)
+                first_changed = 0
+            data = vertices[first_changed:].tobytes()
+            if data:
+                GL.glBufferSubData(GL.GL_ARRAY_BUFFER,
+                                   first_changed * vertices.itemsize,
+                                   len(data), data)
+            self.trace_buffers[monitor] = (buffer_id, capacity)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+    def draw_trace(self, monitor, x_pos, y_pos, first_cycle, last_cycle,
+                   cycle_width):
+        """Draw the cycles of a trace from first_cycle to last_cycle.
+
+        The trace starts at x_pos, with its LOW level at y_pos. The vertices
+        are in cycles and levels, so they are scaled to cycle_width pixels
+        per cycle and 20 pixels from LOW to HIGH. The runs are drawn with one
+        call from the trace's vertex buffer, unless more than summary_cycles
+        cycles fall into one pixel, when the blocks of the trace's summary
+        are drawn instead.
+        """
+        if monitor not in self.trace_buffers:
+            return
+        cycles_per_pixel = 1 / cycle_width
+        if cycles_per_pixel <= self.trace_geometry.summary_cycles:
+            buffer_id, capacity = self.trace_buffers[monitor]
+            [first_vertex, vertex_count] = \
+                self.trace_geometry.get_vertex_range(monitor, first_cycle,
+                                                     last_cycle)
+        else:
+            vertices = self.trace_geometry.get_summary_vertices(
+                monitor, cycles_per_pixel, first_cycle, last_cycle)
+            if self.summary_buffer is None:
+                self.summary_buffer = GL.glGenBuffers(1)
+            buffer_id = self.summary_buffer
+            [first_vertex, vertex_count] = [0, len(vertices) // 2]
+            if vertex_count:
+                GL.glBindBuffer(GL.GL_ARRAY_BUFFER, buffer_id)
+                GL.glBufferData(GL.GL_ARRAY_BUFFER,
+                                len(vertices) * vertices.itemsize,
+                                vertices.tobytes(), GL.GL_STREAM_DRAW)
+        if vertex_count == 0:
+            return
+
+        GL.glPushMatrix()
+        GL.glTranslated(x_pos, y_pos, 0)
+        GL.glScaled(cycle_width, -20, 1)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, buffer_id)
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glVertexPointer(2, GL.GL_DOUBLE, 0, None)
+        GL.glDrawArrays(GL.GL_LINE_STRIP, first_vertex, vertex_count)
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        GL.glPopMatrix()
+
+    def get_grid_step(self, cycle_width):
+        """Return the number of cycles between grid lines and labels.
+
+        The step is the smallest of 5, 10, 25, 50, 100, 250, ... cycles that
+        leaves at least 100 pixels between the lines.
+        """
+        step = 5
+        multipliers = itertools.cycle([2, 2.5, 2])
+        while step * cycle_width < 100:
+            step = int(step * next(multipliers))
+        return step
+
+    def zoom_canvas(self, mouse_x, factor):
+        """Scale the width of each cycle by factor.
+
+        The cycle under mouse_x stays in place, and the zoom is kept within
+        zoom_limits.
+        """
+        x_start = self.offset * 20
+        cycle = (mouse_x - self.pan_x - x_start) / (20 * self.zoom)
+        [min_zoom, max_zoom] = self.zoom_limits
+        self.zoom = min(max(self.zoom * factor, min_zoom), max_zoom)
+        self.pan_x = min(mouse_x - x_start - cycle * 20 * self.zoom, 0)
+        self.init = False
+
     def on_paint(self, event):
         """Handle the paint event."""
         self.SetCurrent(self.context)
@@ -269,26 +362,26 @@ class MyGLCanvas(wxcanvas.GLCanvas):
             text = "".join(["Mouse dragged to: ", str(event.GetX()),
                             ", ", str(event.GetY()), ". Pan is now: ",
                             str(self.pan_x), ", ", str(self.pan_y)])
+        if event.GetWheelRotation() != 0:
+            self.zoom_canvas(event.GetX(), 1.25 ** (
+                event.GetWheelRotation() / event.GetWheelDelta()))
+            text = "".join(["Zoom is now: ", str(self.zoom)])
 
         self.Refresh()  # triggers the paint event
 
         self.SetCurrent(self.context)
 
     def render_text(self, text, x_pos, y_pos, font=12):
-        """Handle text drawing operations."""
-        GL.glColor3f(0.0, 0.0, 0.0)  # text is black
-        GL.glRasterPos2f(x_pos, y_pos)
+        """Handle text drawing operations.
+
+        The text is added to the text atlas batch, which render draws once
+        the rest of the canvas is drawn.
+        """
         if font == 24:
-            font = GLUT.GLUT_BITMAP_HELVETICA_18
+            font_size = 18
         else:
-            font = GLUT.GLUT_BITMAP_HELVETICA_12
-
-        for character in text:
-            if character == '\n':
-                y_pos = y_pos - 20
-                GL.glRasterPos2f(x_pos, y_pos)
-            else:
-                GLUT.glutBitmapCharacter(font, ord(character))
+            font_size = 12
+        self.text_atlas.add_label(text, x_pos, y_pos, font_size)
 
     def on_keydown(self, event):
         """Handle keydown events."""
@@ -298,7 +391,7 @@ class MyGLCanvas(wxcanvas.GLCanvas):
 
         if keycode == wx.WXK_RIGHT:
 
-            if self.pan_x <= - self.cycles * 20 - \
+            if self.pan_x <= - self.cycles * 20 * self.zoom - \
                     self.offset * 20 - 100 + size.width:
                 pass
             else:
@@ -335,15 +428,14 @@ class MyGLCanvas(wxcanvas.GLCanvas):
 
         self.Refresh()  # triggers the paint event
 
-    def move_right(self):
-        """Handle automatic right scrolling events."""
+    def move_right(self, cycles=1):
+        """Handle automatic right scrolling events by a number of cycles."""
         size = self.GetClientSize()
 
-        if self.pan_x <= - (self.cycles+1) * 20 - \
-                self.offset * 20 - 100 + size.width:
-            pass
-        else:
-            self.pan_x -= 20
+        pan_limit = - (self.cycles+1) * 20 * self.zoom - \
+            self.offset * 20 - 100 + size.width
+        if self.pan_x > pan_limit:
+            self.pan_x = max(self.pan_x - cycles * 20 * self.zoom, pan_limit)
         self.init = False
 
         self.Refresh()  # triggers the paint event
@@ -502,7 +594,10 @@ class Gui(wx.Frame):
 
     Public methods
     --------------
-    update(self, event): Handle the event when the timer is running.
+    on_worker_timer(self, event): Records the cycles run by the simulation
+                            worker and repaints the canvas.
+    on_close(self, event): Stops the simulation worker when the window
+                            closes.
     on_menu(self, event): Event handler for the file menu.
     on_monitor_checkbox(self, event): Handle the event when the user checks a
                             'Signals to Monitor' checkbox.
@@ -530,8 +625,12 @@ class Gui(wx.Frame):
                                button.
     on_startstop_button(self, event): Handle the event when the user clicks the
                                stop button.
+    on_cancel_button(self, event): Handle the event when the user clicks the
+                               cancel button.
     on_speed_slider(self, event): Handle the event when the user changes the
                                speed slider.
+    on_adaptive_checkbox(self, event): Handle the event when the user checks
+                               the adaptive speed checkbox.
 
     read_name(self, name_string): Returns the name ID of the current string if
                         valid. Returns None if the current string is not a
@@ -542,13 +641,22 @@ class Gui(wx.Frame):
                         level.
     monitor_command(self): Sets the specified monitor.
     zap_command(self): Removes the specified monitor.
-    run_network(self, cycles): Runs the network for the specified number of
-                        simulation cycles. Returns True if successful.
+    run_network(self, cycles, cycle_interval=0, frame_budget=None): Starts
+                        running the network for the specified number of
+                        simulation cycles on the simulation worker. Returns
+                        True if started.
+    get_frame_budget(self): Returns the frame budget of continuous mode.
+    show_cycle_rate(self, final=False): Shows the cycles run per second in
+                        the status bar.
+    set_running(self, running): Enables the buttons for a running or stopped
+                        simulation.
     run_command(self): Runs the simulation from scratch.
     continue_command(self): Continues a previously run simulation.
     continuous_command(self): Runs continuous trace mode.
     path_leaf(self, path): Gets the filename from a path.
     startup_load(self): Handles the loading of a definition file at startup.
+    load_network(self): Builds the network for the selected definition file
+                        and returns the errors found.
     """
 
     def __init__(self, title, path, names, devices, network,
@@ -575,10 +683,30 @@ class Gui(wx.Frame):
         self.device_list = []
         self.monitor_names = []
         self.load_new = False
+        # (names, devices, network, monitors) built by the last file load,
+        # handed to the next Gui frame so the file is not parsed again
+        self.network_model = None
+        self.netlist_cache = NetlistCache()
         self.continuous_speed = 450
         self.slider_position = 450
         self.continuous_running = False
 
+        # Simulation runs on a background thread, polled once per frame
+        self.worker = None
+        if self.start_up is False:
+            self.worker = SimulationWorker(self.network, self.monitors)
+        self.frame_interval = 16  # milliseconds between polls of the worker
+        self.run_cycles = None  # cycles in the current run, None if endless
+        self.run_start = 0  # cycles completed when the current run started
+        # In adaptive speed, continuous mode runs for frame_budget seconds of
+        # each frame instead of waiting continuous_speed after each cycle
+        self.adaptive_speed = False
+        self.frame_budget = 0.012
+        # Cycles completed and time when the cycle rate was last shown
+        self.rate_cycles = 0
+        self.rate_time = 0
+        self.run_start_time = 0
+
         if self.start_up is False:
             self.device_id_list = self.devices.find_devices()
             for device_id in self.device_id_list:
@@ -675,11 +803,15 @@ class Gui(wx.Frame):
         label_4 = wx.StaticText(self, wx.ID_ANY,
                                 _("Select to set switch to HIGH"))
         label_5 = wx.StaticText(self, wx.ID_ANY, _("Speed"))
-        self.spin_ctrl_1 = wx.SpinCtrl(self, wx.ID_ANY, "10", min=0, max=40)
+        self.spin_ctrl_1 = wx.SpinCtrl(self, wx.ID_ANY, "10", min=0,
+                                       max=1000000)
         self.button_1 = wx.Button(self, wx.ID_ANY, _("Continue"))
         self.button_2 = wx.Button(self, wx.ID_ANY, _("Run"))
         self.load_button = wx.Button(self, wx.ID_ANY, _("Load New"))
         self.reset_button = wx.Button(self, wx.ID_ANY, _("Reset"))
+        self.progress_gauge = wx.Gauge(self, wx.ID_ANY, 100)
+        self.cancel_button = wx.Button(self, wx.ID_ANY, _("Cancel"))
+        self.cancel_button.Disable()
 
         self.continuous_label = wx.StaticText(
             self, wx.ID_ANY, _("Continuous Mode"))
@@ -687,6 +819,8 @@ class Gui(wx.Frame):
         self.startstop_button = wx.Button(self, wx.ID_ANY, _("Start/Stop"))
         self.speed_slider = wx.Slider(self, wx.ID_ANY, 500,
                                       minValue=1, maxValue=900)
+        self.adaptive_checkbox = wx.CheckBox(self, wx.ID_ANY, _("Adaptive"))
+        self.CreateStatusBar()
 
         # Checkbox for switches
         self.cbList2 = wx.CheckListBox(self, -1, (20, 40), (200, 200),
@@ -710,6 +844,7 @@ class Gui(wx.Frame):
         label_4.SetForegroundColour(wx.Colour(255, 255, 255))
         label_5.SetForegroundColour(wx.Colour(255, 255, 255))
         self.continuous_label.SetForegroundColour(wx.Colour(255, 255, 255))
+        self.adaptive_checkbox.SetForegroundColour(wx.Colour(255, 255, 255))
 
         # Bind events to widgets
         self.Bind(wx.EVT_MENU, self.on_menu)
@@ -719,11 +854,15 @@ class Gui(wx.Frame):
         self.load_button.Bind(wx.EVT_BUTTON, self.on_load_button)
         self.reset_button.Bind(wx.EVT_BUTTON, self.on_reset_button)
         self.startstop_button.Bind(wx.EVT_BUTTON, self.on_startstop_button)
+        self.cancel_button.Bind(wx.EVT_BUTTON, self.on_cancel_button)
         self.speed_slider.Bind(wx.EVT_SCROLL, self.on_speed_slider)
+        self.adaptive_checkbox.Bind(wx.EVT_CHECKBOX,
+                                    self.on_adaptive_checkbox)
         self.cbList2.Bind(wx.EVT_CHECKLISTBOX, self.on_switch_checkbox)
 
-        self.timer = wx.Timer(self)
-        self.Bind(wx.EVT_TIMER, self.update, self.timer)
+        self.worker_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_worker_timer, self.worker_timer)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
 
         # Configure sizers for layout
         main_sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -731,6 +870,7 @@ class Gui(wx.Frame):
         sizer_0 = wx.BoxSizer(wx.VERTICAL)
         sizer_1 = wx.BoxSizer(wx.HORIZONTAL)
         sizer_2 = wx.BoxSizer(wx.HORIZONTAL)
+        sizer_3 = wx.BoxSizer(wx.HORIZONTAL)
         sizer_4 = wx.BoxSizer(wx.HORIZONTAL)
         sizer_5 = wx.BoxSizer(wx.VERTICAL)
         sizer_6 = wx.BoxSizer(wx.VERTICAL)
@@ -747,6 +887,7 @@ class Gui(wx.Frame):
 
         sizer_0.Add(sizer_1, 1, wx.EXPAND | wx.ALL, 5)
         sizer_0.Add(sizer_2, 1, wx.EXPAND | wx.ALL, 5)
+        sizer_0.Add(sizer_3, 1, wx.EXPAND | wx.ALL, 5)
 
         sizer_1.Add(label_1, 1, wx.ALL, 10)
         sizer_1.Add(self.spin_ctrl_1, 0, wx.ALL, 10)
@@ -754,12 +895,17 @@ class Gui(wx.Frame):
         sizer_2.Add(self.button_1, 1, wx.ALL, 10)
         sizer_2.Add(self.button_2, 1, wx.ALL, 10)
 
+        sizer_3.Add(self.progress_gauge, 1, wx.ALIGN_CENTER_VERTICAL | wx.ALL,
+                    10)
+        sizer_3.Add(self.cancel_button, 1, wx.ALL, 10)
+
         sizer_4.Add(self.continuous_label, 1, wx.ALL, 10)
         sizer_4.Add(self.startstop_button, 1, wx.ALL, 10)
 
         sizer_5.Add(sizer_4, 0, wx.CENTRE | wx.BOTTOM, 10, 0)
         sizer_5.Add(label_5, 0, wx.CENTRE | wx.BOTTOM, 1)
         sizer_5.Add(self.speed_slider, 1, wx.CENTRE | wx.ALL, 10)
+        sizer_5.Add(self.adaptive_checkbox, 0, wx.CENTRE | wx.BOTTOM, 10)
 
         sizer_6.Add(label_4, 0, wx.CENTRE, 0)
         sizer_6.Add(self.cbList2, 0, wx.CENTRE, 0)
@@ -776,11 +922,51 @@ class Gui(wx.Frame):
 
         self.Maximize(True)
 
-    def update(self, event):
-        """Handle the event when the timer is running."""
-        text = ""
-        self.continuous_command()
-        self.canvas.move_right()
+    def on_worker_timer(self, event):
+        """Record the cycles run by the simulation worker since the last poll.
+
+        The canvas is repainted at most once per poll, however many cycles
+        have been run.
+        """
+        new_cycles = 0
+        for message in self.worker.get_messages():
+            if message[0] == self.worker.SIGNALS:
+                [message_type, cycles, signal_arrays] = message
+                self.monitors.record_cycles(cycles, signal_arrays)
+                self.cycles_completed += cycles
+                new_cycles += cycles
+            elif message[0] == self.worker.OSCILLATING:
+                text = _("Network oscillating.")
+                if message[1]:
+                    text += "\n" + message[1]
+                frame = PopUpFrame(self, title=_("Error!"), text=text)
+            else:  # FINISHED
+                self.worker_timer.Stop()
+                self.set_running(False)
+                self.show_cycle_rate(final=True)
+
+        # Once finished, the gauge has been cleared for the next run
+        if self.worker_timer.IsRunning():
+            self.show_cycle_rate()
+            if self.run_cycles is None:
+                self.progress_gauge.Pulse()
+            elif self.run_cycles:
+                self.progress_gauge.SetValue(min(int(
+                    100 * (self.cycles_completed - self.run_start) /
+                    self.run_cycles), 100))
+        if new_cycles:
+            if self.continuous_running:
+                self.canvas.move_right(new_cycles)
+            else:
+                self.canvas.Refresh()
+
+    def on_close(self, event):
+        """Stop the simulation worker when the window closes."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.join()
+        self.worker_timer.Stop()
+        event.Skip()
 
     def on_menu(self, event):
         """Handle the event when the user selects a menu item."""
@@ -915,14 +1101,7 @@ class Gui(wx.Frame):
 
             self.filename = self.path_leaf(self.pathname)
 
-            names = Names()
-            devices = Devices(names)
-            network = Network(names, devices)
-            monitors = Monitors(names, devices, network)
-            scanner = Scanner(self.pathname, names)
-            parser = Parser(names, devices, network, monitors, scanner)
-            parser.parse_network()
-            error_list = scanner.error_list
+            error_list = self.load_network()
             num_errors = len(error_list)
 
             pages = math.ceil(num_errors/4)
@@ -977,6 +1156,22 @@ class Gui(wx.Frame):
         self.Show(False)
         self.Destroy()
 
+    def load_network(self):
+        """Build the network for the selected definition file.
+
+        The network is rebuilt from the netlist cache if the file has been
+        parsed without errors before, otherwise the file is parsed. Return the
+        list of errors found. If there are none, the network is kept in
+        network_model for the next Gui frame.
+        """
+        [names, devices, network, monitors,
+         error_list] = self.netlist_cache.load_network(self.pathname)
+        if error_list:
+            self.network_model = None
+        else:
+            self.network_model = (names, devices, network, monitors)
+        return error_list
+
     def on_reset_button(self, event):
         """Handle the event when the user clicks reset button."""
         if self.start_up is True:
@@ -993,19 +1188,32 @@ class Gui(wx.Frame):
             text = _("No definition file loaded.")
             frame = PopUpFrame(self, title=_("Error!"), text=text)
         elif self.continuous_running is False:
-            self.timer.Start(self.continuous_speed)
-            self.continuous_running = True
+            self.continuous_command()
         else:
-            self.timer.Stop()
-            self.continuous_running = False
+            self.worker.cancel()
+
+    def on_cancel_button(self, event):
+        """Handle the event when the user clicks cancel button."""
+        if self.worker is not None:
+            self.worker.cancel()
 
     def on_speed_slider(self, event):
         """Handle the event when the user changes the speed slider."""
         self.slider_position = self.speed_slider.GetValue()
         self.continuous_speed = -self.slider_position + 1001
         if self.continuous_running is True:
-            self.timer.Stop()
-            self.timer.Start(self.continuous_speed)
+            self.worker.set_cycle_interval(self.continuous_speed / 1000)
+
+    def on_adaptive_checkbox(self, event):
+        """Handle the event when the user checks the adaptive checkbox.
+
+        In adaptive speed, continuous mode runs as many cycles as fit in
+        each frame, so the speed slider is not used.
+        """
+        self.adaptive_speed = self.adaptive_checkbox.IsChecked()
+        self.speed_slider.Enable(not self.adaptive_speed)
+        if self.continuous_running is True:
+            self.worker.set_frame_budget(self.get_frame_budget())
 
     def read_name(self, name_string):
         """Return the name ID of the current string if valid.
@@ -1074,20 +1282,68 @@ class Gui(wx.Frame):
                     self.checked_name)
                 frame = PopUpFrame(self, title=_("Error!"), text=text)
 
-    def run_network(self, cycles):
-        """Run the network for the specified number of simulation cycles.
+    def run_network(self, cycles, cycle_interval=0, frame_budget=None):
+        """Start running the network for the specified number of cycles.
 
-        Return True if successful.
+        The cycles run on the simulation worker, waiting cycle_interval
+        seconds after each, or running for frame_budget seconds of each
+        frame if it is not None. They are recorded by on_worker_timer as
+        they are published. If cycles is None, the network runs until
+        cancelled. Return True if started, or False if a run is in progress.
         """
-        for _ in range(cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-            else:
-                text = _("Network oscillating.")
-                frame = PopUpFrame(self, title=_("Error!"), text=text)
-                return False
+        if not self.worker.start(cycles, cycle_interval, frame_budget):
+            return False
+        self.run_cycles = cycles
+        self.run_start = self.cycles_completed
+        self.rate_cycles = self.cycles_completed
+        self.rate_time = self.run_start_time = time.perf_counter()
+        self.set_running(True)
+        self.worker_timer.Start(self.frame_interval)
         return True
 
+    def get_frame_budget(self):
+        """Return the frame budget of continuous mode, or None if unused."""
+        if self.adaptive_speed:
+            return self.frame_budget
+        return None
+
+    def show_cycle_rate(self, final=False):
+        """Show the cycles run per second in the status bar.
+
+        The rate is updated at most twice a second while the worker runs. If
+        final is True, the average rate of the whole run is shown.
+        """
+        now = time.perf_counter()
+        if final:
+            [cycles, start_time] = [self.cycles_completed - self.run_start,
+                                    self.run_start_time]
+        elif now - self.rate_time >= 0.5:
+            [cycles, start_time] = [self.cycles_completed - self.rate_cycles,
+                                    self.rate_time]
+            self.rate_cycles = self.cycles_completed
+            self.rate_time = now
+        else:
+            return
+        if now > start_time:
+            self.SetStatusText(_("{:.0f} cycles/s").format(
+                cycles / (now - start_time)))
+
+    def set_running(self, running):
+        """Enable the buttons for a running or a stopped simulation.
+
+        While the simulation worker runs, only continuous mode can be
+        stopped and the run can be cancelled.
+        """
+        for button in [self.button_1, self.button_2, self.load_button,
+                       self.reset_button]:
+            button.Enable(not running)
+        self.startstop_button.Enable(not running or
+                                     self.run_cycles is None)
+        self.cancel_button.Enable(running)
+        if not running:
+            self.continuous_running = False
+            self.progress_gauge.SetValue(0)
+
     def run_command(self):
         """Run the simulation from scratch."""
         self.cycles_completed = 0
@@ -1096,8 +1352,7 @@ class Gui(wx.Frame):
         if cycles is not None:  # if the number of cycles provided is valid
             self.monitors.reset_monitors()
             self.devices.cold_startup()
-            if self.run_network(cycles):
-                self.cycles_completed += cycles
+            self.run_network(cycles)
 
     def continue_command(self):
         """Continue a previously run simulation."""
@@ -1107,13 +1362,14 @@ class Gui(wx.Frame):
             if self.cycles_completed == 0:
                 text = _("Nothing to continue. Run first.")
                 frame = PopUpFrame(self, title=_("Error!"), text=text)
-            elif self.run_network(cycles):
-                self.cycles_completed += cycles
+            else:
+                self.run_network(cycles)
 
     def continuous_command(self):
-        """Run continuous simulation."""
-        self.run_network(1)
-        self.cycles_completed += 1
+        """Run continuous simulation until stopped."""
+        if self.run_network(None, self.continuous_speed / 1000,
+                            self.get_frame_budget()):
+            self.continuous_running = True
 
     def path_leaf(self, path):
         """Get the filename from a path."""
@@ -1134,14 +1390,7 @@ class Gui(wx.Frame):
 
             self.filename = self.path_leaf(self.pathname)
 
-            names = Names()
-            devices = Devices(names)
-            network = Network(names, devices)
-            monitors = Monitors(names, devices, network)
-            scanner = Scanner(self.pathname, names)
-            parser = Parser(names, devices, network, monitors, scanner)
-            parser.parse_network()
-            error_list = scanner.error_list
+            error_list = self.load_network()
             num_errors = len(error_list)
 
             pages = math.ceil(num_errors/4)
@@ -8,22 +8,21 @@ Usage
 -----
 Show help: logsim.py -h
 Command line user interface: logsim.py -c <file path>
+Command line user interface with a simulation engine:
+    logsim.py -e <engine> -c <file path>
+Run-length encoded signal traces: logsim.py -t runs -c <file path>
+Stream monitored signals to a VCD file:
+    logsim.py -v <VCD file path> -c <file path>
 Graphical user interface: logsim.py <file path>
+Graphical user interface with a simulation engine:
+    logsim.py -e <engine> <file path>
 """
 import getopt
 import sys
 
-import wx
-import builtins
-
-from names import Names
-from devices import Devices
-from network import Network
-from monitors import Monitors
-from scanner import Scanner
-from parse import Parser
+from netcache import NetlistCache
+from vcd import VcdWriter
 from userint import UserInterface
-from gui import Gui
 
 
 def main(arg_list):
@@ -35,38 +34,84 @@ def main(arg_list):
     usage_message = ("Usage:\n"
                      "Show help: logsim.py -h\n"
                      "Command line user interface: logsim.py -c <file path>\n"
-                     "Graphical user interface: logsim.py <file path>")
+                     "Command line user interface with a simulation engine:\n"
+                     "    logsim.py -e <engine> -c <file path>\n"
+                     "    where <engine> is iterative, levelized, event, "
+                     "vector or generated\n"
+                     "Run-length encoded signal traces:\n"
+                     "    logsim.py -t runs -c <file path>\n"
+                     "    where -t array, the default, stores every cycle\n"
+                     "Stream monitored signals to a VCD file:\n"
+                     "    logsim.py -v <VCD file path> -c <file path>\n"
+                     "Graphical user interface: logsim.py <file path>\n"
+                     "Graphical user interface with a simulation engine:\n"
+                     "    logsim.py -e <engine> <file path>")
+    engine_names = {"iterative": "ITERATIVE", "levelized": "LEVELIZED",
+                    "event": "EVENT_DRIVEN", "vector": "VECTORIZED",
+                    "generated": "GENERATED"}
+    trace_names = {"array": "ARRAY", "runs": "RUN_LENGTH"}
     try:
-        options, arguments = getopt.getopt(arg_list, "hc:")
+        options, arguments = getopt.getopt(arg_list, "hc:e:t:v:")
     except getopt.GetoptError:
         print("Error: invalid command line arguments\n")
         print(usage_message)
         sys.exit()
 
+    # The engine, trace type and VCD file are needed before the network is
+    # parsed, so find them first
+    engine_name = "iterative"
+    trace_name = "array"
+    vcd_path = None
+    for option, value in options:
+        if option == "-e":
+            if value not in engine_names:
+                print("Error: invalid engine\n")
+                print(usage_message)
+                sys.exit()
+            engine_name = value
+        elif option == "-t":
+            if value not in trace_names:
+                print("Error: invalid trace type\n")
+                print(usage_message)
+                sys.exit()
+            trace_name = value
+        elif option == "-v":
+            vcd_path = value
+
+    netlist_cache = NetlistCache()
     for option, path in options:
         if option == "-h":  # print the usage message
             print(usage_message)
             sys.exit()
         elif option == "-c":  # use the command line user interface
-            names = Names()
-            devices = Devices(names)
-            network = Network(names, devices)
-            monitors = Monitors(names, devices, network)
-            scanner = Scanner(path, names)
-            parser = Parser(names, devices, network, monitors, scanner)
-            if parser.parse_network():
-                error_list = scanner.error_list
-                for error in error_list:
-                    print(error)
-                # Initialise an instance of the userint.UserInterface() class
-                userint = UserInterface(names, devices, network, monitors)
-                userint.command_interface()
-            else:
-                error_list = scanner.error_list
-                for error in error_list:
-                    print(error)
+            [names, devices, network, monitors,
+             error_list] = netlist_cache.load_network(path)
+            for error in error_list:
+                print(error)
+            if not network.set_engine(
+                    getattr(network, engine_names[engine_name])):
+                print("Error: the {} engine needs NumPy".format(engine_name))
+                sys.exit()
+            monitors.set_trace_type(getattr(monitors,
+                                            trace_names[trace_name]))
+            if vcd_path is not None:
+                try:
+                    monitors.start_vcd(VcdWriter(vcd_path, devices))
+                except OSError:
+                    print("Error: cannot write to {}".format(vcd_path))
+                    sys.exit()
+            # Initialise an instance of the userint.UserInterface() class
+            userint = UserInterface(names, devices, network, monitors)
+            userint.command_interface()
+            monitors.stop_vcd()
 
-    if not options:  # no option given, use the graphical user interface
+    if "-c" not in [option for option, value in options]:
+        # no file given with -c, use the graphical user interface. wx,
+        # OpenGL and the GUI take a long time to import, so they are only
+        # imported here.
+        import builtins
+        import wx
+        from gui import Gui
 
         path = None
         names = None
@@ -92,18 +137,23 @@ def main(arg_list):
         while gui.load_new is True:
             path = gui.current_pathname
             filename = gui.current_filename
-            names = Names()
-            devices = Devices(names)
-            network = Network(names, devices)
-            monitors = Monitors(names, devices, network)
-            scanner = Scanner(path, names)
-            parser = Parser(names, devices, network, monitors, scanner)
-            if parser.parse_network():
-                # Initialise an instance of the gui.Gui() class
-                gui = Gui(_("பனி Logic Simulator - {}").format(filename), path,
-                          names, devices, network, monitors, filename)
-                gui.Show(True)
-                app.MainLoop()
+            if gui.network_model is not None:
+                # The last frame has already built the network for this file
+                [names, devices, network, monitors] = gui.network_model
+            else:  # reset, so build the network again
+                [names, devices, network, monitors,
+                 error_list] = netlist_cache.load_network(path)
+            if not network.set_engine(
+                    getattr(network, engine_names[engine_name])):
+                print("Error: the {} engine needs NumPy".format(engine_name))
+                sys.exit()
+            monitors.set_trace_type(getattr(monitors,
+                                            trace_names[trace_name]))
+            # Initialise an instance of the gui.Gui() class
+            gui = Gui(_("பனி Logic Simulator - {}").format(filename), path,
+                      names, devices, network, monitors, filename)
+            gui.Show(True)
+            app.MainLoop()
 
 
 if __name__ == "__main__":
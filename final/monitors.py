@@ -5,10 +5,127 @@ signals.
 
 Classes
 -------
+SignalRuns - stores a signal trace as runs of the same signal.
 Monitors - records and displays specified output signals.
 
 """
+import bisect
 import collections
+import itertools
+from array import array
+
+
+class SignalRuns:
+
+    """Store a signal trace as runs of cycles with the same signal.
+
+    Only the cycle at which each run starts and its signal are stored, so the
+    memory used grows with the number of changes in the signal rather than
+    the number of cycles. The trace can be used like an array of one signal
+    per cycle: signals are appended one cycle at a time, and the signal at a
+    cycle is found by binary search over the run starts.
+
+    Parameters
+    ----------
+    signals: signals to start the trace with, one per cycle.
+
+    Public methods
+    --------------
+    append(self, signal): Records the signal for the next cycle.
+
+    extend(self, signals): Records the signals for the next cycles.
+
+    get_runs(self, start=0, stop=None): Returns an iterator over the runs
+                                        that cover the cycles from start to
+                                        stop.
+
+    tobytes(self): Returns the trace as bytes, one signal per cycle.
+    """
+
+    __slots__ = ("run_starts", "run_signals", "cycles")
+
+    def __init__(self, signals=()):
+        """Initialise the runs."""
+        self.run_starts = array('q')  # the cycle each run starts at
+        self.run_signals = array('b')  # the signal of each run
+        self.cycles = 0
+        self.extend(signals)
+
+    def __len__(self):
+        """Return the number of cycles recorded."""
+        return self.cycles
+
+    def __getitem__(self, cycle):
+        """Return the signal at the specified cycle."""
+        if cycle < 0:
+            cycle += self.cycles
+        if not 0 <= cycle < self.cycles:
+            raise IndexError("cycle out of range")
+        return self.run_signals[
+            bisect.bisect_right(self.run_starts, cycle) - 1]
+
+    def __iter__(self):
+        """Iterate over the signal at each cycle."""
+        for run_start, run_stop, signal in self.get_runs():
+            yield from itertools.repeat(signal, run_stop - run_start)
+
+    def __eq__(self, other):
+        """Return True if other has the same signal at every cycle."""
+        if isinstance(other, SignalRuns):
+            return (self.cycles == other.cycles and
+                    self.run_starts == other.run_starts and
+                    self.run_signals == other.run_signals)
+        try:
+            return len(self) == len(other) and all(
+                signal == other_signal
+                for signal, other_signal in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return the runs as (start, stop, signal) tuples."""
+        return "SignalRuns({!r})".format(list(self.get_runs()))
+
+    def append(self, signal):
+        """Record the signal for the next cycle."""
+        if not self.run_signals or self.run_signals[-1] != signal:
+            self.run_starts.append(self.cycles)
+            self.run_signals.append(signal)
+        self.cycles += 1
+
+    def extend(self, signals):
+        """Record the signals for the next cycles."""
+        for signal, group in itertools.groupby(signals):
+            run_length = sum(1 for _ in group)
+            self.append(signal)
+            self.cycles += run_length - 1
+
+    def get_runs(self, start=0, stop=None):
+        """Return an iterator over the runs from cycle start to cycle stop.
+
+        Each run is a (run_start, run_stop, signal) tuple, where the signal
+        holds from run_start up to but not including run_stop. The first and
+        last runs are cut to start and stop.
+        """
+        if stop is None or stop > self.cycles:
+            stop = self.cycles
+        if start >= stop:
+            return
+        first_run = bisect.bisect_right(self.run_starts, start) - 1
+        for run in range(first_run, len(self.run_starts)):
+            run_start = max(self.run_starts[run], start)
+            if run_start >= stop:
+                break
+            if run + 1 < len(self.run_starts):
+                run_stop = min(self.run_starts[run + 1], stop)
+            else:
+                run_stop = stop
+            yield (run_start, run_stop, self.run_signals[run])
+
+    def tobytes(self):
+        """Return the trace as bytes, with one byte per cycle."""
+        return b"".join(bytes([signal]) * (run_stop - run_start)
+                        for run_start, run_stop, signal in self.get_runs())
 
 
 class Monitors:
@@ -37,6 +154,9 @@ class Monitors:
 
     record_signals(self): Records the current signal level of all monitors.
 
+    record_cycles(self, cycles, signal_arrays): Records cycles of signals
+                                                read elsewhere.
+
     get_signal_names(self): Returns two lists of signal names: monitored and
                             not monitored.
 
@@ -45,6 +165,20 @@ class Monitors:
     get_margin(self): Returns the length of the longest monitor's name.
 
     display_signals(self): Displays signal trace(s) in the text console.
+
+    set_trace_type(self, trace_type): Sets how the signal traces are stored.
+
+    make_trace(self, cycles_completed=0): Returns an empty trace, or one with
+                                          cycles_completed BLANK signals.
+
+    get_signal_runs(self, device_id, output_id, start=0, stop=None): Returns
+                       the runs of the same signal in the specified trace.
+
+    start_vcd(self, vcd_writer): Streams the monitored signals to a VCD file
+                                 instead of recording them in the traces.
+
+    stop_vcd(self): Closes the VCD file and records signals in the traces
+                    again.
     """
 
     def __init__(self, names, devices, network):
@@ -53,10 +187,21 @@ class Monitors:
         self.network = network
         self.devices = devices
 
-        # monitors_dictionary stores
-        # {(device_id, output_id): [signal_list]}
+        # monitors_dictionary stores {(device_id, output_id): trace}, where
+        # each trace is an array('b') holding one byte for the signal at each
+        # simulation cycle, or a SignalRuns in the RUN_LENGTH trace type
         self.monitors_dictionary = collections.OrderedDict()
 
+        self.trace_types = [self.ARRAY, self.RUN_LENGTH] = range(2)
+        self.trace_type = self.ARRAY
+
+        # vcd_writer is a vcd.VcdWriter() while signals are streamed to a file
+        self.vcd_writer = None
+
+        # Table for bytes.translate from each signal to its console character
+        self.trace_characters = bytes.maketrans(
+            bytes(devices.signal_types), b"_-/\\ ")
+
         [self.NO_ERROR, self.NOT_OUTPUT,
          self.MONITOR_PRESENT] = self.names.unique_error_codes(3)
 
@@ -74,11 +219,10 @@ class Monitors:
             return self.MONITOR_PRESENT
         else:
             # If n simulation cycles have been completed before making this
-            # monitor, then initialise the signal trace with an n-length list
-            # of BLANK signals. Otherwise, initialise the trace with an empty
-            # list.
-            self.monitors_dictionary[(device_id, output_id)] = [
-                self.devices.BLANK] * cycles_completed
+            # monitor, then initialise the signal trace with n BLANK signals.
+            # Otherwise, initialise the trace empty.
+            self.monitors_dictionary[(device_id, output_id)] = \
+                self.make_trace(cycles_completed)
             return self.NO_ERROR
 
     def remove_monitor(self, device_id, output_id):
@@ -105,12 +249,36 @@ class Monitors:
     def record_signals(self):
         """Record the current signal level for every monitor.
 
-        This function is called at every simulation cycle.
+        This function is called at every simulation cycle. While a VCD file
+        is open, the signals are written to it instead.
         """
-        for device_id, output_id in self.monitors_dictionary:
-            signal_level = self.get_monitor_signal(device_id, output_id)
-            self.monitors_dictionary[(device_id,
-                                      output_id)].append(signal_level)
+        if self.vcd_writer is not None:
+            self.vcd_writer.write_cycle([
+                self.network.get_output_signal(device_id, output_id)
+                for device_id, output_id in self.vcd_writer.monitor_list])
+            return
+        for (device_id, output_id), signal_array in \
+                self.monitors_dictionary.items():
+            signal_array.append(self.network.get_output_signal(device_id,
+                                                               output_id))
+
+    def record_cycles(self, cycles, signal_arrays):
+        """Record cycles of signals read elsewhere, such as on a thread.
+
+        signal_arrays stores {(device_id, output_id): signals}, with the
+        signals of each monitor for the cycles. Monitors not in it record
+        BLANK signals for the cycles, so every trace stays the same length.
+        """
+        blank_signals = [self.devices.BLANK] * cycles
+        if self.vcd_writer is not None:
+            signal_lists = [signal_arrays.get(monitor, blank_signals)
+                            for monitor in self.vcd_writer.monitor_list]
+            for cycle in range(cycles):
+                self.vcd_writer.write_cycle([signals[cycle]
+                                             for signals in signal_lists])
+            return
+        for monitor, signal_array in self.monitors_dictionary.items():
+            signal_array.extend(signal_arrays.get(monitor, blank_signals))
 
     def get_signal_names(self):
         """Return two signal name lists: monitored and not monitored."""
@@ -133,10 +301,11 @@ class Monitors:
     def reset_monitors(self):
         """Clear the memory of all the monitors.
 
-        The list of stored signal levels for each monitor is deleted.
+        The trace of stored signal levels for each monitor is deleted.
         """
         for device_id, output_id in self.monitors_dictionary:
-            self.monitors_dictionary[(device_id, output_id)] = []
+            self.monitors_dictionary[(device_id, output_id)] = \
+                self.make_trace()
 
     def get_margin(self):
         """Return the length of the longest monitor's name.
@@ -161,17 +330,73 @@ class Monitors:
         for device_id, output_id in self.monitors_dictionary:
             monitor_name = self.devices.get_signal_name(device_id, output_id)
             name_length = len(monitor_name)
-            signal_list = self.monitors_dictionary[(device_id, output_id)]
+            trace = self.monitors_dictionary[(device_id, output_id)]
             print(monitor_name + (margin - name_length) * " ", end=": ")
-            for signal in signal_list:
-                if signal == self.devices.HIGH:
-                    print("-", end="")
-                if signal == self.devices.LOW:
-                    print("_", end="")
-                if signal == self.devices.RISING:
-                    print("/", end="")
-                if signal == self.devices.FALLING:
-                    print("\\", end="")
-                if signal == self.devices.BLANK:
-                    print(" ", end="")
-            print("\n", end="")
+            print(trace.tobytes().translate(
+                self.trace_characters).decode("ascii"))
+
+    def set_trace_type(self, trace_type):
+        """Select how the signal traces are stored.
+
+        ARRAY stores one byte per cycle. RUN_LENGTH stores only the cycles at
+        which each signal changes, which uses less memory for signals that
+        change rarely. Traces already recorded are converted. Return True if
+        successful.
+        """
+        if trace_type not in self.trace_types:
+            return False
+        self.trace_type = trace_type
+        for monitor, trace in self.monitors_dictionary.items():
+            if trace_type == self.RUN_LENGTH:
+                self.monitors_dictionary[monitor] = SignalRuns(trace)
+            else:
+                self.monitors_dictionary[monitor] = array('b', trace)
+        return True
+
+    def make_trace(self, cycles_completed=0):
+        """Return a trace of the current trace type.
+
+        The trace starts with cycles_completed BLANK signals.
+        """
+        if self.trace_type == self.RUN_LENGTH:
+            return SignalRuns(itertools.repeat(self.devices.BLANK,
+                                               cycles_completed))
+        return array('b', [self.devices.BLANK]) * cycles_completed
+
+    def get_signal_runs(self, device_id, output_id, start=0, stop=None):
+        """Return the runs of the same signal in the specified trace.
+
+        Return a list of (run_start, run_stop, signal) tuples for the cycles
+        from start up to stop, where each signal holds from run_start up to
+        but not including run_stop. Return None if the monitor does not exist.
+        """
+        trace = self.monitors_dictionary.get((device_id, output_id))
+        if trace is None:
+            return None
+        if isinstance(trace, SignalRuns):
+            return list(trace.get_runs(start, stop))
+
+        run_list = []
+        run_start = start
+        for signal, group in itertools.groupby(trace[start:stop]):
+            run_stop = run_start + sum(1 for _ in group)
+            run_list.append((run_start, run_stop, signal))
+            run_start = run_stop
+        return run_list
+
+    def start_vcd(self, vcd_writer):
+        """Stream the monitored signals to the VCD file of vcd_writer.
+
+        The signals of the current monitors are written to the file every
+        cycle instead of being recorded in their traces, so memory use does
+        not grow with the number of cycles.
+        """
+        self.stop_vcd()
+        vcd_writer.write_header(self.monitors_dictionary)
+        self.vcd_writer = vcd_writer
+
+    def stop_vcd(self):
+        """Close the VCD file, if open, and record signals in the traces."""
+        if self.vcd_writer is not None:
+            self.vcd_writer.close()
+            self.vcd_writer = None
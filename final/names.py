@@ -15,6 +15,8 @@ class Names:
     This class deals with storing grammatical keywords and user-defined words,
     and their corresponding name IDs, which are internal indexing integers. It
     provides functions for looking up either the name ID or the name string.
+    Name strings are kept in a list indexed by name ID, and name IDs in a
+    dictionary keyed by name string, so both lookups take constant time.
     It also keeps track of the number of error codes defined by other classes,
     and allocates new, unique error codes on demand.
 
@@ -38,9 +40,10 @@ class Names:
     """
 
     def __init__(self):
-        """Initialise names list."""
+        """Initialise names list and dictionary."""
         self.error_code_count = 0  # how many error codes have been declared
-        self.names = []
+        self.names = []  # name strings, indexed by name ID
+        self.name_ids = {}  # {name_string: name_id}
 
     def unique_error_codes(self, num_error_codes):
         """Return a list of unique integer error codes."""
@@ -57,23 +60,25 @@ class Names:
         """
         if not name_string[0].isalpha() or not name_string.isalnum():
             raise TypeError("Error! Query argument must be a name.")
-        if name_string in self.names:
-            return self.names.index(name_string)
-        else:
-            return None
+        return self.name_ids.get(name_string)
 
     def lookup(self, name_string_list):
         """Return a list of name IDs for each name string in name_string_list.
 
-        If the name string is not present in the names list, add it.
+        If the name string is not present in the names list, add it. New names
+        are given consecutive IDs in the order they appear in the list.
         """
         if type(name_string_list) is not list:
             raise TypeError("Error! Lookup argument must be a list.")
+        names = self.names
+        name_ids = self.name_ids
         name_id_list = []
         for name_string in name_string_list:
-            if name_string not in self.names:
-                self.names.append(name_string)
-            name_id_list.append(self.names.index(name_string))
+            name_id = name_ids.get(name_string)
+            if name_id is None:
+                name_id = name_ids[name_string] = len(names)
+                names.append(name_string)
+            name_id_list.append(name_id)
         return name_id_list
 
     def get_name_string(self, name_id):
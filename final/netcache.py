@@ -0,0 +1,189 @@
+"""Cache parsed networks so that a definition file is only parsed once.
+
+Used in the Logic Simulator project to save the names, devices, connections
+and monitors built by the parser to a binary file, and to rebuild them from
+that file the next time the same definition file is loaded.
+
+Classes
+-------
+NetlistCache - saves and loads parsed networks.
+"""
+import hashlib
+import marshal
+import os
+import tempfile
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+
+
+class NetlistCache:
+
+    """Save and load parsed networks.
+
+    Each network is saved to its own file, named after the SHA-256 hash of
+    the definition file it was parsed from. Any change to the definition file
+    changes its hash, so a stale network is never loaded. The networks are
+    stored as tuples of names, numbers and strings, serialised with marshal.
+
+    Parameters
+    ----------
+    cache_directory: directory for the cache files. Defaults to logsim in the
+                     user's cache directory.
+
+    Public methods
+    --------------
+    get_file_hash(self, path): Returns the SHA-256 hash of a file.
+
+    get_cache_path(self, file_hash): Returns the path of the cache file for a
+                                     definition file hash.
+
+    save(self, file_hash, names, devices, network, monitors): Saves a parsed
+                                     network and returns True if successful.
+
+    load(self, path): Returns (names, devices, network, monitors) rebuilt from
+                      the cache, or None if the file has not been cached.
+
+    load_network(self, path): Returns (names, devices, network, monitors,
+                              error_list) from the cache, or by parsing the
+                              file and caching it if there are no errors.
+    """
+
+    def __init__(self, cache_directory=None):
+        """Initialise the cache directory and file format."""
+        if cache_directory is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME", os.path.join(
+                os.path.expanduser("~"), ".cache"))
+            cache_directory = os.path.join(cache_home, "logsim")
+        self.cache_directory = cache_directory
+
+        # Changing the layout of the saved tuples needs a new format version,
+        # and the marshal version changes with the Python version
+        self.header = b"LSNC" + bytes([1, marshal.version])
+
+    def get_file_hash(self, path):
+        """Return the SHA-256 hash of the file at path."""
+        with open(path, 'rb') as definition_file:
+            return hashlib.sha256(definition_file.read()).hexdigest()
+
+    def get_cache_path(self, file_hash):
+        """Return the path of the cache file for a definition file hash."""
+        return os.path.join(self.cache_directory, file_hash + ".netcache")
+
+    def save(self, file_hash, names, devices, network, monitors):
+        """Save a parsed network for the definition file with file_hash.
+
+        Only networks parsed without errors should be saved. Return True if
+        successful.
+        """
+        device_list = []
+        for device in devices.devices_list:
+            device_list.append((
+                device.device_id, device.device_kind, list(device.inputs),
+                list(device.outputs.items()), device.clock_half_period,
+                device.switch_state, device.waveform, device.duration))
+
+        # Connections are saved in the order of each output's fanout, so that
+        # Network.get_fanout gives the same order after loading
+        connection_list = []
+        for connected_output, fanout_list in network.fanout.items():
+            for device_id, input_id in fanout_list:
+                connection_list.append((device_id, input_id) +
+                                       connected_output)
+
+        data = (file_hash, names.names, device_list, connection_list,
+                list(monitors.monitors_dictionary))
+
+        # Write to a temporary file first, so a cache file is never partly
+        # written
+        try:
+            os.makedirs(self.cache_directory, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                dir=self.cache_directory)
+            with os.fdopen(file_descriptor, 'wb') as cache_file:
+                cache_file.write(self.header)
+                cache_file.write(marshal.dumps(data))
+            os.replace(temporary_path, self.get_cache_path(file_hash))
+        except OSError:
+            return False
+        return True
+
+    def load(self, path):
+        """Rebuild the network parsed from the definition file at path.
+
+        Return (names, devices, network, monitors), or None if the file has
+        not been cached or the cache file cannot be read.
+        """
+        try:
+            file_hash = self.get_file_hash(path)
+            with open(self.get_cache_path(file_hash), 'rb') as cache_file:
+                if cache_file.read(len(self.header)) != self.header:
+                    return None
+                (saved_hash, name_list, device_list, connection_list,
+                 monitor_list) = marshal.loads(cache_file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if saved_hash != file_hash:
+            return None
+
+        # The names must have the same IDs as when they were parsed, so they
+        # are added before Devices adds its own names
+        names = Names()
+        names.lookup(name_list)
+        devices = Devices(names)
+        network = Network(names, devices)
+        monitors = Monitors(names, devices, network)
+
+        for (device_id, device_kind, input_ids, outputs, clock_half_period,
+             switch_state, waveform, duration) in device_list:
+            devices.add_device(device_id, device_kind)
+            for input_id in input_ids:
+                devices.add_input(device_id, input_id)
+            for output_id, signal in outputs:
+                devices.add_output(device_id, output_id, signal)
+            device = devices.get_device(device_id)
+            device.clock_half_period = clock_half_period
+            device.switch_state = switch_state
+            device.waveform = waveform
+            device.duration = duration
+            if device_kind == devices.RC:
+                device.RC_counter = 0
+
+        for (device_id, input_id, output_device_id,
+             output_id) in connection_list:
+            network.make_connection(device_id, input_id, output_device_id,
+                                    output_id)
+        for device_id, output_id in monitor_list:
+            monitors.make_monitor(device_id, output_id)
+
+        # Start the clocks, D-types and siggens as the parser leaves them
+        devices.cold_startup()
+        network.definition_hash = file_hash
+        return names, devices, network, monitors
+
+    def load_network(self, path):
+        """Return the network built from the definition file at path.
+
+        The result is (names, devices, network, monitors, error_list). Files
+        parsed without errors before are rebuilt from the cache instead of
+        being parsed again, and files parsed without errors now are saved to
+        it.
+        """
+        network_model = self.load(path)
+        if network_model is not None:
+            return network_model + ([],)
+
+        names = Names()
+        devices = Devices(names)
+        network = Network(names, devices)
+        monitors = Monitors(names, devices, network)
+        scanner = Scanner(path, names)
+        parser = Parser(names, devices, network, monitors, scanner)
+        parser.parse_network()
+        if scanner.error_count == 0:
+            self.save(scanner.file_hash, names, devices, network, monitors)
+        return names, devices, network, monitors, scanner.error_list
@@ -6,6 +6,9 @@ Classes
 --------
 Network - builds and executes the network.
 """
+import heapq
+
+from codegen import CodeGenerator
 
 
 class Network:
@@ -35,6 +38,9 @@ class Network:
                     second_port_id): Connects the first device to the second
                                      device.
 
+    get_fanout(self, device_id, output_id): Returns the inputs driven by the
+                                            given output.
+
     check_network(self): Checks if all inputs in the network are connected.
 
     update_signal(self, signal, target): Updates the signal in the direction of
@@ -67,6 +73,54 @@ class Network:
 
     execute_network(self): Executes all the devices in the network for one
                            simulation cycle.
+
+    get_oscillating_names(self): Returns the names of the oscillating
+                                 devices.
+
+    execute_iteration(self): Executes every device once for the iterative
+                             engine.
+
+    get_iteration_limit(self): Returns the number of iterations allowed for
+                               the signals to settle.
+
+    get_state_hash(self, device_list): Returns a hash of the output signals
+                                       and memories of the devices.
+
+    find_changing_devices(self, device_list, execute_once, iterations):
+                          Returns the devices whose outputs change.
+
+    settle_devices(self, device_list, execute_once): Runs the devices until
+                   their signals settle, detecting oscillations.
+
+    set_engine(self, engine): Selects how execute_network simulates a cycle.
+
+    get_strong_components(self, device_ids, successors): Returns the strongly
+                          connected components of a graph in topological order.
+
+    compile_network(self): Builds the levelized evaluation schedule.
+
+    get_feedback_loop(self, device_id): Returns the devices in the feedback
+                                        loop of a device.
+
+    get_signal_level(self, signal): Returns the level, HIGH or LOW, that the
+                                    signal is at or moving to.
+
+    settle_signal(self, signal, target): Sets the signal level to the target,
+                       marking whether it has changed during this cycle.
+
+    evaluate_device(self, device_id): Evaluates a device once from the levels
+                                      at its inputs.
+
+    evaluate_devices(self, device_id_list): Evaluates each device once.
+
+    finalise_signals(self, device_ids=None): Settles RISING and FALLING
+                                             signals to HIGH and LOW.
+
+    execute_levelized_network(self): Executes all the devices in the network
+                                     for one cycle using the schedule.
+
+    execute_event_network(self): Executes the devices whose inputs have
+                                 changed for one simulation cycle.
     """
 
     def __init__(self, names, devices):
@@ -79,17 +133,70 @@ class Network:
          self.DEVICE_ABSENT] = self.names.unique_error_codes(6)
         self.steady_state = True  # for checking if signals have settled
 
+        # Number of iterations to wait for the signals to settle before
+        # declaring the network unstable, or None to size it from the netlist
+        self.iteration_limit = None
+        # IDs of the devices found oscillating by the last execute_network
+        self.oscillating_devices = []
+
+        # fanout stores
+        # {(output_device_id, output_id): [(input_device_id, input_id), ...]}
+        self.fanout = {}
+
+        self.engine_types = [self.ITERATIVE, self.LEVELIZED,
+                             self.EVENT_DRIVEN, self.VECTORIZED,
+                             self.GENERATED] = range(5)
+        self.engine = self.ITERATIVE
+
+        # (x, y) pairs for gates: if all inputs are x, the output is y
+        self.gate_rules = {
+            self.devices.AND: (self.devices.HIGH, self.devices.HIGH),
+            self.devices.OR: (self.devices.LOW, self.devices.LOW),
+            self.devices.NAND: (self.devices.HIGH, self.devices.LOW),
+            self.devices.NOR: (self.devices.LOW, self.devices.HIGH)}
+
+        # schedule stores [(device_id_list, is_feedback_loop)] in level order,
+        # and is rebuilt by compile_network when the connections change
+        self.schedule = None
+        self.schedule_levels = None  # the level of each schedule entry
+        self.network_depth = None
+        self.feedback_loop_ids = None  # IDs of the devices in feedback loops
+        # input_sources stores {device_id: [(input_id, signals, position)]}
+        # for each scheduled device, where signals is the signal list of the
+        # connected output's PortMap and position is the output's place in
+        # it, so evaluate_device reads inputs without looking up port IDs.
+        # Both are None for an unconnected input.
+        self.input_sources = None
+
+        # Built with the schedule for the event-driven engine:
+        # device_ranks stores {device_id: position in the schedule},
+        # fanout_devices stores {(device_id, output_id): [device_id, ...]} and
+        # source_levels stores the last seen level of each clock, RC and siggen
+        self.device_ranks = None
+        self.fanout_devices = None
+        self.source_levels = None
+
+        # Instance of vectorsim.VectorEngine(), made by set_engine
+        self.vector_engine = None
+        # Instance of codegen.CodeGenerator(), made by set_engine
+        self.code_generator = None
+
+        # Hash of the definition file the network was parsed from, set by the
+        # parser and cleared when the connections change
+        self.definition_hash = None
+
     def get_connected_output(self, device_id, input_id):
         """Return the output connected to the given input.
 
         Return None if either of the specified IDs is invalid or the input is
         unconnected. The output is of the form (device ID, port ID).
         """
-        device = self.devices.get_device(device_id)
+        device = self.devices.devices_dictionary.get(device_id)
         if device is not None:
-            if input_id in device.inputs:
-                connected_output = device.inputs[input_id]
-                return connected_output
+            # PortMap fast path: index the signals by the port's position
+            position = device.inputs.port_index.get(input_id)
+            if position is not None:
+                return device.inputs.signals[position]
         return None
 
     def get_input_signal(self, device_id, input_id):
@@ -110,10 +217,11 @@ class Network:
 
         Return None if either of the specified IDs is invalid.
         """
-        device = self.devices.get_device(device_id)
+        device = self.devices.devices_dictionary.get(device_id)
         if device is not None:
-            if output_id in device.outputs:
-                return device.outputs[output_id]
+            position = device.outputs.port_index.get(output_id)
+            if position is not None:
+                return device.outputs.signals[position]
         return None
 
     def make_connection(self, first_device_id, first_port_id, second_device_id,
@@ -139,6 +247,11 @@ class Network:
                 # Make connection
                 first_device.inputs[first_port_id] = (second_device_id,
                                                       second_port_id)
+                self.fanout.setdefault((second_device_id, second_port_id),
+                                       []).append((first_device_id,
+                                                   first_port_id))
+                self.schedule = None
+                self.definition_hash = None
                 error_type = self.NO_ERROR
             else:  # second_port_id is not a valid input or output port
                 error_type = self.PORT_ABSENT
@@ -154,6 +267,11 @@ class Network:
                 else:
                     second_device.inputs[second_port_id] = (first_device_id,
                                                             first_port_id)
+                    self.fanout.setdefault((first_device_id, first_port_id),
+                                           []).append((second_device_id,
+                                                       second_port_id))
+                    self.schedule = None
+                    self.definition_hash = None
                     error_type = self.NO_ERROR
             else:
                 error_type = self.PORT_ABSENT
@@ -163,13 +281,19 @@ class Network:
 
         return error_type
 
+    def get_fanout(self, device_id, output_id):
+        """Return the inputs driven by the given output.
+
+        The inputs are returned as a list of (device ID, input ID) pairs, in
+        the order they were connected.
+        """
+        return list(self.fanout.get((device_id, output_id), []))
+
     def check_network(self):
         """Return True if all inputs in the network are connected."""
-        for device_id in self.devices.find_devices():
-            device = self.devices.get_device(device_id)
-            for input_id in device.inputs:
-                if self.get_connected_output(device_id, input_id) is None:
-                    return False
+        for device in self.devices.devices_list:
+            if None in device.inputs.values():
+                return False
         return True
 
     def update_signal(self, signal, target):
@@ -212,15 +336,16 @@ class Network:
         The output signal is updated to the switch_state target. Return True
         if successful.
         """
-        device = self.devices.get_device(device_id)
+        device = self.devices.devices_dictionary[device_id]
         target = device.switch_state
-        signal = self.get_output_signal(device_id, output_id=None)
+        signals = device.outputs.signals
+        position = device.outputs.port_index[None]
         # Update and store the updated signal
-        updated_signal = self.update_signal(signal, target)
+        updated_signal = self.update_signal(signals[position], target)
         if updated_signal is None:  # signal update is unsuccessful
             return False
         else:
-            device.outputs[None] = updated_signal
+            signals[position] = updated_signal
             return True
 
     def execute_gate(self, device_id, x=None, y=None):
@@ -232,12 +357,15 @@ class Network:
         LOW), (LOW, HIGH), (HIGH, LOW), (None, None).
         Return True if successful.
         """
-        device = self.devices.get_device(device_id)
+        devices_dictionary = self.devices.devices_dictionary
+        device = devices_dictionary[device_id]
         input_signal_list = []
-        for input_id in device.inputs:
-            input_signal = self.get_input_signal(device_id, input_id)
-            if input_signal is None:  # this input is unconnected
+        for connected_output in device.inputs.signals:
+            if connected_output is None:  # this input is unconnected
                 return False
+            (output_device_id, output_port_id) = connected_output
+            outputs = devices_dictionary[output_device_id].outputs
+            input_signal = outputs.signals[outputs.port_index[output_port_id]]
             input_signal_list.append(input_signal)
 
             if device.device_kind != self.devices.XOR:
@@ -254,12 +382,13 @@ class Network:
                 output_signal = self.devices.HIGH
 
         # Update and store the new signal
-        signal = self.get_output_signal(device_id, None)
+        signals = device.outputs.signals
+        position = device.outputs.port_index[None]
         target = output_signal
-        updated_signal = self.update_signal(signal, target)
+        updated_signal = self.update_signal(signals[position], target)
         if updated_signal is None:  # if the update is unsuccessful
             return False
-        device.outputs[None] = updated_signal
+        signals[position] = updated_signal
         return True
 
     def execute_d_type(self, device_id):
@@ -267,12 +396,15 @@ class Network:
 
         Return True if successful.
         """
-        device = self.devices.get_device(device_id)
+        devices_dictionary = self.devices.devices_dictionary
+        device = devices_dictionary[device_id]
 
-        for input_id in device.inputs:
-            input_signal = self.get_input_signal(device_id, input_id)
-            if input_signal is None:  # if the input is unconnected
+        for input_id, connected_output in device.inputs.items():
+            if connected_output is None:  # if the input is unconnected
                 return False
+            (output_device_id, output_port_id) = connected_output
+            outputs = devices_dictionary[output_device_id].outputs
+            input_signal = outputs.signals[outputs.port_index[output_port_id]]
             if input_id == self.devices.CLK_ID:
                 clock_signal = input_signal
             elif input_id == self.devices.DATA_ID:
@@ -293,11 +425,15 @@ class Network:
         if clear_signal == self.devices.HIGH:
             device.dtype_memory = self.devices.LOW
 
-        if self.devices.Q_ID not in device.outputs:
-            if self.devices.QBAR_ID not in device.outputs:
+        port_index = device.outputs.port_index
+        if self.devices.Q_ID not in port_index:
+            if self.devices.QBAR_ID not in port_index:
                 return False
-        Q_signal = device.outputs[self.devices.Q_ID]
-        QBAR_signal = device.outputs[self.devices.QBAR_ID]
+        signals = device.outputs.signals
+        Q_position = port_index[self.devices.Q_ID]
+        QBAR_position = port_index[self.devices.QBAR_ID]
+        Q_signal = signals[Q_position]
+        QBAR_signal = signals[QBAR_position]
 
         # Update the output towards its memory
         new_Q = self.update_signal(Q_signal, device.dtype_memory)
@@ -305,8 +441,8 @@ class Network:
                                       self.invert_signal(device.dtype_memory))
         if new_Q is None or new_QBAR is None:  # if the update is unsuccessful
             return False
-        device.outputs[self.devices.Q_ID] = new_Q
-        device.outputs[self.devices.QBAR_ID] = new_QBAR
+        signals[Q_position] = new_Q
+        signals[QBAR_position] = new_QBAR
 
         return True
 
@@ -377,12 +513,12 @@ class Network:
     # All siggen logic is here, no need to 'execute'
     def update_siggen(self):
         """If it is time to do so, update siggen."""
-        sig_devices = self.devices.find_devices(self.devices.SIGGEN)
+        sig_devices = self.devices.devices_by_kind.get(self.devices.SIGGEN, [])
 
         # Update to next value in waveform, periodic
 
         for device_id in sig_devices:
-            device = self.devices.get_device(device_id)
+            device = self.devices.devices_dictionary[device_id]
 
             output_signal = int(device.waveform[device.sig_counter])
 
@@ -394,10 +530,10 @@ class Network:
 
     def update_rc(self):
         """If it is time to do so, set RC to fall."""
-        RC_devices = self.devices.find_devices(self.devices.RC)
+        RC_devices = self.devices.devices_by_kind.get(self.devices.RC, [])
 
         for device_id in RC_devices:
-            device = self.devices.get_device(device_id)
+            device = self.devices.devices_dictionary[device_id]
             if device.RC_counter == device.duration:
                 output_signal = self.get_output_signal(device_id,
                                                        output_id=None)
@@ -406,9 +542,10 @@ class Network:
 
     def update_clocks(self):
         """If it is time to do so, set clock signals to RISING or FALLING."""
-        clock_devices = self.devices.find_devices(self.devices.CLOCK)
+        clock_devices = self.devices.devices_by_kind.get(self.devices.CLOCK,
+                                                         [])
         for device_id in clock_devices:
-            device = self.devices.get_device(device_id)
+            device = self.devices.devices_dictionary[device_id]
             if device.clock_counter == device.clock_half_period:
                 device.clock_counter = 0
                 output_signal = self.get_output_signal(device_id,
@@ -424,64 +561,582 @@ class Network:
 
         Return True if successful and the network does not oscillate.
         """
-        clock_devices = self.devices.find_devices(self.devices.CLOCK)
-        switch_devices = self.devices.find_devices(self.devices.SWITCH)
-        d_type_devices = self.devices.find_devices(self.devices.D_TYPE)
-        siggen_devices = self.devices.find_devices(self.devices.SIGGEN)
-        rc_devices = self.devices.find_devices(self.devices.RC)
-        and_devices = self.devices.find_devices(self.devices.AND)
-        or_devices = self.devices.find_devices(self.devices.OR)
-        nand_devices = self.devices.find_devices(self.devices.NAND)
-        nor_devices = self.devices.find_devices(self.devices.NOR)
-        xor_devices = self.devices.find_devices(self.devices.XOR)
+        if self.engine == self.LEVELIZED:
+            return self.execute_levelized_network()
+        elif self.engine == self.EVENT_DRIVEN:
+            return self.execute_event_network()
+        elif self.engine == self.VECTORIZED:
+            return self.vector_engine.execute_network()
+        elif self.engine == self.GENERATED:
+            return self.code_generator.execute_network()
+
+        if self.schedule is None:
+            self.compile_network()
 
         # This sets clock signals to RISING or FALLING, where necessary
         self.update_clocks()
         self.update_rc()
         self.update_siggen()
 
-        # Number of iterations to wait for the signals to settle before
-        # declaring the network unstable
-        iteration_limit = 20
+        if self.settle_devices(self.devices.devices_list,
+                               self.execute_iteration):
+            return True
+        # Devices outside feedback loops only change with the loops that drive
+        # them, so they are not reported if a loop is found
+        loop_ids = [device_id for device_id in self.oscillating_devices
+                    if device_id in self.feedback_loop_ids]
+        if loop_ids:
+            self.oscillating_devices = loop_ids
+        return False
+
+    def get_oscillating_names(self):
+        """Return the names of the oscillating devices as one string.
+
+        The names are those of oscillating_devices, separated by commas.
+        """
+        return ", ".join(self.names.get_name_string(device_id)
+                         for device_id in self.oscillating_devices)
 
-        iterations = 0
-        while iterations < iteration_limit:
-            iterations += 1
-            self.steady_state = True
+    def execute_iteration(self):
+        """Execute every device once, grouped by device kind.
 
-            for device_id in switch_devices:  # execute switch devices
-                if not self.execute_switch(device_id):
-                    return False
-            # Execute D-type devices before clocks to catch the rising edge of
-            # the clock
-            for device_id in d_type_devices:  # execute DTYPE devices
-                if not self.execute_d_type(device_id):
-                    return False
-            for device_id in clock_devices:  # complete clock executions
-                if not self.execute_clock(device_id):
-                    return False
-            for device_id in rc_devices:    # complete rc executions
-                if not self.execute_rc(device_id):
-                    return False
-            for device_id in and_devices:  # execute AND gate devices
-                if not self.execute_gate(device_id, self.devices.HIGH,
-                                         self.devices.HIGH):
-                    return False
-            for device_id in or_devices:  # execute OR gate devices
-                if not self.execute_gate(device_id, self.devices.LOW,
-                                         self.devices.LOW):
-                    return False
-            for device_id in nand_devices:  # execute NAND gate devices
-                if not self.execute_gate(device_id, self.devices.HIGH,
-                                         self.devices.LOW):
-                    return False
-            for device_id in nor_devices:  # execute NOR gate devices
-                if not self.execute_gate(device_id, self.devices.LOW,
-                                         self.devices.HIGH):
-                    return False
-            for device_id in xor_devices:  # execute XOR devices
-                if not self.execute_gate(device_id, None, None):
+        Used by the iterative engine. Return True if successful.
+        """
+        devices_by_kind = self.devices.devices_by_kind
+
+        for device_id in devices_by_kind.get(self.devices.SWITCH, []):
+            if not self.execute_switch(device_id):  # execute switch devices
+                return False
+        # Execute D-type devices before clocks to catch the rising edge of
+        # the clock
+        for device_id in devices_by_kind.get(self.devices.D_TYPE, []):
+            if not self.execute_d_type(device_id):  # execute DTYPE devices
+                return False
+        for device_id in devices_by_kind.get(self.devices.CLOCK, []):
+            if not self.execute_clock(device_id):  # complete clock executions
+                return False
+        for device_id in devices_by_kind.get(self.devices.RC, []):
+            if not self.execute_rc(device_id):  # complete rc executions
+                return False
+        for device_kind in [self.devices.AND, self.devices.OR,
+                            self.devices.NAND, self.devices.NOR]:
+            (x, y) = self.gate_rules[device_kind]
+            for device_id in devices_by_kind.get(device_kind, []):
+                if not self.execute_gate(device_id, x, y):  # execute gates
                     return False
+        for device_id in devices_by_kind.get(self.devices.XOR, []):
+            if not self.execute_gate(device_id, None, None):  # execute XORs
+                return False
+        return True
+
+    def get_iteration_limit(self):
+        """Return the number of iterations allowed for the signals to settle.
+
+        This is iteration_limit if it is set. Otherwise it is sized from the
+        compiled netlist: a change takes up to two iterations to pass each
+        level and each device of a feedback loop (through RISING or FALLING),
+        and 20 more iterations are allowed for clocks, RC devices and siggens.
+        """
+        if self.iteration_limit is not None:
+            return self.iteration_limit
+        if self.schedule is None:
+            self.compile_network()
+        return 2 * (self.network_depth + len(self.feedback_loop_ids)) + 20
+
+    def get_state_hash(self, device_list):
+        """Return a hash of the output signals and memories of the devices."""
+        state = []
+        for device in device_list:
+            state.extend(device.outputs.signals)
+            state.append(device.dtype_memory)
+        return hash(tuple(state))
+
+    def find_changing_devices(self, device_list, execute_once, iterations):
+        """Return the IDs of the devices whose outputs change.
+
+        execute_once is called iterations times, and the outputs of
+        device_list are compared before and after each call.
+        """
+        changing_ids = set()
+        for iteration in range(iterations):
+            old_signals = [tuple(device.outputs.signals)
+                           for device in device_list]
+            if not execute_once():
+                break
+            for device, signals in zip(device_list, old_signals):
+                if tuple(device.outputs.signals) != signals:
+                    changing_ids.add(device.device_id)
+        return [device.device_id for device in device_list
+                if device.device_id in changing_ids]
+
+    def settle_devices(self, device_list, execute_once):
+        """Call execute_once until the signals of device_list settle.
+
+        execute_once runs the devices once and returns True if successful. The
+        state of the devices is hashed after each call, and if a state repeats
+        the devices oscillate, as every call after it will repeat. The devices
+        that change in one period are then stored in oscillating_devices, as
+        are the devices still changing after get_iteration_limit() calls.
+        Return True if successful and the signals settle.
+        """
+        self.oscillating_devices = []
+        state_iterations = {}  # {state hash: iteration it was first seen}
+        for iteration in range(self.get_iteration_limit()):
+            self.steady_state = True
+            if not execute_once():
+                return False
             if self.steady_state:
+                return True
+
+            state_hash = self.get_state_hash(device_list)
+            if state_hash in state_iterations:
+                period = iteration - state_iterations[state_hash]
+                self.oscillating_devices = self.find_changing_devices(
+                    device_list, execute_once, period)
+                return False
+            state_iterations[state_hash] = iteration
+
+        self.oscillating_devices = self.find_changing_devices(
+            device_list, execute_once, 1)
+        return False
+
+    def set_engine(self, engine):
+        """Select how execute_network simulates a cycle.
+
+        ITERATIVE runs every device until the signals settle. LEVELIZED runs
+        each device once in the order given by compile_network, iterating only
+        within feedback loops. EVENT_DRIVEN follows the same order but only
+        runs devices whose inputs have changed. VECTORIZED evaluates all the
+        gates at once with NumPy arrays. GENERATED runs a Python function
+        generated for the network. Return True if successful, or False if the
+        engine is invalid or NumPy is not installed.
+
+        The engines other than ITERATIVE evaluate each device from the settled
+        levels of the cycle, with no gate delays. ITERATIVE moves signals one
+        step per iteration, so while the gates settle a D-type may see a short
+        pulse at its SET or CLEAR input and store it. Circuits with such
+        hazards can then differ between ITERATIVE and the other engines,
+        which agree with each other.
+        """
+        if engine not in self.engine_types:
+            return False
+        if engine == self.VECTORIZED:
+            try:
+                from vectorsim import VectorEngine
+            except ImportError:  # NumPy is not installed
+                return False
+            self.vector_engine = VectorEngine(self.names, self.devices, self)
+        elif engine == self.GENERATED:
+            self.code_generator = CodeGenerator(self.names, self.devices, self)
+        # The other engines may have changed the signals since the event-driven
+        # engine last ran, so every device runs in its next cycle
+        self.source_levels = None
+        self.engine = engine
+        return True
+
+    def get_strong_components(self, device_ids, successors):
+        """Return the strongly connected components of a graph.
+
+        successors maps each of device_ids to the device IDs it drives. The
+        components are returned in topological order, so every device comes
+        after the devices that drive it unless they are in the same component.
+        """
+        index = {}
+        low_link = {}
+        stack = []
+        on_stack = set()
+        components = []
+
+        for root_id in device_ids:
+            if root_id in index:
+                continue
+            index[root_id] = low_link[root_id] = len(index)
+            stack.append(root_id)
+            on_stack.add(root_id)
+            work = [(root_id, iter(successors[root_id]))]
+
+            # Depth-first search with an explicit stack (Tarjan's algorithm),
+            # as long chains of gates would exceed the recursion limit
+            while work:
+                device_id, children = work[-1]
+                for child_id in children:
+                    if child_id not in index:
+                        index[child_id] = low_link[child_id] = len(index)
+                        stack.append(child_id)
+                        on_stack.add(child_id)
+                        work.append((child_id, iter(successors[child_id])))
+                        break
+                    elif child_id in on_stack:
+                        low_link[device_id] = min(low_link[device_id],
+                                                  index[child_id])
+                else:
+                    work.pop()
+                    if work:
+                        parent_id = work[-1][0]
+                        low_link[parent_id] = min(low_link[parent_id],
+                                                  low_link[device_id])
+                    if low_link[device_id] == index[device_id]:
+                        component = []
+                        while True:
+                            member_id = stack.pop()
+                            on_stack.discard(member_id)
+                            component.append(member_id)
+                            if member_id == device_id:
+                                break
+                        components.append(component)
+
+        # Tarjan's algorithm finds the components in reverse topological order
+        components.reverse()
+        return components
+
+    def compile_network(self):
+        """Build the levelized evaluation schedule from the connections.
+
+        Switches, D-types and gates are grouped into strongly connected
+        components and given a level one above the highest level driving
+        them. Clocks, RC devices and siggens are set by update_clocks,
+        update_rc and update_siggen, so they are not scheduled.
+        """
+        scheduled_kinds = set(self.devices.gate_types)
+        scheduled_kinds.update([self.devices.SWITCH, self.devices.D_TYPE])
+
+        position = {}  # {device_id: position in devices_list}
+        successors = {}
+        for device in self.devices.devices_list:
+            if device.device_kind in scheduled_kinds:
+                position[device.device_id] = len(position)
+                successors[device.device_id] = []
+
+        devices_dictionary = self.devices.devices_dictionary
+        self_loops = set()
+        self.input_sources = {}
+        for device_id in successors:
+            device = devices_dictionary[device_id]
+            sources = self.input_sources[device_id] = []
+            for input_id, connected_output in device.inputs.items():
+                if connected_output is None:
+                    sources.append((input_id, None, None))
+                    continue
+                (driver_id, output_id) = connected_output
+                outputs = devices_dictionary[driver_id].outputs
+                sources.append((input_id, outputs.signals,
+                                outputs.port_index[output_id]))
+                if driver_id in successors:
+                    successors[driver_id].append(device_id)
+                    if driver_id == device_id:
+                        self_loops.add(device_id)
+
+        components = self.get_strong_components(list(successors), successors)
+        component_index = {}
+        for number, component in enumerate(components):
+            component.sort(key=position.get)
+            for device_id in component:
+                component_index[device_id] = number
+
+        # Components are in topological order, so each level is final by the
+        # time it is propagated to the components it drives
+        levels = [0] * len(components)
+        for number, component in enumerate(components):
+            for device_id in component:
+                for successor_id in successors[device_id]:
+                    successor_number = component_index[successor_id]
+                    if successor_number != number:
+                        levels[successor_number] = max(
+                            levels[successor_number], levels[number] + 1)
+
+        order = sorted(range(len(components)), key=levels.__getitem__)
+        self.schedule = []
+        self.schedule_levels = [levels[number] for number in order]
+        for number in order:
+            component = components[number]
+            is_feedback_loop = (len(component) > 1 or
+                                component[0] in self_loops)
+            self.schedule.append((component, is_feedback_loop))
+        self.network_depth = max(levels) + 1 if levels else 0
+        self.feedback_loop_ids = set()
+        for device_id_list, is_feedback_loop in self.schedule:
+            if is_feedback_loop:
+                self.feedback_loop_ids.update(device_id_list)
+
+        self.device_ranks = {}
+        for device_id_list, is_feedback_loop in self.schedule:
+            for device_id in device_id_list:
+                self.device_ranks[device_id] = len(self.device_ranks)
+
+        self.fanout_devices = {}
+        for connected_output, fanout_list in self.fanout.items():
+            fanout_ids = []
+            for device_id, input_id in fanout_list:
+                if device_id in self.device_ranks and \
+                        device_id not in fanout_ids:
+                    fanout_ids.append(device_id)
+            self.fanout_devices[connected_output] = fanout_ids
+        self.source_levels = None  # every device runs in the next cycle
+        return True
+
+    def get_feedback_loop(self, device_id):
+        """Return the IDs of the devices in the feedback loop of device_id.
+
+        Return [device_id] if the device is not in a feedback loop.
+        """
+        if self.schedule is None:
+            self.compile_network()
+        for device_id_list, is_feedback_loop in self.schedule:
+            if device_id in device_id_list:
+                return list(device_id_list)
+        return [device_id]
+
+    def get_signal_level(self, signal):
+        """Return the level, HIGH or LOW, that the signal is at or moving to.
+
+        Return None if the signal is not a valid signal.
+        """
+        if signal in [self.devices.HIGH, self.devices.RISING]:
+            return self.devices.HIGH
+        elif signal in [self.devices.LOW, self.devices.FALLING]:
+            return self.devices.LOW
+        else:
+            return None
+
+    def settle_signal(self, signal, target):
+        """Set the signal level to the target in one step.
+
+        The result is RISING or FALLING if the target differs from the level
+        the signal had at the start of the cycle, so that D-types still see
+        the edge. Set steady_state to False if the level changes. Return None
+        if the signal is not a valid signal.
+        """
+        if signal in [self.devices.LOW, self.devices.RISING]:
+            start_level = self.devices.LOW
+        elif signal in [self.devices.HIGH, self.devices.FALLING]:
+            start_level = self.devices.HIGH
+        else:
+            return None
+
+        if target == start_level:
+            new_signal = target
+        elif target == self.devices.HIGH:
+            new_signal = self.devices.RISING
+        else:
+            new_signal = self.devices.FALLING
+
+        if self.get_signal_level(new_signal) != self.get_signal_level(signal):
+            self.steady_state = False
+        return new_signal
+
+    def evaluate_device(self, device_id):
+        """Evaluate a device once from the levels at its inputs.
+
+        Used by the levelized and event-driven engines, and only for devices
+        in the compiled schedule. Return True if successful.
+        """
+        device = self.devices.devices_dictionary[device_id]
+
+        input_signals = {}
+        for input_id, signals, position in self.input_sources[device_id]:
+            if signals is None:  # this input is unconnected
+                return False
+            input_signals[input_id] = signals[position]
+
+        if device.device_kind in self.gate_rules:
+            (x, y) = self.gate_rules[device.device_kind]
+            output_signal = y
+            for input_signal in input_signals.values():
+                if self.get_signal_level(input_signal) != x:
+                    output_signal = self.invert_signal(y)
+                    break
+            targets = {None: output_signal}
+
+        elif device.device_kind == self.devices.XOR:
+            [first_level, second_level] = [
+                self.get_signal_level(input_signal)
+                for input_signal in input_signals.values()]
+            if first_level == second_level:
+                targets = {None: self.devices.LOW}
+            else:
+                targets = {None: self.devices.HIGH}
+
+        elif device.device_kind == self.devices.D_TYPE:
+            # On a clock edge, store the data level from the start of the
+            # cycle, as the iterative engine does
+            if input_signals[self.devices.CLK_ID] == self.devices.RISING:
+                data_signal = input_signals[self.devices.DATA_ID]
+                if data_signal in [self.devices.HIGH, self.devices.FALLING]:
+                    device.dtype_memory = self.devices.HIGH
+                elif data_signal in [self.devices.LOW, self.devices.RISING]:
+                    device.dtype_memory = self.devices.LOW
+            if self.get_signal_level(input_signals[self.devices.SET_ID]) \
+                    == self.devices.HIGH:
+                device.dtype_memory = self.devices.HIGH
+            if self.get_signal_level(input_signals[self.devices.CLEAR_ID]) \
+                    == self.devices.HIGH:
+                device.dtype_memory = self.devices.LOW
+            targets = {self.devices.Q_ID: device.dtype_memory,
+                       self.devices.QBAR_ID:
+                       self.invert_signal(device.dtype_memory)}
+
+        elif device.device_kind == self.devices.SWITCH:
+            targets = {None: device.switch_state}
+
+        else:  # clocks, RC devices and siggens are set by the update methods
+            return True
+
+        signals = device.outputs.signals
+        port_index = device.outputs.port_index
+        for output_id, target in targets.items():
+            position = port_index[output_id]
+            new_signal = self.settle_signal(signals[position], target)
+            if new_signal is None:  # if the update is unsuccessful
+                return False
+            signals[position] = new_signal
+        return True
+
+    def evaluate_devices(self, device_id_list):
+        """Evaluate each device in device_id_list once, in order.
+
+        Return True if successful.
+        """
+        for device_id in device_id_list:
+            if not self.evaluate_device(device_id):
+                return False
+        return True
+
+    def finalise_signals(self, device_ids=None):
+        """Settle the RISING and FALLING signals to HIGH and LOW.
+
+        Only the outputs of device_ids are settled, or every output if
+        device_ids is None.
+        """
+        if device_ids is None:
+            device_list = self.devices.devices_list
+        else:
+            device_list = [self.devices.devices_dictionary[device_id]
+                           for device_id in device_ids]
+        RISING = self.devices.RISING
+        FALLING = self.devices.FALLING
+        for device in device_list:
+            signals = device.outputs.signals
+            for position, signal in enumerate(signals):
+                if signal == RISING:
+                    signals[position] = self.devices.HIGH
+                elif signal == FALLING:
+                    signals[position] = self.devices.LOW
+
+    def execute_levelized_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        Each device is evaluated once, in the order of the compiled schedule.
+        Devices in a feedback loop are evaluated together until their signals
+        settle. Return True if successful and the network does not oscillate.
+        """
+        if self.schedule is None:
+            self.compile_network()
+
+        self.update_clocks()
+        self.update_rc()
+        self.update_siggen()
+
+        devices_dictionary = self.devices.devices_dictionary
+        for device_id_list, is_feedback_loop in self.schedule:
+            if not is_feedback_loop:
+                if not self.evaluate_device(device_id_list[0]):
+                    return False
+                continue
+
+            loop_devices = [devices_dictionary[device_id]
+                            for device_id in device_id_list]
+            if not self.settle_devices(
+                    loop_devices,
+                    lambda: self.evaluate_devices(device_id_list)):
+                return False
+
+        self.steady_state = True
+        self.finalise_signals()
+        return True
+
+    def execute_event_network(self):
+        """Execute the devices whose inputs have changed for one cycle.
+
+        Switches and D-types run every cycle. Other devices run only when the
+        level of an output they are connected to changes, in the order of the
+        compiled schedule, until no more changes are pending. Every device
+        runs in the first cycle after compiling, and in the cycle after one
+        that fails, so a broken network keeps failing. Return True if
+        successful and the network does not oscillate.
+        """
+        if self.schedule is None:
+            self.compile_network()
+        devices_dictionary = self.devices.devices_dictionary
+        devices_by_kind = self.devices.devices_by_kind
+
+        self.update_clocks()
+        self.update_rc()
+        self.update_siggen()
+
+        if self.source_levels is None:  # first cycle since compiling
+            self.source_levels = {}
+            pending = set(self.device_ranks)
+        else:
+            pending = set(devices_by_kind.get(self.devices.SWITCH, []))
+            pending.update(devices_by_kind.get(self.devices.D_TYPE, []))
+
+        changed_sources = []
+        for device_kind in [self.devices.CLOCK, self.devices.RC,
+                            self.devices.SIGGEN]:
+            for device_id in devices_by_kind.get(device_kind, []):
+                level = self.get_signal_level(
+                    devices_dictionary[device_id].outputs[None])
+                if self.source_levels.get(device_id) != level:
+                    self.source_levels[device_id] = level
+                    changed_sources.append(device_id)
+                    pending.update(self.fanout_devices.get((device_id, None),
+                                                           []))
+
+        queue = [(self.device_ranks[device_id], device_id)
+                 for device_id in pending]
+        heapq.heapify(queue)
+
+        # Number of times a device may run in one cycle before declaring the
+        # network unstable
+        iteration_limit = self.get_iteration_limit()
+        self.oscillating_devices = []
+        evaluations = {}
+        success = True
+
+        while queue:
+            rank, device_id = heapq.heappop(queue)
+            pending.discard(device_id)
+            evaluations[device_id] = evaluations.get(device_id, 0) + 1
+            if evaluations[device_id] > iteration_limit:
+                self.oscillating_devices = self.get_feedback_loop(device_id)
+                success = False
                 break
-        return self.steady_state
+
+            device = devices_dictionary[device_id]
+            old_levels = [self.get_signal_level(signal)
+                          for signal in device.outputs.signals]
+            if not self.evaluate_device(device_id):
+                success = False
+                break
+
+            for output_id, signal, old_level in zip(
+                    device.outputs.port_ids, device.outputs.signals,
+                    old_levels):
+                if self.get_signal_level(signal) == old_level:
+                    continue
+                for fanout_id in self.fanout_devices.get(
+                        (device_id, output_id), []):
+                    if fanout_id not in pending:
+                        pending.add(fanout_id)
+                        heapq.heappush(queue, (self.device_ranks[fanout_id],
+                                               fanout_id))
+
+        self.finalise_signals(changed_sources)
+        self.finalise_signals(evaluations)
+        if not success:
+            # The pending and failed devices were not settled, so every device
+            # runs again in the next cycle
+            self.source_levels = None
+            return False
+        self.steady_state = True
+        return True
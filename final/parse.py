@@ -10,8 +10,7 @@ Parser - parses the definition file and builds the logic network.
 """
 
 from errors import *
-import wx
-import builtins
+from scanner import install_translation
 
 
 class Parser:
@@ -70,13 +69,16 @@ class Parser:
         self.CONNECTIONS_found = False
         self.MONITORS_found = False
 
-        self.all_devices_list = []
-        self.all_cons_list = []
-        self.all_monitors_list = []
-        self.does_not_exist_list = []
+        # Names seen so far, stored as {name: None} so that membership checks
+        # take constant time while the names stay in the order they were found
+        self.all_devices = {}
+        self.all_cons = {}
+        self.all_monitors = {}
+        self.does_not_exist = {}
 
-        # Internationalisation ?
-        builtins._ = wx.GetTranslation
+        # Internationalisation, with gettext unless the GUI has installed
+        # wx.GetTranslation
+        install_translation()
 
     def parse_network(self):
         """Parse the circuit definition file.
@@ -162,6 +164,9 @@ class Parser:
                 self.scanner.display_error(
                     SyntaxError, _("Expected a header"), ["]", ""])
 
+        if self.scanner.error_count == 0:
+            # The network is exactly what the file describes
+            self.network.definition_hash = self.scanner.file_hash
         return True
 
     def parse_section(self, header_ID):
@@ -219,14 +224,14 @@ class Parser:
         if self.symbol.type == self.scanner.NAME:
             device_name = self.scanner.names.get_name_string(
                 self.symbol.id)
-            if device_name in self.all_devices_list:
+            if device_name in self.all_devices:
                 self.scanner.display_error(
                     SemanticError, _("Device name '{}' has already "
                                      "been assigned.").format(device_name))
                 return True
 
             device_name_list.append(device_name)
-            self.all_devices_list.append(device_name)
+            self.all_devices[device_name] = None
 
         elif self.symbol.type == self.scanner.CLOSE_SQUARE:
             return False
@@ -281,7 +286,7 @@ class Parser:
                 if self.symbol.type == self.scanner.NAME:
                     device_name = self.scanner.names.get_name_string(
                         self.symbol.id)
-                    if device_name in self.all_devices_list:
+                    if device_name in self.all_devices:
                         self.scanner.display_error(
                             SemanticError, _("Device name '{}' has already "
                                              "been assigned.").format(
@@ -290,7 +295,7 @@ class Parser:
                         return True
 
                     device_name_list.append(device_name)
-                    self.all_devices_list.append(device_name)
+                    self.all_devices[device_name] = None
 
                 else:
                     # Some error message about invalid symbols
@@ -490,11 +495,9 @@ class Parser:
             return True
 
         if self.symbol.type == self.scanner.CLOSE_SQUARE:
-            device_names_to_check = self.list_of_connected_devices()
-            for con_name in self.all_cons_list:
-                if con_name in device_names_to_check:
-                    device_names_to_check.pop(
-                        device_names_to_check.index(con_name))
+            device_names_to_check = [
+                name for name in self.list_of_connected_devices()
+                if name not in self.all_cons]
 
             undefined_connections = ', '.join(device_names_to_check)
 
@@ -527,7 +530,7 @@ class Parser:
             self.con_device = self.devices.get_device(self.symbol.id)
             con_device_name = self.names.get_name_string(self.symbol.id)
 
-            if con_device_name in self.all_cons_list:
+            if con_device_name in self.all_cons:
                 self.scanner.display_error(
                     ConnectionError, _("Connections for device '{}' already "
                                        "assigned.").format(con_device_name),
@@ -535,10 +538,10 @@ class Parser:
                 return True
 
             if self.con_device is None:
-                if con_device_name not in self.does_not_exist_list:
+                if con_device_name not in self.does_not_exist:
 
                     # Prevent showing follow on errors if device does not exist
-                    self.does_not_exist_list.append(con_device_name)
+                    self.does_not_exist[con_device_name] = None
                     self.scanner.display_error(
                         SemanticError, _("Device '{}' does not exist.")
                         .format(con_device_name),
@@ -546,7 +549,7 @@ class Parser:
 
                     return True
 
-            self.all_cons_list.append(con_device_name)
+            self.all_cons[con_device_name] = None
         else:
             self.scanner.display_error(
                 SyntaxError, _("Expected a device name after the "
@@ -617,7 +620,7 @@ class Parser:
         if self.symbol.type == self.scanner.NAME:
             self.monitor_device = self.devices.get_device(self.symbol.id)
             monitor_device_name = self.names.get_name_string(self.symbol.id)
-            if monitor_device_name in self.all_monitors_list:
+            if monitor_device_name in self.all_monitors:
                 self.scanner.display_error(
                     SemanticError, _("Device '{}' already assigned for "
                                      "monitoring.").format(
@@ -625,7 +628,7 @@ class Parser:
 
                 return True
 
-            self.all_monitors_list.append(monitor_device_name)
+            self.all_monitors[monitor_device_name] = None
 
             # CHECK for ID error, if none, proceed to fetch device object
             if self.symbol.id is None:
@@ -639,7 +642,7 @@ class Parser:
 
             # CHECK for device - get_device returns None for invalid device_id
             if device is None:
-                if name not in self.does_not_exist_list:
+                if name not in self.does_not_exist:
 
                     self.scanner.display_error(
                         SemanticError, _("%s is not a valid device.") % name)
@@ -744,8 +747,8 @@ class Parser:
         start_con_name = self.names.get_name_string(self.symbol.id)
 
         if start_con is None:
-            if start_con_name not in self.does_not_exist_list:
-                self.does_not_exist_list.append(start_con_name)
+            if start_con_name not in self.does_not_exist:
+                self.does_not_exist[start_con_name] = None
 
                 self.scanner.display_error(
                     SemanticError, _("Device '{}' does not exist.").format
@@ -809,8 +812,8 @@ class Parser:
         end_con_name = self.names.get_name_string(self.symbol.id)
 
         if end_con is None:
-            if end_con_name not in self.does_not_exist_list:
-                self.does_not_exist_list.append(end_con_name)
+            if end_con_name not in self.does_not_exist:
+                self.does_not_exist[end_con_name] = None
 
                 self.scanner.display_error(
                     SemanticError, _("Device '{}' does not exist.").format
@@ -902,7 +905,7 @@ class Parser:
         devices_with_no_inputs = [self.devices.SWITCH, self.devices.CLOCK,
                                   self.devices.SIGGEN, self.devices.RC]
 
-        device_ids = self.names.lookup(self.all_devices_list)
+        device_ids = self.names.lookup(list(self.all_devices))
         check_device_ids = []
         for check_id in device_ids:
             if self.devices.get_device(check_id) is not None:
@@ -918,7 +921,7 @@ class Parser:
         """Generate a list of made device objects."""
         device_object_list = []
 
-        device_ids = self.names.lookup(self.all_devices_list)
+        device_ids = self.names.lookup(list(self.all_devices))
         for device_id in device_ids:
             if self.devices.get_device(device_id) is not None:
                 device_object = self.devices.get_device(device_id)
@@ -7,10 +7,37 @@ Classes
 -------
 Scanner - reads definition file and translates characters into symbols.
 Symbol - encapsulates a symbol and stores its properties.
+
+Functions
+---------
+install_translation(): Installs gettext's translation function as _ if no
+                       translation function is installed.
 """
+import bisect
+import builtins
+import gettext
+import hashlib
+import io
+import os
+
 from errors import *
 
 
+def install_translation():
+    """Install gettext's translation function as _ if none is installed.
+
+    The GUI installs wx.GetTranslation as _ before any file is scanned, so
+    this only takes effect without the GUI. Translations are read from the
+    messages catalogs in the locale directory, for the language given by the
+    LANGUAGE, LC_ALL, LC_MESSAGES or LANG environment variables.
+    """
+    if not callable(getattr(builtins, "_", None)):
+        locale_directory = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "locale")
+        gettext.translation("messages", locale_directory,
+                            fallback=True).install()
+
+
 class Symbol:
 
     """Encapsulate a symbol and store its properties.
@@ -24,6 +51,8 @@ class Symbol:
     No public methods.
     """
 
+    __slots__ = ("type", "id")
+
     def __init__(self):
         """Initialise symbol properties."""
         self.type = None
@@ -53,6 +82,15 @@ class Scanner:
 
     advance(self): Advances to next character.
 
+    advance_to(self, index): Advances until the current character is the one
+                             at index in the file.
+
+    current_line: Line number of the current character, counting from 0.
+
+    current_character_number: Position of the current character in its line,
+                              counting from 1, with tabs advancing to the next
+                              multiple of 4.
+
     get_name(self): Returns whole word when the current character is a letter.
 
     get_number(self): Returns whole number when the current character is a
@@ -66,16 +104,34 @@ class Scanner:
 
     def __init__(self, path, names):
         """Open specified file and initialise reserved words and IDs."""
+        install_translation()  # error messages are translated with _
 
-        # Open file
+        # Read the whole file once. Decoding through a text wrapper gives the
+        # same characters and newlines as reading the file in text mode.
         try:
-            self.input_file = open(path, 'r')
+            with open(path, 'rb') as definition_file:
+                file_bytes = definition_file.read()
         except FileNotFoundError:
             raise FileNotFoundError('Error: No such file in current directory')
             sys.exit()
+        self.file_text = io.TextIOWrapper(io.BytesIO(file_bytes)).read()
+        self.file_position = 0  # index of the next character to read
+
+        # Index of the first character of each line, used to work out the
+        # line and character numbers from file_position
+        self.line_starts = [0]
+        line_break = self.file_text.find('\n')
+        while line_break != -1:
+            self.line_starts.append(line_break + 1)
+            line_break = self.file_text.find('\n', line_break + 1)
+
+        # Hash of the file contents, used to cache work done for this file
+        self.file_hash = hashlib.sha256(file_bytes).hexdigest()
 
         # Create list of each file line
-        self.file_as_list = [line.rstrip('\n') for line in open(path, 'r')]
+        self.file_as_list = self.file_text.split('\n')
+        if self.file_as_list[-1] == '':  # no line after the last line break
+            self.file_as_list.pop()
 
         # Initialise symbol types
         self.names = names
@@ -101,8 +157,6 @@ class Scanner:
         self.monitor_all = ['all']
 
         self.current_character = ' '
-        self.current_line = 0
-        self.current_character_number = 0
         self.error_count = 0
         self.error_list = []
         self.error = False
@@ -237,53 +291,84 @@ class Scanner:
     def skip_spaces(self):
         """ Advance until non space symbol is encountered """
 
-        while self.current_character.isspace():
-            self.current_character = self.advance()
+        if self.current_character.isspace():
+            file_text = self.file_text
+            end = self.file_position
+            while file_text[end:end + 1].isspace():
+                end += 1
+            self.advance_to(end)
 
     def advance(self):
         """ Advance to next character """
 
-        # first check if on new line
-
-        if self.current_character == '\n':
-            self.current_line += 1
-            self.current_character_number = 0
+        # read next character in definition file, or '' at the end
+        position = self.file_position
+        self.current_character = self.file_text[position:position + 1]
+        self.file_position = position + 1
 
-        # check if on tab (only applies to certain text editors)
+        return self.current_character
 
-        if self.current_character == '\t':
-            while (self.current_character_number % 4) != 0:
-                self.current_character_number += 1
+    def advance_to(self, index):
+        """ Advance until the current character is the one at index """
 
-        # now read next character in definition file
-        self.current_character = self.input_file.read(1)
-        self.current_character_number += 1
+        self.current_character = self.file_text[index:index + 1]
+        self.file_position = index + 1
 
         return self.current_character
 
+    @property
+    def current_line(self):
+        """ Line number of the current character, counting from 0 """
+
+        index = self.file_position - 1
+        if index < 0:  # still on the space before the first character
+            return 0
+        return bisect.bisect_right(self.line_starts, index) - 1
+
+    @property
+    def current_character_number(self):
+        """ Position of the current character in its line, counting from 1.
+        A tab advances the count to the next multiple of 4 (only applies to
+        certain text editors). Positions after the end of the file keep
+        counting up. """
+
+        index = self.file_position - 1
+        if index < 0:  # still on the space before the first character
+            return 0
+        line_start = self.line_starts[self.current_line]
+        passed = self.file_text[line_start:index]
+
+        character_number = 1
+        if '\t' in passed:
+            for character in passed:
+                if character == '\t':
+                    while (character_number % 4) != 0:
+                        character_number += 1
+                character_number += 1
+            return character_number + index - line_start - len(passed)
+        return character_number + index - line_start
+
     def get_name(self):
         """" When current character is a letter, return whole word """
 
-        name = self.current_character
-
-        while True:
-            self.current_character = self.advance()
-            if self.current_character.isalnum():
-                name = name + self.current_character
-            else:
-                return [name, self.current_character]
+        file_text = self.file_text
+        start = self.file_position - 1
+        end = self.file_position
+        while file_text[end:end + 1].isalnum():
+            end += 1
+        self.advance_to(end)
+        return [file_text[start:end], self.current_character]
 
     def get_number(self):
         """ When current character is a number, return whole number """
 
-        number = self.current_character
-
-        while True:
-            self.current_character = self.advance()
-            if self.current_character.isdigit():
-                number = number + self.current_character
-            else:
-                return [number, self.current_character]
+        file_text = self.file_text
+        start = self.file_position - 1
+        end = self.file_position
+        while file_text[end:end + 1].isdigit():
+            end += 1
+        self.advance_to(end)
+        return [file_text[start:end], self.current_character]
 
     def display_error(self, error_type, error_message='', stop=None):
         """ Error function to be called every time an error is found.
@@ -0,0 +1,148 @@
+"""Test the batch module."""
+import subprocess
+import sys
+
+import pytest
+
+import batch
+
+
+@pytest.fixture
+def definition_file(tmp_path, monkeypatch):
+    """Return the path of a definition file with a switch and a NAND gate."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "circuit.txt"
+    path.write_text("DEVICES [\n"
+                    "    SW1 = SWITCH 0;\n"
+                    "    G1 = NAND 1;\n"
+                    "]\n"
+                    "CONNECTIONS [\n"
+                    "    device G1 {\n"
+                    "        SW1 -> G1.I1;\n"
+                    "    }\n"
+                    "]\n"
+                    "MONITORS [\n"
+                    "    SW1, G1;\n"
+                    "]\n")
+    return str(path)
+
+
+def test_text_output(capsys, definition_file):
+    """Test if the traces are displayed after running with a switch set."""
+    assert batch.main(["-n", "4", "-s", "SW1=1", definition_file]) == 0
+    out, _ = capsys.readouterr()
+    assert out == "SW1: ----\nG1 : ____\n"
+
+
+def test_csv_output(tmp_path, definition_file):
+    """Test if each cycle is written as a row of the CSV file."""
+    path = tmp_path / "signals.csv"
+    assert batch.main(["-n", "3", "-f", "csv", "-o", str(path),
+                       "-e", "levelized", definition_file]) == 0
+    assert path.read_text().split("\n") == ["cycle,SW1,G1", "0,0,1",
+                                            "1,0,1", "2,0,1", ""]
+
+
+def test_vcd_output(tmp_path, definition_file):
+    """Test if a VCD file is written with the initial values."""
+    path = tmp_path / "signals.vcd"
+    assert batch.main(["-n", "100", "-f", "vcd", "-o", str(path),
+                       definition_file]) == 0
+    assert path.read_text().endswith("$dumpvars\n0!\n1\"\n$end\n#100\n")
+
+
+@pytest.mark.parametrize("seed_option", ["-r", "--seed"])
+def test_seed(capsys, tmp_path, monkeypatch, seed_option):
+    """Test if runs with the same seed start up the same way."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "clocks.txt"
+    path.write_text("DEVICES [\n"
+                    "    CLK1, CLK2, CLK3 = CLOCK 7;\n"
+                    "    D1 = DTYPE;\n"
+                    "    SW1 = SWITCH 0;\n"
+                    "]\n"
+                    "CONNECTIONS [\n"
+                    "    device D1 {\n"
+                    "        CLK1 -> D1.CLK;\n"
+                    "        CLK2 -> D1.DATA;\n"
+                    "        SW1 -> D1.SET;\n"
+                    "        SW1 -> D1.CLEAR;\n"
+                    "    }\n"
+                    "]\n"
+                    "MONITORS [\n"
+                    "    CLK1, CLK2, CLK3, D1.Q;\n"
+                    "]\n")
+    output_list = []
+    for _ in range(2):
+        assert batch.main(["-n", "30", seed_option, "42", str(path)]) == 0
+        out, _ = capsys.readouterr()
+        output_list.append(out)
+    assert output_list[0] == output_list[1]
+    assert output_list[0].startswith("CLK1")
+
+
+@pytest.mark.parametrize("arg_list, status", [
+    (["-s", "G1=1"], 1),
+    (["-s", "SW1"], 1),
+    (["-n", "x"], 2),
+    (["-f", "pdf"], 2),
+    (["-f", "vcd"], 2),
+    (["-r", "x"], 2),
+])
+def test_errors(capsys, definition_file, arg_list, status):
+    """Test if invalid options give the correct exit status."""
+    assert batch.main(arg_list + [definition_file]) == status
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err.startswith("Error")
+
+
+def test_missing_file(capsys, tmp_path):
+    """Test if a missing definition file is reported on stderr."""
+    assert batch.main([str(tmp_path / "missing.txt")]) == 1
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err.startswith("Error: cannot read")
+
+
+def test_no_gui_imports():
+    """Test if running the batch module does not import wx or OpenGL."""
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, batch; batch.main(['-h']); "
+         "print('wx' in sys.modules, 'OpenGL' in sys.modules)"],
+        capture_output=True, text=True, check=True)
+    assert result.stdout.endswith("False False\n")
+
+
+@pytest.mark.parametrize("format_args, output", [
+    ([], ""),
+    (["-f", "csv"], "cycle,G1\r\n"),
+])
+def test_oscillating_network(capsys, tmp_path, monkeypatch, format_args,
+                             output):
+    """Test if the devices of an oscillating loop are reported on stderr."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "ring.txt"
+    path.write_text("DEVICES [\n"
+                    "    G1, G2, G3 = NAND 1;\n"
+                    "]\n"
+                    "CONNECTIONS [\n"
+                    "    device G1 {\n"
+                    "        G3 -> G1.I1;\n"
+                    "    }\n"
+                    "    device G2 {\n"
+                    "        G1 -> G2.I1;\n"
+                    "    }\n"
+                    "    device G3 {\n"
+                    "        G2 -> G3.I1;\n"
+                    "    }\n"
+                    "]\n"
+                    "MONITORS [\n"
+                    "    G1;\n"
+                    "]\n")
+    assert batch.main(format_args + [str(path)]) == 1
+    out, err = capsys.readouterr()
+    assert out == output
+    assert err == ("Error: network oscillating at cycle 0\n"
+                   "Oscillating devices: G1, G2, G3\n")
@@ -0,0 +1,164 @@
+"""Test the bitsim module."""
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from bitsim import BitSimulator
+
+
+def make_circuit():
+    """Return a Monitors instance for a circuit of gates, a latch and D-type.
+
+    The random start-up state is seeded so that every circuit built by this
+    function starts from the same state.
+    """
+    random.seed(7)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [SW1, SW2, SW3, CLK, SIG, A, O, X, L1, L2, D, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Sw3", "Clk", "Sig", "A", "O", "X", "L1", "L2", "D",
+         "I1", "I2"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    devices.make_device(SW2, devices.SWITCH, 0)
+    devices.make_device(SW3, devices.SWITCH, 1)
+    devices.make_device(CLK, devices.CLOCK, 1)
+    devices.make_siggen(SIG, "0110")
+    devices.make_device(A, devices.AND, 2)
+    devices.make_device(O, devices.NOR, 2)
+    devices.make_device(X, devices.XOR)
+    devices.make_device(L1, devices.NAND, 2)
+    devices.make_device(L2, devices.NAND, 2)
+    devices.make_device(D, devices.D_TYPE)
+
+    for connection in [(SW1, None, A, I1), (SIG, None, A, I2),
+                       (SW2, None, O, I1), (A, None, O, I2),
+                       (O, None, X, I1), (D, devices.Q_ID, X, I2),
+                       (SW3, None, L1, I1), (L2, None, L1, I2),
+                       (X, None, L2, I1), (L1, None, L2, I2),
+                       (L1, None, D, devices.DATA_ID),
+                       (CLK, None, D, devices.CLK_ID),
+                       (SW2, None, D, devices.SET_ID),
+                       (SW1, None, D, devices.CLEAR_ID)]:
+        assert network.make_connection(*connection) == network.NO_ERROR
+
+    for device_id in [A, O, X, L1, L2]:
+        monitors.make_monitor(device_id, None)
+    monitors.make_monitor(D, devices.Q_ID)
+    return monitors
+
+
+def test_run_matches_levelized_engine():
+    """Test if every lane gives the same traces as the levelized engine."""
+    monitors = make_circuit()
+    names = monitors.names
+    switch_ids = names.lookup(["Sw1", "Sw2", "Sw3"])
+    switch_settings = [{switch_ids[0]: lane & 1,
+                        switch_ids[1]: (lane >> 1) & 1,
+                        switch_ids[2]: (lane >> 2) & 1}
+                       for lane in range(8)]
+
+    simulator = BitSimulator(names, monitors.devices, monitors.network,
+                             monitors)
+    traces = simulator.run(switch_settings, 30)
+    assert len(traces) == 8
+
+    for lane, switch_states in enumerate(switch_settings):
+        lane_monitors = make_circuit()
+        devices = lane_monitors.devices
+        network = lane_monitors.network
+        network.set_engine(network.LEVELIZED)
+        for switch_id, switch_state in switch_states.items():
+            devices.set_switch(switch_id, switch_state)
+        for _ in range(30):
+            assert network.execute_network()
+            lane_monitors.record_signals()
+        assert traces[lane] == lane_monitors.monitors_dictionary
+
+
+def test_run_leaves_devices_unchanged():
+    """Test if run does not change the state of the devices."""
+    monitors = make_circuit()
+    devices = monitors.devices
+    before = [(device.outputs.copy(), device.dtype_memory,
+               device.clock_counter, device.sig_counter)
+              for device in devices.devices_list]
+
+    simulator = BitSimulator(monitors.names, devices, monitors.network,
+                             monitors)
+    simulator.run([{}] * 64, 10)
+
+    assert [(device.outputs.copy(), device.dtype_memory,
+             device.clock_counter, device.sig_counter)
+            for device in devices.devices_list] == before
+    assert all(len(trace) == 0 for trace in
+               monitors.monitors_dictionary.values())
+
+
+@pytest.mark.parametrize("connect_all", [True, False])
+def test_run_gives_none_for_bad_networks(connect_all):
+    """Test if run returns None for oscillating or unconnected networks."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [NOR1, I1] = names.lookup(["Nor1", "I1"])
+    devices.make_device(NOR1, devices.NOR, 1)
+    if connect_all:
+        network.make_connection(NOR1, None, NOR1, I1)
+
+    simulator = BitSimulator(names, devices, network, monitors)
+    assert simulator.run([{}, {}], 5) is None
+
+
+def test_run_settles_long_loops():
+    """Test if a feedback loop needing more than 20 passes settles."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [SW1, I1, I2] = names.lookup(["Sw1", "I1", "I2"])
+    ring_ids = names.lookup(["Or{}".format(number) for number in range(60)])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for gate_id in ring_ids:
+        devices.make_device(gate_id, devices.OR, 2)
+    # A ring of OR gates driven by the switch, in which each gate reads the
+    # next one, so a HIGH level passes one gate per pass of the loop
+    for number, gate_id in enumerate(ring_ids):
+        next_id = ring_ids[(number + 1) % len(ring_ids)]
+        network.make_connection(next_id, None, gate_id, I1)
+        network.make_connection(SW1 if number == 0 else next_id, None,
+                                gate_id, I2)
+    monitors.make_monitor(ring_ids[0], None)
+
+    simulator = BitSimulator(names, devices, network, monitors)
+    traces = simulator.run([{SW1: 1}, {SW1: 0}], 1)
+    assert traces is not None
+    assert [list(trace[(ring_ids[0], None)]) for trace in traces] == [
+        [devices.HIGH], [devices.LOW]]
+    assert simulator.oscillating_devices == []
+    assert network.get_iteration_limit() > 20
+
+
+def test_run_reports_oscillating_loop():
+    """Test if the devices of an oscillating loop are reported."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [NOR1, I1] = names.lookup(["Nor1", "I1"])
+    devices.make_device(NOR1, devices.NOR, 1)
+    network.make_connection(NOR1, None, NOR1, I1)
+
+    simulator = BitSimulator(names, devices, network, monitors)
+    assert simulator.run([{}, {}], 5) is None
+    assert simulator.oscillating_devices == [NOR1]
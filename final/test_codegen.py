@@ -0,0 +1,94 @@
+"""Test the codegen module."""
+import collections
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from codegen import CodeGenerator
+
+
+@pytest.fixture
+def gate_network():
+    """Return a network with two switches driving a NAND and a NOR gate."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1, SW2, G1, G2, I1, I2] = names.lookup(["Sw1", "Sw2", "G1", "G2",
+                                               "I1", "I2"])
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(SW2, devices.SWITCH, 0)
+    devices.make_device(G1, devices.NAND, 2)
+    devices.make_device(G2, devices.NOR, 2)
+    network.make_connection(SW1, None, G1, I1)
+    network.make_connection(SW2, None, G1, I2)
+    network.make_connection(G1, None, G2, I1)
+    network.make_connection(SW2, None, G2, I2)
+    return network
+
+
+def test_generate_source(gate_network):
+    """Test if each gate becomes one expression, in schedule order."""
+    network = gate_network
+    code_generator = CodeGenerator(network.names, network.devices, network)
+    source = code_generator.generate_source()
+
+    # Devices are numbered in the order of devices_list
+    assert "    n2 = (n0 & n1) ^ 1\n" in source
+    assert "    n3 = (n2 | n1) ^ 1\n" in source
+    assert source.index("n2 = ") < source.index("n3 = ")
+    compile(source, "<network>", "exec")
+
+
+def test_execute_network(gate_network):
+    """Test if the generated function updates the device outputs."""
+    network = gate_network
+    devices = network.devices
+    [SW2, G1, G2] = devices.names.lookup(["Sw2", "G1", "G2"])
+    network.set_engine(network.GENERATED)
+
+    assert network.execute_network()
+    assert network.get_output_signal(G1, None) == devices.HIGH
+    assert network.get_output_signal(G2, None) == devices.LOW
+
+    devices.set_switch(SW2, devices.HIGH)
+    assert network.execute_network()
+    assert network.get_output_signal(G1, None) == devices.LOW
+    assert network.get_output_signal(G2, None) == devices.LOW
+
+
+def test_code_cache(gate_network):
+    """Test if compiled code is reused for the same definition file hash."""
+    network = gate_network
+    network.definition_hash = "test_code_cache"
+    CodeGenerator.code_cache.pop(network.definition_hash, None)
+
+    code_generator = CodeGenerator(network.names, network.devices, network)
+    assert code_generator.compile_network()
+    code = CodeGenerator.code_cache[network.definition_hash]
+
+    code_generator.generate_source = None  # source must not be regenerated
+    assert code_generator.compile_network()
+    assert CodeGenerator.code_cache[network.definition_hash] is code
+
+    # Making a connection means the network no longer matches the file
+    [G3, I1] = network.names.lookup(["G3", "I1"])
+    network.devices.make_device(G3, network.devices.AND, 1)
+    [G2] = network.names.lookup(["G2"])
+    network.make_connection(G2, None, G3, I1)
+    assert network.definition_hash is None
+
+
+def test_code_cache_size(gate_network, monkeypatch):
+    """Test if the least recently used compiled code is evicted."""
+    network = gate_network
+    monkeypatch.setattr(CodeGenerator, "code_cache_size", 2)
+    monkeypatch.setattr(CodeGenerator, "code_cache",
+                        collections.OrderedDict())
+
+    code_generator = CodeGenerator(network.names, network.devices, network)
+    for definition_hash in ["first", "second", "first", "third"]:
+        network.definition_hash = definition_hash
+        assert code_generator.compile_network()
+    assert list(CodeGenerator.code_cache) == ["first", "third"]
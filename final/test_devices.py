@@ -2,7 +2,7 @@
 import pytest
 
 from names import Names
-from devices import Devices
+from devices import Devices, PortMap
 
 
 @pytest.fixture
@@ -38,6 +38,61 @@ def test_get_device(devices_with_items):
         assert devices_with_items.get_device(X_ID) is None
 
 
+def test_add_device_keeps_index(new_devices):
+    """Test if add_device keeps the device index in step with devices_list."""
+    names = new_devices.names
+    [AND1_ID, SW1_ID] = names.lookup(["And1", "Sw1"])
+
+    new_devices.add_device(AND1_ID, new_devices.AND)
+    new_devices.add_device(SW1_ID, new_devices.SWITCH)
+    and_device = new_devices.get_device(AND1_ID)
+
+    # Adding a device ID twice leaves the original device in place
+    new_devices.add_device(AND1_ID, new_devices.OR)
+
+    assert [device.device_id for device in new_devices.devices_list] == \
+        [AND1_ID, SW1_ID]
+    assert new_devices.get_device(AND1_ID) is and_device
+    assert and_device.device_kind == new_devices.AND
+
+
+def test_port_map(devices_with_items):
+    """Test if device ports behave as dictionaries with shared port IDs."""
+    names = devices_with_items.names
+    [AND1_ID, AND2_ID, SW1_ID, I1_ID, I2_ID] = names.lookup(
+        ["And1", "And2", "Sw1", "I1", "I2"])
+    devices_with_items.make_device(AND2_ID, devices_with_items.AND, 2)
+    and1_device = devices_with_items.get_device(AND1_ID)
+    and2_device = devices_with_items.get_device(AND2_ID)
+
+    # Gates with the same inputs share the port IDs but not the signals
+    assert and1_device.inputs.port_ids is and2_device.inputs.port_ids
+    and1_device.inputs[I2_ID] = (SW1_ID, None)
+    assert and1_device.inputs == {I1_ID: None, I2_ID: (SW1_ID, None)}
+    assert and2_device.inputs == {I1_ID: None, I2_ID: None}
+
+    assert list(and1_device.inputs) == [I1_ID, I2_ID]
+    assert list(and1_device.inputs.items()) == [(I1_ID, None),
+                                                (I2_ID, (SW1_ID, None))]
+    assert I2_ID in and1_device.inputs
+    assert SW1_ID not in and1_device.inputs
+    with pytest.raises(KeyError):
+        and1_device.inputs[SW1_ID]
+
+    # The layouts are interned per Devices instance, not for the process
+    assert and1_device.inputs.layouts is devices_with_items.port_layouts
+    other_devices = Devices(names)
+    other_devices.make_device(AND1_ID, other_devices.AND, 2)
+    other_inputs = other_devices.get_device(AND1_ID).inputs
+    assert other_inputs.port_ids == and1_device.inputs.port_ids
+    assert other_inputs.port_ids is not and1_device.inputs.port_ids
+    assert (I1_ID, I2_ID) not in PortMap().layouts
+
+    # Slots leave no room for attributes that are not device properties
+    with pytest.raises(AttributeError):
+        and1_device.colour = "red"
+
+
 def test_find_devices(devices_with_items):
     """Test if find_devices returns the correct devices of the given kind."""
     devices = devices_with_items
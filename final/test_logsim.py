@@ -0,0 +1,54 @@
+"""Test the start-up of the logsim module."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Modules that only the graphical user interface needs
+gui_modules = ["wx", "OpenGL", "gui", "textatlas"]
+
+
+def get_import_times(arg_list, cache_directory):
+    """Return the modules imported by running logsim.py with arg_list.
+
+    The command line interface is given the quit command. The result is
+    (exit status, {module name: cumulative import time in microseconds}),
+    read from the report printed by python -X importtime.
+    """
+    environment = dict(os.environ, XDG_CACHE_HOME=cache_directory)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "logsim.py"] + arg_list,
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=environment,
+        input="q\n", capture_output=True, text=True)
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        [self_time, cumulative_time, module] = line[12:].split("|")
+        if cumulative_time.strip().isdigit():  # not the header line
+            import_times[module.strip()] = int(cumulative_time)
+    return result.returncode, import_times
+
+
+def get_report(import_times, no_of_modules=10):
+    """Return the slowest imports as lines of text, slowest first."""
+    slowest = sorted(import_times.items(), key=lambda item: item[1],
+                     reverse=True)[:no_of_modules]
+    return "\n".join("{:>10} us  {}".format(cumulative_time, module)
+                     for module, cumulative_time in slowest)
+
+
+@pytest.mark.parametrize("arg_list", [
+    ["-h"],
+    ["-c", "examples/simple_flip_flop_circuit.txt"],
+])
+def test_no_gui_imports(tmp_path, arg_list):
+    """Test if the GUI modules are not imported without the GUI."""
+    exit_status, import_times = get_import_times(arg_list, str(tmp_path))
+    assert exit_status == 0
+    assert "netcache" in import_times
+    gui_imports = [module for module in import_times
+                   if module.split(".")[0] in gui_modules]
+    assert gui_imports == [], "GUI modules imported:\n" + get_report(
+        import_times)
@@ -1,10 +1,12 @@
 """Test the monitors module."""
+from array import array
+
 import pytest
 
 from names import Names
 from network import Network
 from devices import Devices
-from monitors import Monitors
+from monitors import Monitors, SignalRuns
 
 
 @pytest.fixture
@@ -39,9 +41,9 @@ def test_make_monitor(new_monitors):
     names = new_monitors.names
     [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
 
-    assert new_monitors.monitors_dictionary == {(SW1_ID, None): [],
-                                                (SW2_ID, None): [],
-                                                (OR1_ID, None): []}
+    assert new_monitors.monitors_dictionary == {(SW1_ID, None): array('b'),
+                                                (SW2_ID, None): array('b'),
+                                                (OR1_ID, None): array('b')}
 
 
 def test_make_monitor_gives_errors(new_monitors):
@@ -72,8 +74,8 @@ def test_remove_monitor(new_monitors):
     [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
 
     new_monitors.remove_monitor(SW1_ID, None)
-    assert new_monitors.monitors_dictionary == {(SW2_ID, None): [],
-                                                (OR1_ID, None): []}
+    assert new_monitors.monitors_dictionary == {(SW2_ID, None): array('b'),
+                                                (OR1_ID, None): array('b')}
 
 
 def test_get_signal_names(new_monitors):
@@ -115,9 +117,34 @@ def test_record_signals(new_monitors):
     new_monitors.record_signals()
 
     assert new_monitors.monitors_dictionary == {
-        (SW1_ID, None): [LOW, HIGH, HIGH],
-        (SW2_ID, None): [LOW, LOW, HIGH],
-        (OR1_ID, None): [LOW, HIGH, HIGH]}
+        (SW1_ID, None): array('b', [LOW, HIGH, HIGH]),
+        (SW2_ID, None): array('b', [LOW, LOW, HIGH]),
+        (OR1_ID, None): array('b', [LOW, HIGH, HIGH])}
+
+
+def test_record_cycles(new_monitors):
+    """Test if record_cycles records signals and blanks missing monitors."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+    LOW = devices.LOW
+    HIGH = devices.HIGH
+    BLANK = devices.BLANK
+
+    new_monitors.record_cycles(2, {
+        (SW1_ID, None): array('b', [LOW, HIGH]),
+        (OR1_ID, None): array('b', [LOW, HIGH])})
+    assert new_monitors.monitors_dictionary == {
+        (SW1_ID, None): array('b', [LOW, HIGH]),
+        (SW2_ID, None): array('b', [BLANK, BLANK]),
+        (OR1_ID, None): array('b', [LOW, HIGH])}
+
+    assert new_monitors.set_trace_type(new_monitors.RUN_LENGTH)
+    new_monitors.record_cycles(1, {(SW2_ID, None): array('b', [HIGH])})
+    assert new_monitors.monitors_dictionary[(SW2_ID, None)] == [
+        BLANK, BLANK, HIGH]
+    assert new_monitors.monitors_dictionary[(SW1_ID, None)] == [
+        LOW, HIGH, BLANK]
 
 
 def test_get_margin(new_monitors):
@@ -145,13 +172,14 @@ def test_reset_monitors(new_monitors):
     LOW = devices.LOW
     new_monitors.record_signals()
     new_monitors.record_signals()
-    assert new_monitors.monitors_dictionary == {(SW1_ID, None): [LOW, LOW],
-                                                (SW2_ID, None): [LOW, LOW],
-                                                (OR1_ID, None): [LOW, LOW]}
+    assert new_monitors.monitors_dictionary == {
+        (SW1_ID, None): array('b', [LOW, LOW]),
+        (SW2_ID, None): array('b', [LOW, LOW]),
+        (OR1_ID, None): array('b', [LOW, LOW])}
     new_monitors.reset_monitors()
-    assert new_monitors.monitors_dictionary == {(SW1_ID, None): [],
-                                                (SW2_ID, None): [],
-                                                (OR1_ID, None): []}
+    assert new_monitors.monitors_dictionary == {(SW1_ID, None): array('b'),
+                                                (SW2_ID, None): array('b'),
+                                                (OR1_ID, None): array('b')}
 
 
 def test_display_signals(capsys, new_monitors):
@@ -197,3 +225,88 @@ def test_display_signals(capsys, new_monitors):
             "Clock1: -__--__--__--__--__-" in traces)
 
     assert "" in traces  # additional empty line at the end
+
+
+def test_make_monitor_after_cycles(capsys, new_monitors):
+    """Test if a monitor made after some cycles is padded with BLANK."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+    new_monitors.remove_monitor(SW2_ID, None)
+    new_monitors.remove_monitor(OR1_ID, None)
+    new_monitors.remove_monitor(SW1_ID, None)
+
+    assert new_monitors.make_monitor(SW1_ID, None, 3) == \
+        new_monitors.NO_ERROR
+    new_monitors.record_signals()
+    assert new_monitors.monitors_dictionary[(SW1_ID, None)] == array(
+        'b', [devices.BLANK] * 3 + [devices.LOW])
+
+    new_monitors.display_signals()
+    out, _ = capsys.readouterr()
+    assert out == "Sw1:    _\n"
+
+
+def test_signal_runs():
+    """Test if SignalRuns finds the signal at any cycle from its runs."""
+    signals = [0, 0, 0, 1, 1, 4, 0, 0]
+    trace = SignalRuns(signals[:4])
+    for signal in signals[4:]:
+        trace.append(signal)
+
+    assert list(trace.run_starts) == [0, 3, 5, 6]
+    assert len(trace) == 8
+    assert [trace[cycle] for cycle in range(8)] == signals
+    assert trace[-1] == 0
+    with pytest.raises(IndexError):
+        trace[8]
+    assert list(trace) == signals
+    assert trace == array('b', signals)
+    assert trace.tobytes() == bytes(signals)
+
+    assert list(trace.get_runs()) == [(0, 3, 0), (3, 5, 1), (5, 6, 4),
+                                      (6, 8, 0)]
+    assert list(trace.get_runs(2, 4)) == [(2, 3, 0), (3, 4, 1)]
+    assert list(trace.get_runs(7, 20)) == [(7, 8, 0)]
+    assert list(trace.get_runs(8)) == []
+
+
+def test_run_length_traces(capsys, new_monitors):
+    """Test if RUN_LENGTH traces record and display the same signals."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+    LOW = devices.LOW
+    HIGH = devices.HIGH
+
+    network.execute_network()
+    new_monitors.record_signals()
+    assert new_monitors.set_trace_type(new_monitors.RUN_LENGTH)
+    assert not new_monitors.set_trace_type(len(new_monitors.trace_types))
+    for _ in range(4):
+        network.execute_network()
+        new_monitors.record_signals()
+    devices.set_switch(SW1_ID, HIGH)
+    for _ in range(5):
+        network.execute_network()
+        new_monitors.record_signals()
+
+    trace = new_monitors.monitors_dictionary[(OR1_ID, None)]
+    assert isinstance(trace, SignalRuns)
+    assert len(trace.run_starts) == 2
+    assert trace == [LOW] * 5 + [HIGH] * 5
+    assert new_monitors.get_signal_runs(OR1_ID, None) == [(0, 5, LOW),
+                                                          (5, 10, HIGH)]
+    assert new_monitors.get_signal_runs(SW2_ID, None, 3, 6) == [(3, 6, LOW)]
+
+    new_monitors.display_signals()
+    out, _ = capsys.readouterr()
+    assert "Or1: _____-----" in out.split("\n")
+
+    # Converting back gives the same signals as arrays
+    assert new_monitors.set_trace_type(new_monitors.ARRAY)
+    assert new_monitors.monitors_dictionary[(OR1_ID, None)] == array(
+        'b', [LOW] * 5 + [HIGH] * 5)
+    assert new_monitors.get_signal_runs(OR1_ID, None) == [(0, 5, LOW),
+                                                          (5, 10, HIGH)]
@@ -88,3 +88,11 @@ def test_lookup(used_names, new_names, expected_name_id_list,
     """Test if lookup returns the expected name ID."""
     # Name is present
     assert used_names.lookup(name_string_list) == expected_name_id_list
+
+
+def test_lookup_adds_names_in_order(used_names):
+    """Test if lookup gives new names consecutive IDs, once per string."""
+    assert used_names.lookup(["Dave", "Chang", "Dave", "Eve"]) == [3, 0, 3, 4]
+    assert used_names.names == ["Chang", "Ethan", "Ilakya", "Dave", "Eve"]
+    assert used_names.query("Eve") == 4
+    assert used_names.get_name_string(3) == "Dave"
@@ -0,0 +1,100 @@
+"""Test the netcache module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from netcache import NetlistCache
+
+
+@pytest.fixture
+def parsed_network():
+    """Return names, devices, network and monitors for a small circuit."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [SW1, CLK, SIG, RC, G1, G2, D1, I1, I2] = names.lookup(
+        ["Sw1", "Clk", "Sig", "Rc", "G1", "G2", "D1", "I1", "I2"])
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(CLK, devices.CLOCK, 3)
+    devices.make_siggen(SIG, "0110")
+    devices.make_rc(RC, 4)
+    devices.make_device(G1, devices.NAND, 2)
+    devices.make_device(G2, devices.XOR)
+    devices.make_device(D1, devices.D_TYPE)
+    for connection in [(SW1, None, G1, I1), (SIG, None, G1, I2),
+                       (G1, None, G2, I1), (RC, None, G2, I2),
+                       (G2, None, D1, devices.DATA_ID),
+                       (CLK, None, D1, devices.CLK_ID),
+                       (SW1, None, D1, devices.SET_ID),
+                       (G1, None, D1, devices.CLEAR_ID)]:
+        assert network.make_connection(*connection) == network.NO_ERROR
+    monitors.make_monitor(G2, None)
+    monitors.make_monitor(D1, devices.QBAR_ID)
+    return names, devices, network, monitors
+
+
+@pytest.fixture
+def definition_file(tmp_path):
+    """Return the path of a definition file to cache the network for."""
+    path = tmp_path / "circuit.txt"
+    path.write_text("DEVICES [ ... ]")
+    return str(path)
+
+
+def test_save_and_load(tmp_path, parsed_network, definition_file):
+    """Test if a loaded network matches the network that was saved."""
+    names, devices, network, monitors = parsed_network
+    cache = NetlistCache(str(tmp_path / "cache"))
+    file_hash = cache.get_file_hash(definition_file)
+    assert cache.save(file_hash, names, devices, network, monitors)
+
+    [new_names, new_devices, new_network,
+     new_monitors] = cache.load(definition_file)
+    assert new_names.names == names.names
+    for device, new_device in zip(devices.devices_list,
+                                  new_devices.devices_list):
+        assert new_device.device_id == device.device_id
+        assert new_device.device_kind == device.device_kind
+        assert new_device.inputs == device.inputs
+        assert list(new_device.outputs) == list(device.outputs)
+        assert new_device.clock_half_period == device.clock_half_period
+        assert new_device.switch_state == device.switch_state
+        assert new_device.waveform == device.waveform
+        assert new_device.duration == device.duration
+    assert len(new_devices.devices_list) == len(devices.devices_list)
+    assert new_network.fanout == network.fanout
+    assert list(new_monitors.monitors_dictionary) == \
+        list(monitors.monitors_dictionary)
+    assert new_network.definition_hash == file_hash
+    assert new_network.execute_network()
+
+
+def test_changed_file_is_not_loaded(tmp_path, parsed_network,
+                                    definition_file):
+    """Test if changing the definition file invalidates the cache."""
+    names, devices, network, monitors = parsed_network
+    cache = NetlistCache(str(tmp_path / "cache"))
+    assert cache.load(definition_file) is None
+
+    file_hash = cache.get_file_hash(definition_file)
+    cache.save(file_hash, names, devices, network, monitors)
+    with open(definition_file, "a") as changed_file:
+        changed_file.write(" ")
+    assert cache.load(definition_file) is None
+
+
+def test_unreadable_cache_is_not_loaded(tmp_path, parsed_network,
+                                        definition_file):
+    """Test if a corrupt cache file is ignored."""
+    names, devices, network, monitors = parsed_network
+    cache = NetlistCache(str(tmp_path / "cache"))
+    file_hash = cache.get_file_hash(definition_file)
+    cache.save(file_hash, names, devices, network, monitors)
+    with open(cache.get_cache_path(file_hash), "r+b") as cache_file:
+        cache_file.seek(len(cache.header) + 3)
+        cache_file.write(b"\xff\xff")
+    assert cache.load(definition_file) is None
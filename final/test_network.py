@@ -1,9 +1,26 @@
 """Test the network module."""
+import glob
+import os
+import random
+import sys
+
 import pytest
 
 from names import Names
 from devices import Devices
 from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+
+engine_names = ["ITERATIVE", "LEVELIZED", "EVENT_DRIVEN", "VECTORIZED",
+                "GENERATED"]
+
+test_directory = os.path.dirname(os.path.abspath(__file__))
+definition_files = sorted(
+    os.path.relpath(path, test_directory)
+    for pattern in ["examples/*.txt", "test_files/*.txt"]
+    for path in glob.glob(os.path.join(test_directory, pattern)))
 
 
 @pytest.fixture
@@ -14,6 +31,17 @@ def new_network():
     return Network(new_names, new_devices)
 
 
+@pytest.fixture(params=engine_names)
+def engine_network(request):
+    """Return a new Network class instance for each simulation engine."""
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+    if not new_network.set_engine(getattr(new_network, request.param)):
+        pytest.skip("engine needs NumPy")
+    return new_network
+
+
 @pytest.fixture
 def network_with_devices():
     """Return a Network class instance with three devices in the network."""
@@ -139,6 +167,27 @@ def test_make_connection(network_with_devices):
                           I2: (SW2_ID, None)}
 
 
+def test_get_fanout(network_with_devices):
+    """Test if get_fanout lists the inputs each output drives."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, OR1_ID, I1, I2] = names.lookup(["Sw1", "Sw2", "Or1", "I1",
+                                                     "I2"])
+    assert network.get_fanout(SW1_ID, None) == []
+
+    # Connect output first, then input first
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    network.make_connection(OR1_ID, I2, SW1_ID, None)
+    # A failed connection does not change the fan-out
+    network.make_connection(SW2_ID, None, OR1_ID, I2)
+
+    assert network.get_fanout(SW1_ID, None) == [(OR1_ID, I1), (OR1_ID, I2)]
+    assert network.get_fanout(SW2_ID, None) == []
+    assert network.get_fanout(OR1_ID, None) == []
+
+
 @pytest.mark.parametrize("function_args, error", [
     # I1 is not a valid device id
     ("(I1, I1, OR1_ID, I2)", "network.DEVICE_ABSENT"),
@@ -178,9 +227,9 @@ def test_make_connection_gives_error(network_with_devices,
     assert left_expression == right_expression
 
 
-def test_execute_xor(new_network):
+def test_execute_xor(engine_network):
     """Test if execute_network returns the correct output for XOR gates."""
-    network = new_network
+    network = engine_network
     devices = network.devices
     names = devices.names
 
@@ -197,7 +246,7 @@ def test_execute_xor(new_network):
     network.make_connection(SW2_ID, None, XOR1_ID, I2)
 
     network.execute_network()
-    assert new_network.get_output_signal(XOR1_ID, None) == devices.LOW
+    assert network.get_output_signal(XOR1_ID, None) == devices.LOW
 
     # Set Sw1 to HIGH
     devices.set_switch(SW1_ID, devices.HIGH)
@@ -220,10 +269,10 @@ def test_execute_xor(new_network):
     ("NOR1_ID", ["HIGH", "LOW", "HIGH"], "LOW", "devices.NOR"),
     ("NOR1_ID", ["LOW", "LOW", "LOW"], "HIGH", "devices.NOR"),
 ])
-def test_execute_non_xor_gates(new_network, gate_id, switch_outputs,
+def test_execute_non_xor_gates(engine_network, gate_id, switch_outputs,
                                gate_output, gate_kind):
     """Test if execute_network returns the correct output for non-XOR gates."""
-    network = new_network
+    network = engine_network
     devices = network.devices
     names = devices.names
 
@@ -265,9 +314,9 @@ def test_execute_non_xor_gates(new_network, gate_id, switch_outputs,
     (0, 5),
     (0, 6),
 ])
-def test_execute_siggen(new_network, value, index):
+def test_execute_siggen(engine_network, value, index):
     """Test if execute_network returns the correct output for siggen device."""
-    network = new_network
+    network = engine_network
     devices = network.devices
     names = devices.names
 
@@ -286,9 +335,9 @@ def test_execute_siggen(new_network, value, index):
     assert sig_device.outputs[None] == value
 
 
-def test_execute_rc(new_network):
+def test_execute_rc(engine_network):
     """Test if execute_network returns the correct output for RC device."""
-    network = new_network
+    network = engine_network
     devices = network.devices
     names = devices.names
 
@@ -309,12 +358,12 @@ def test_execute_rc(new_network):
     assert cycles_to_low == 6
 
 
-def test_execute_non_gates(new_network):
+def test_execute_non_gates(engine_network):
     """Test if execute_network returns the correct output for non-gate devices.
 
     Tests switches, D-types and clocks.
     """
-    network = new_network
+    network = engine_network
     devices = network.devices
     names = devices.names
 
@@ -387,9 +436,9 @@ def test_execute_non_gates(new_network):
                 HIGH, LOW, HIGH, HIGH, LOW, HIGH]
 
 
-def test_oscillating_network(new_network):
+def test_oscillating_network(engine_network):
     """Test if the execute_network returns False for oscillating networks."""
-    network = new_network
+    network = engine_network
     devices = network.devices
     names = devices.names
 
@@ -401,3 +450,304 @@ def test_oscillating_network(new_network):
     network.make_connection(NOR1, None, NOR1, I1)
 
     assert not network.execute_network()
+    assert network.oscillating_devices == [NOR1]
+
+    # The network keeps oscillating in later cycles
+    for cycle in range(3):
+        assert not network.execute_network()
+        assert network.oscillating_devices == [NOR1]
+
+
+def test_dtype_set_hazard(engine_network):
+    """Test if only the iterative engine stores a pulse at a D-type's SET.
+
+    The SET input is the AND of a switch and the switch inverted through a
+    chain of three NAND gates, so it only pulses while the gates settle.
+    """
+    network = engine_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, SW2, AND1, D1, I1, I2] = names.lookup(["Sw1", "Sw2", "And1", "D1",
+                                                 "I1", "I2"])
+    chain_ids = names.lookup(["Nand1", "Nand2", "Nand3"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    devices.make_device(SW2, devices.SWITCH, 0)
+    # Made in reverse, so the iterative engine takes several iterations to
+    # pass a change along the chain
+    for gate_id in reversed(chain_ids):
+        devices.make_device(gate_id, devices.NAND, 1)
+    devices.make_device(AND1, devices.AND, 2)
+    devices.make_device(D1, devices.D_TYPE)
+
+    previous_id = SW1
+    for gate_id in chain_ids:
+        network.make_connection(previous_id, None, gate_id, I1)
+        previous_id = gate_id
+    network.make_connection(SW1, None, AND1, I1)
+    network.make_connection(chain_ids[-1], None, AND1, I2)
+    network.make_connection(AND1, None, D1, devices.SET_ID)
+    for input_id in [devices.CLEAR_ID, devices.DATA_ID, devices.CLK_ID]:
+        network.make_connection(SW2, None, D1, input_id)
+    devices.get_device(D1).dtype_memory = devices.LOW
+
+    assert network.execute_network()
+    assert network.get_output_signal(D1, devices.Q_ID) == devices.LOW
+
+    devices.set_switch(SW1, devices.HIGH)
+    assert network.execute_network()
+    assert network.get_output_signal(AND1, None) == devices.LOW
+    if network.engine == network.ITERATIVE:
+        assert network.get_output_signal(D1, devices.Q_ID) == devices.HIGH
+    else:
+        assert network.get_output_signal(D1, devices.Q_ID) == devices.LOW
+
+
+def test_oscillating_loop_devices(engine_network):
+    """Test if only the devices of an oscillating loop are reported."""
+    network = engine_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, AND1, I1, I2] = names.lookup(["Sw1", "And1", "I1", "I2"])
+    ring_ids = names.lookup(["Nand1", "Nand2", "Nand3"])
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(AND1, devices.AND, 1)
+    for gate_id in ring_ids:
+        devices.make_device(gate_id, devices.NAND, 2)
+
+    # A ring of three inverters, enabled by the switch, drives an AND gate
+    for number, gate_id in enumerate(ring_ids):
+        network.make_connection(SW1, None, gate_id, I1)
+        network.make_connection(ring_ids[number - 1], None, gate_id, I2)
+    network.make_connection(ring_ids[-1], None, AND1, I1)
+
+    assert not network.execute_network()
+    assert sorted(network.oscillating_devices) == sorted(ring_ids)
+
+    # The ring settles when the switch is off
+    devices.set_switch(SW1, devices.LOW)
+    assert network.execute_network()
+    assert network.oscillating_devices == []
+
+
+def make_deep_chain(network, length):
+    """Add a chain of inverters driven by a switch to network.
+
+    The gates are made in reverse order, and the iterative engine executes
+    them in the order they are made, so a change at the switch only passes
+    one more gate in each iteration. Return the IDs of the switch and the
+    last gate.
+    """
+    devices = network.devices
+    names = devices.names
+    [SW_ID, I1] = names.lookup(["Sw", "I1"])
+    devices.make_device(SW_ID, devices.SWITCH, 0)
+    gate_ids = names.lookup(["Not" + str(i) for i in range(length)])
+    for gate_id in reversed(gate_ids):
+        devices.make_device(gate_id, devices.NAND, 1)
+    previous_id = SW_ID
+    for gate_id in gate_ids:
+        network.make_connection(previous_id, None, gate_id, I1)
+        previous_id = gate_id
+    return SW_ID, gate_ids[-1]
+
+
+def test_deep_chain(engine_network):
+    """Test if a stable chain deeper than 20 levels settles."""
+    network = engine_network
+    devices = network.devices
+    [SW_ID, last_id] = make_deep_chain(network, 60)
+
+    assert network.execute_network()
+    assert network.get_output_signal(last_id, None) == devices.LOW
+    devices.set_switch(SW_ID, devices.HIGH)
+    assert network.execute_network()
+    assert network.oscillating_devices == []
+    assert network.get_output_signal(last_id, None) == devices.HIGH
+
+
+def test_iteration_limit(new_network):
+    """Test if the iteration limit is sized from the network depth."""
+    network = new_network
+    devices = network.devices
+    [SW_ID, last_id] = make_deep_chain(network, 60)
+
+    # 61 levels including the switch, plus 20 iterations
+    assert network.get_iteration_limit() == 2 * 61 + 20
+    assert network.execute_network()
+
+    network.iteration_limit = 20
+    assert network.get_iteration_limit() == 20
+    devices.set_switch(SW_ID, devices.HIGH)
+    assert not network.execute_network()
+    # The gates the change has not reached are not reported
+    assert last_id not in network.oscillating_devices
+
+    network.iteration_limit = None
+    assert network.execute_network()
+    assert network.get_output_signal(last_id, None) == devices.HIGH
+
+
+def make_mixed_network(engine_name):
+    """Return a network with every device kind and a NAND latch.
+
+    The random start-up state is seeded so that networks built for different
+    engines start from the same state.
+    """
+    random.seed(5)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    network.set_engine(getattr(network, engine_name))
+
+    [A, B, C, D, F, L1, L2, X, S1, S2, CLK, SIG, RC, I1, I2] = names.lookup(
+        ["A", "B", "C", "D", "F", "L1", "L2", "X", "S1", "S2", "CLK", "SIG",
+         "RC", "I1", "I2"])
+    devices.make_device(S1, devices.SWITCH, 0)
+    devices.make_device(S2, devices.SWITCH, 1)
+    devices.make_device(CLK, devices.CLOCK, 2)
+    devices.make_siggen(SIG, "0001101")
+    devices.make_rc(RC, 7)
+    devices.make_device(A, devices.OR, 2)
+    devices.make_device(B, devices.AND, 2)
+    devices.make_device(C, devices.NAND, 2)
+    devices.make_device(D, devices.NOR, 2)
+    devices.make_device(F, devices.D_TYPE)
+    devices.make_device(L1, devices.NAND, 2)
+    devices.make_device(L2, devices.NAND, 2)
+    devices.make_device(X, devices.XOR)
+
+    connections = [(S1, None, A, I1), (SIG, None, A, I2),
+                   (S2, None, B, I1), (RC, None, B, I2),
+                   (A, None, C, I1), (B, None, C, I2),
+                   (C, None, D, I1), (B, None, D, I2),
+                   (C, None, F, devices.DATA_ID),
+                   (CLK, None, F, devices.CLK_ID),
+                   (S1, None, F, devices.SET_ID),
+                   (D, None, F, devices.CLEAR_ID),
+                   (F, devices.QBAR_ID, L1, I1), (L2, None, L1, I2),
+                   (S2, None, L2, I1), (L1, None, L2, I2),
+                   (F, devices.Q_ID, X, I1), (L1, None, X, I2)]
+    for connection in connections:
+        assert network.make_connection(*connection) == network.NO_ERROR
+    return network
+
+
+def run_and_trace(network, cycles):
+    """Run the network and return the trace of every output."""
+    devices = network.devices
+    [S1, S2] = devices.names.lookup(["S1", "S2"])
+    trace = []
+    for cycle in range(cycles):
+        if cycle == 10:
+            devices.set_switch(S1, devices.HIGH)
+        if cycle == 20:
+            devices.set_switch(S1, devices.LOW)
+            devices.set_switch(S2, devices.LOW)
+        assert network.execute_network()
+        trace.append([network.get_output_signal(device.device_id, output_id)
+                      for device in devices.devices_list
+                      for output_id in device.outputs])
+    return trace
+
+
+def test_compile_network():
+    """Test if compile_network orders devices by level and finds loops."""
+    network = make_mixed_network("LEVELIZED")
+    names = network.names
+    [A, C, D, F, L1, L2, X, S1] = names.lookup(["A", "C", "D", "F", "L1",
+                                                "L2", "X", "S1"])
+    network.compile_network()
+    order = [device_id for device_id_list, is_feedback_loop
+             in network.schedule for device_id in device_id_list]
+
+    # Every scheduled device comes after the devices that drive it
+    assert order.index(S1) < order.index(A) < order.index(C) < \
+        order.index(D) < order.index(F) < order.index(L1) < order.index(X)
+    assert ([L1, L2], True) in network.schedule
+    assert ([A], False) in network.schedule
+    assert network.network_depth == 7
+
+    # Making a connection discards the schedule
+    [G, I1] = names.lookup(["G", "I1"])
+    network.devices.make_device(G, network.devices.NAND, 1)
+    network.make_connection(X, None, G, I1)
+    assert network.schedule is None
+
+
+@pytest.mark.parametrize("engine_name", engine_names[1:])
+def test_engine_matches_iterative(engine_name):
+    """Test if an engine gives the same signals as the iterative engine."""
+    iterative_trace = run_and_trace(make_mixed_network("ITERATIVE"), 40)
+    engine_trace = run_and_trace(make_mixed_network(engine_name), 40)
+    assert engine_trace == iterative_trace
+
+
+def run_definition_file(path, engine_name, cycles):
+    """Parse a definition file and run it with the engine.
+
+    Errors in the file are reported, not raised, as they are outside the
+    tests, so files with errors run with the devices parsed before them. The
+    first switch is toggled at cycles 10 and 20. Return the result of
+    execute_network for each cycle and the monitor traces.
+    """
+    random.seed(0)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    scanner = Scanner(os.path.join(test_directory, path), names)
+    Parser(names, devices, network, monitors, scanner).parse_network()
+    if not network.set_engine(getattr(network, engine_name)):
+        pytest.skip("engine needs NumPy")
+    devices.cold_startup()
+
+    switch_ids = devices.devices_by_kind.get(devices.SWITCH, [])
+    results = []
+    for cycle in range(cycles):
+        if switch_ids and cycle in [10, 20]:
+            switch = devices.get_device(switch_ids[0])
+            devices.set_switch(switch_ids[0],
+                               network.invert_signal(switch.switch_state))
+        results.append(network.execute_network())
+        monitors.record_signals()
+    traces = {monitor: list(signals) for monitor, signals
+              in monitors.monitors_dictionary.items()}
+    return results, traces
+
+
+@pytest.mark.parametrize("engine_name", engine_names[1:])
+@pytest.mark.parametrize("path", definition_files)
+def test_definition_file_matches_iterative(monkeypatch, path, engine_name):
+    """Test if an engine runs each definition file as the iterative engine.
+
+    Files whose inputs are left unconnected fail in every cycle.
+    """
+    monkeypatch.setattr(sys, "argv", ["logsim.py"])
+    [iterative_results, iterative_traces] = run_definition_file(
+        path, "ITERATIVE", 40)
+    [results, traces] = run_definition_file(path, engine_name, 40)
+    assert results == iterative_results
+    assert traces == iterative_traces
+
+
+def test_levelized_deep_chain(new_network):
+    """Test if a chain deeper than the iteration limit settles in one cycle."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+    network.set_engine(network.LEVELIZED)
+
+    [SW_ID, I1] = names.lookup(["Sw", "I1"])
+    devices.make_device(SW_ID, devices.SWITCH, 1)
+    previous_id = SW_ID
+    gate_ids = names.lookup(["Not" + str(i) for i in range(50)])
+    for gate_id in reversed(gate_ids):
+        devices.make_device(gate_id, devices.NAND, 1)
+    for gate_id in gate_ids:
+        network.make_connection(previous_id, None, gate_id, I1)
+        previous_id = gate_id
+
+    assert network.execute_network()
+    assert network.get_output_signal(gate_ids[-1], None) == devices.HIGH
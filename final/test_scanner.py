@@ -155,3 +155,21 @@ def test_line_and_char_count(test_scanner3, test_names):
     assert test_scanner3.current_line == 7
     # 7 characters plus '\n' character
     assert test_scanner3.current_character_number == 8
+
+
+def test_tab_and_end_of_file_count(tmp_path, test_names):
+    """Test that tabs and positions after the end of the file are counted"""
+    test_file = tmp_path / 'tabs.txt'
+    test_file.write_text('A\n\tB;\n  12')
+    scanner = Scanner(str(test_file), test_names)
+    scanner.get_symbol()
+    assert (scanner.current_line, scanner.current_character_number) == (0, 2)
+    scanner.get_symbol()
+    # a tab moves on to the next multiple of 4
+    assert (scanner.current_line, scanner.current_character_number) == (1, 6)
+    scanner.get_symbol()
+    scanner.get_symbol()
+    assert scanner.current_character == ''
+    assert (scanner.current_line, scanner.current_character_number) == (2, 5)
+    scanner.advance()
+    assert scanner.current_character_number == 6
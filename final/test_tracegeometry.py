@@ -0,0 +1,160 @@
+"""Test the tracegeometry module."""
+import pytest
+
+from names import Names
+from network import Network
+from devices import Devices
+from monitors import Monitors
+from tracegeometry import TraceGeometry
+
+
+@pytest.fixture(params=["ARRAY", "RUN_LENGTH"])
+def new_geometry(request):
+    """Return a TraceGeometry class instance for a monitored switch."""
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+    new_monitors = Monitors(new_names, new_devices, new_network)
+    new_monitors.set_trace_type(getattr(new_monitors, request.param))
+
+    [SW1_ID] = new_names.lookup(["Sw1"])
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 0)
+    new_monitors.make_monitor(SW1_ID, None)
+    return TraceGeometry(new_monitors)
+
+
+def run_switch(geometry, switch_states):
+    """Run one cycle with the switch set to each of switch_states."""
+    monitors = geometry.monitors
+    [SW1_ID] = monitors.names.lookup(["Sw1"])
+    for switch_state in switch_states:
+        monitors.devices.set_switch(SW1_ID, switch_state)
+        monitors.network.execute_network()
+        monitors.record_signals()
+
+
+def test_update(new_geometry):
+    """Test if the vertices are extended as cycles are recorded."""
+    geometry = new_geometry
+    [SW1_ID] = geometry.monitors.names.lookup(["Sw1"])
+    monitor = (SW1_ID, None)
+
+    assert geometry.update() == {monitor: 0}
+    assert list(geometry.get_vertices(monitor)) == []
+
+    run_switch(geometry, [0, 0, 1])
+    assert geometry.update() == {monitor: 0}
+    assert list(geometry.get_vertices(monitor)) == [0, 0, 2, 0, 2, 1, 3, 1]
+    assert geometry.update() == {}
+
+    # A run at the same level moves the last vertex
+    run_switch(geometry, [1, 0])
+    assert geometry.update() == {monitor: 6}
+    assert list(geometry.get_vertices(monitor)) == [0, 0, 2, 0, 2, 1, 4, 1,
+                                                    4, 0, 5, 0]
+
+
+def test_blank_signals(new_geometry):
+    """Test if BLANK signals are skipped, then continue the last level."""
+    geometry = new_geometry
+    monitors = geometry.monitors
+    [SW1_ID] = monitors.names.lookup(["Sw1"])
+    monitors.remove_monitor(SW1_ID, None)
+    monitors.make_monitor(SW1_ID, None, cycles_completed=2)
+
+    run_switch(geometry, [1])
+    monitors.monitors_dictionary[(SW1_ID, None)].append(
+        monitors.devices.BLANK)
+    geometry.update()
+    assert list(geometry.get_vertices((SW1_ID, None))) == [2, 1, 4, 1]
+
+
+def test_reset_and_remove(new_geometry):
+    """Test if the vertices are rebuilt after a reset and removed."""
+    geometry = new_geometry
+    monitors = geometry.monitors
+    [SW1_ID] = monitors.names.lookup(["Sw1"])
+    monitor = (SW1_ID, None)
+
+    run_switch(geometry, [1, 1])
+    geometry.update()
+    monitors.reset_monitors()
+    run_switch(geometry, [0, 0])
+    assert geometry.update() == {monitor: 0}
+    assert list(geometry.get_vertices(monitor)) == [0, 0, 2, 0]
+
+    monitors.remove_monitor(SW1_ID, None)
+    assert geometry.update() == {}
+    assert geometry.get_vertices(monitor) is None
+
+
+def test_get_vertex_range(new_geometry):
+    """Test if only the runs in a range of cycles are drawn."""
+    geometry = new_geometry
+    [SW1_ID] = geometry.monitors.names.lookup(["Sw1"])
+    monitor = (SW1_ID, None)
+
+    # Runs of 10 cycles, from (0, 10) to (90, 100)
+    run_switch(geometry, [0] * 10 + [1] * 10 + [0] * 10 + [1] * 10 +
+               [0] * 10 + [1] * 10 + [0] * 10 + [1] * 10 + [0] * 10 +
+               [1] * 10)
+    geometry.update()
+    vertices = geometry.get_vertices(monitor)
+    assert geometry.find_vertex(vertices, 25) == 5
+    assert geometry.get_vertex_range(monitor, 25, 47) == (4, 6)
+    assert geometry.get_vertex_range(monitor, 0, 1000) == (0, 20)
+
+
+def test_summaries(new_geometry):
+    """Test if the summaries combine the levels of each block of cycles."""
+    geometry = new_geometry
+    [SW1_ID] = geometry.monitors.names.lookup(["Sw1"])
+    monitor = (SW1_ID, None)
+    size = geometry.summary_cycles
+
+    run_switch(geometry, [0] * (2 * size) + [1] * (size + 1))
+    geometry.update()
+    summaries = geometry.summaries[monitor]
+    assert summaries == [bytearray([0, 0, 1, 1]), bytearray([0, 1]),
+                         bytearray([2])]
+
+    # The last block is combined with the next cycles
+    run_switch(geometry, [0] * (size - 1) + [1] * size)
+    geometry.update()
+    assert summaries == [bytearray([0, 0, 1, 2, 1]), bytearray([0, 2, 1]),
+                         bytearray([2, 1]), bytearray([2])]
+
+    assert list(geometry.get_summary_vertices(
+        monitor, size, 0, 5 * size)) == [0, 0, 2 * size, 0,
+                                         2 * size, 1, 3 * size, 1,
+                                         3 * size, 0, 3 * size, 1,
+                                         4 * size, 1, 5 * size, 1]
+    # Larger blocks, with the last one cut to the end of the trace
+    assert list(geometry.get_summary_vertices(
+        monitor, 2 * size, size, 5 * size)) == [0, 0, 2 * size, 0,
+                                                2 * size, 0, 2 * size, 1,
+                                                4 * size, 1, 5 * size, 1]
+
+
+def test_large_cycle_numbers(new_geometry):
+    """Test if cycle numbers past the precision of a float stay exact."""
+    geometry = new_geometry
+    monitors = geometry.monitors
+    [SW1_ID] = monitors.names.lookup(["Sw1"])
+    monitor = (SW1_ID, None)
+    start = 2 ** 24 + 1
+    monitors.remove_monitor(SW1_ID, None)
+    monitors.make_monitor(SW1_ID, None, cycles_completed=start)
+
+    run_switch(geometry, [0, 0, 1])
+    geometry.update()
+    vertices = geometry.get_vertices(monitor)
+    assert list(vertices) == [start, 0, start + 2, 0, start + 2, 1,
+                              start + 3, 1]
+    assert geometry.find_vertex(vertices, start + 1) == 1
+    assert geometry.get_vertex_range(monitor, start + 2, start + 2) == (2, 2)
+    # The last summary block is cut to the end of the trace
+    run_switch(geometry, [1] * 17)
+    geometry.update()
+    assert list(geometry.get_summary_vertices(
+        monitor, 1, start, start + 20))[-2:] == [start + 20, 1]
@@ -0,0 +1,80 @@
+"""Test the vcd module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from vcd import VcdWriter
+
+
+@pytest.fixture
+def switch_monitors():
+    """Return a Monitors instance monitoring a switch and a NOT gate."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [SW1_ID, G1_ID, I1] = names.lookup(["Sw1", "G1", "I1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(G1_ID, devices.NAND, 1)
+    network.make_connection(SW1_ID, None, G1_ID, I1)
+    monitors.make_monitor(SW1_ID, None)
+    monitors.make_monitor(G1_ID, None)
+    return monitors
+
+
+def test_get_identifier(tmp_path, switch_monitors):
+    """Test if identifier codes are unique printable strings."""
+    vcd_writer = VcdWriter(str(tmp_path / "trace.vcd"),
+                           switch_monitors.devices)
+    assert vcd_writer.get_identifier(0) == "!"
+    assert vcd_writer.get_identifier(93) == "~"
+    assert vcd_writer.get_identifier(94) == '!"'
+    identifiers = [vcd_writer.get_identifier(number)
+                   for number in range(10000)]
+    assert len(set(identifiers)) == 10000
+    vcd_writer.close()
+
+
+def test_write_changes(tmp_path, switch_monitors):
+    """Test if only the cycles where signals change are written."""
+    monitors = switch_monitors
+    devices = monitors.devices
+    network = monitors.network
+    [SW1_ID] = monitors.names.lookup(["Sw1"])
+    path = tmp_path / "trace.vcd"
+
+    monitors.start_vcd(VcdWriter(str(path), devices, flush_cycles=2))
+    for cycle in range(6):
+        if cycle == 3:
+            devices.set_switch(SW1_ID, devices.HIGH)
+        assert network.execute_network()
+        monitors.record_signals()
+
+    # Signals are written to the file every two cycles, not kept in memory
+    assert path.read_text().endswith("#3\n1!\n0\"\n")
+    assert all(len(trace) == 0
+               for trace in monitors.monitors_dictionary.values())
+    monitors.stop_vcd()
+    assert monitors.vcd_writer is None
+
+    assert path.read_text().split("\n") == [
+        "$version Logic Simulator $end",
+        "$timescale 1 ns $end",
+        "$scope module logsim $end",
+        "$var wire 1 ! Sw1 $end",
+        "$var wire 1 \" G1 $end",
+        "$upscope $end",
+        "$enddefinitions $end",
+        "#0",
+        "$dumpvars",
+        "0!",
+        "1\"",
+        "$end",
+        "#3",
+        "1!",
+        "0\"",
+        "#6",
+        ""]
@@ -0,0 +1,130 @@
+"""Test the worker module."""
+import itertools
+import random
+import types
+
+import pytest
+
+from names import Names
+from network import Network
+from devices import Devices
+from monitors import Monitors
+from worker import SimulationWorker
+
+
+def make_monitors(oscillating=False):
+    """Return a Monitors class instance for a clock or an oscillating loop.
+
+    The clock is monitored and starts at the same point in its cycle each
+    time. The loop is a one-input NAND gate driving itself.
+    """
+    random.seed(0)
+    new_names = Names()
+    new_devices = Devices(new_names)
+    new_network = Network(new_names, new_devices)
+    new_monitors = Monitors(new_names, new_devices, new_network)
+
+    [CLK_ID, NAND_ID, I1] = new_names.lookup(["Clk1", "Nand1", "I1"])
+    new_devices.make_device(CLK_ID, new_devices.CLOCK, 1)
+    new_monitors.make_monitor(CLK_ID, None)
+    if oscillating:
+        new_devices.make_device(NAND_ID, new_devices.NAND, 1)
+        new_network.make_connection(NAND_ID, None, NAND_ID, I1)
+    return new_monitors
+
+
+def run_worker(worker):
+    """Wait for the worker and record its messages.
+
+    Return (oscillation messages, the FINISHED message).
+    """
+    worker.join(5)
+    assert not worker.is_running()
+    oscillations = []
+    finished = None
+    for message in worker.get_messages():
+        assert finished is None
+        if message[0] == worker.SIGNALS:
+            [message_type, cycles, signal_arrays] = message
+            worker.monitors.record_cycles(cycles, signal_arrays)
+        elif message[0] == worker.OSCILLATING:
+            oscillations.append(message)
+        else:
+            finished = message
+    return oscillations, finished
+
+
+@pytest.mark.parametrize("publish_interval", [0, 1])
+def test_run(publish_interval):
+    """Test if the worker records the same signals as the main thread."""
+    monitors = make_monitors()
+    [CLK_ID] = monitors.names.lookup(["Clk1"])
+    expected = make_monitors()
+    for _ in range(100):
+        expected.network.execute_network()
+        expected.record_signals()
+
+    worker = SimulationWorker(monitors.network, monitors, publish_interval)
+    assert worker.start(100)
+    assert run_worker(worker) == ([], (worker.FINISHED, 100, False))
+    assert monitors.monitors_dictionary == expected.monitors_dictionary
+
+    # Continuing adds to the traces
+    assert worker.start(5)
+    run_worker(worker)
+    assert len(monitors.monitors_dictionary[(CLK_ID, None)]) == 105
+
+
+def test_cancel():
+    """Test if a worker running until cancelled stops."""
+    monitors = make_monitors()
+    [CLK_ID] = monitors.names.lookup(["Clk1"])
+    worker = SimulationWorker(monitors.network, monitors)
+    assert worker.start(None, cycle_interval=0.001)
+    assert not worker.start(10)
+    worker.cancel()
+    [oscillations, finished] = run_worker(worker)
+    assert finished[0] == worker.FINISHED and finished[2]
+    assert len(monitors.monitors_dictionary[(CLK_ID, None)]) == finished[1]
+
+
+def test_oscillating():
+    """Test if the worker stops and reports an oscillating network."""
+    monitors = make_monitors(oscillating=True)
+    worker = SimulationWorker(monitors.network, monitors)
+    assert worker.start(10)
+    assert run_worker(worker) == ([(worker.OSCILLATING, "Nand1")],
+                                  (worker.FINISHED, 0, False))
+
+
+def test_frame_budget(monkeypatch):
+    """Test if a frame budget publishes one chunk of cycles per frame.
+
+    The worker's clock advances by one second each time it is read, and its
+    waits are recorded instead of slept, so the chunks do not depend on the
+    speed of the machine.
+    """
+    clock = itertools.count()
+    monkeypatch.setattr("worker.time", types.SimpleNamespace(
+        perf_counter=lambda: next(clock)))
+    monitors = make_monitors()
+    [CLK_ID] = monitors.names.lookup(["Clk1"])
+    worker = SimulationWorker(monitors.network, monitors, publish_interval=6)
+    waits = []
+    monkeypatch.setattr(worker.cancel_event, "wait", waits.append)
+
+    assert worker.start(100, cycle_interval=1, frame_budget=4)
+    worker.join(5)
+    assert not worker.is_running()
+    message_list = worker.get_messages()
+    assert message_list[-1] == (worker.FINISHED, 100, False)
+
+    # Each frame runs cycles until four seconds of the clock have passed,
+    # then waits for the rest of the six second frame. The cycle interval
+    # is ignored.
+    chunks = message_list[:-1]
+    assert [message[:2] for message in chunks] == [(worker.SIGNALS, 4)] * 25
+    assert waits == [2] * 25
+    for message in chunks:
+        assert list(message[2]) == [(CLK_ID, None)]
+        assert len(message[2][(CLK_ID, None)]) == 4
@@ -0,0 +1,194 @@
+"""Draw canvas text from a texture atlas of glyphs.
+
+Used in the Logic Simulator project by the canvas of the graphical user
+interface. The glyphs of each font size are rasterised once with wx into an
+OpenGL texture, and the labels drawn in a repaint are collected and drawn
+as textured quads with one call for each font size.
+
+Classes
+-------
+TextAtlas - rasterises glyphs into textures and draws batches of labels.
+"""
+import ctypes
+from array import array
+
+import wx
+from OpenGL import GL
+
+
+class TextAtlas:
+
+    """Rasterise glyphs into textures and draw batches of labels.
+
+    The printable ASCII characters of each font size are drawn in white on
+    black into a wx bitmap, whose brightness becomes the alpha channel of an
+    OpenGL texture. The quads of each label are built once and cached by
+    text and font size, so a repaint only offsets the cached quads to the
+    label's position. Text is drawn in black, with x_pos at the left of the
+    text and y_pos on its baseline, as with glRasterPos.
+
+    Public methods
+    --------------
+    make_atlas(self, font_size): Rasterises the glyphs of a font size into a
+                                 texture.
+
+    get_label(self, text, font_size): Returns the cached quads of a label.
+
+    add_label(self, text, x_pos, y_pos, font_size): Adds a label to the next
+                                                    batch.
+
+    draw_labels(self): Draws the batched labels and empties the batch.
+    """
+
+    characters = [chr(code) for code in range(32, 127)]
+
+    atlas_width = 512  # width of each texture in pixels
+
+    label_cache_size = 4096  # number of labels cached before clearing
+
+    line_height = 20  # pixels between lines of a label
+
+    def __init__(self):
+        """Initialise the textures, label cache and batches."""
+        # atlases stores {font_size: (texture ID, {character: glyph})}, where
+        # each glyph is (width, height, ascent, u0, v0, u1, v1)
+        self.atlases = {}
+        # label_cache stores {(text, font_size): array('f') of quads}, with
+        # x, y, u, v for each vertex relative to the label's position
+        self.label_cache = {}
+        # batches stores {font_size: array('f') of quads to draw}
+        self.batches = {}
+        self.vertex_buffer = None
+
+    def make_atlas(self, font_size):
+        """Rasterise the glyphs of a font size, in pixels, into a texture.
+
+        The glyphs are packed in rows, with a pixel between glyphs to stop
+        them bleeding into each other. Needs a current OpenGL context.
+        """
+        font = wx.Font(wx.Size(0, font_size), wx.FONTFAMILY_SWISS,
+                       wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)
+        dc = wx.MemoryDC(wx.Bitmap(1, 1))
+        dc.SetFont(font)
+
+        positions = {}  # {character: (x, y, width, height, descent)}
+        x = y = row_height = 0
+        for character in self.characters:
+            [width, height, descent,
+             leading] = dc.GetFullTextExtent(character)
+            if x + width > self.atlas_width:
+                x = 0
+                y += row_height + 1
+                row_height = 0
+            positions[character] = (x, y, width, height, descent)
+            x += width + 1
+            row_height = max(row_height, height)
+        atlas_height = y + row_height
+
+        bitmap = wx.Bitmap(self.atlas_width, atlas_height)
+        dc.SelectObject(bitmap)
+        dc.SetBackground(wx.BLACK_BRUSH)
+        dc.Clear()
+        dc.SetTextForeground(wx.WHITE)
+        for character, (x, y, width, height, descent) in positions.items():
+            dc.DrawText(character, x, y)
+        dc.SelectObject(wx.NullBitmap)
+        # Every channel of the white text is the same, so red is the alpha
+        alpha = bytes(bitmap.ConvertToImage().GetData()[0::3])
+
+        texture_id = GL.glGenTextures(1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, texture_id)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER,
+                           GL.GL_NEAREST)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER,
+                           GL.GL_NEAREST)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_ALPHA, self.atlas_width,
+                        atlas_height, 0, GL.GL_ALPHA, GL.GL_UNSIGNED_BYTE,
+                        alpha)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+        glyphs = {}
+        for character, (x, y, width, height, descent) in positions.items():
+            glyphs[character] = (
+                width, height, height - descent, x / self.atlas_width,
+                y / atlas_height, (x + width) / self.atlas_width,
+                (y + height) / atlas_height)
+        self.atlases[font_size] = (texture_id, glyphs)
+
+    def get_label(self, text, font_size):
+        """Return the quads of a label, building and caching them if needed.
+
+        Characters without a glyph are skipped, and each new line starts
+        line_height pixels above the last, as with the GLUT bitmap text the
+        canvas drew before.
+        """
+        key = (text, font_size)
+        if key in self.label_cache:
+            return self.label_cache[key]
+        if font_size not in self.atlases:
+            self.make_atlas(font_size)
+        if len(self.label_cache) >= self.label_cache_size:
+            self.label_cache.clear()
+
+        texture_id, glyphs = self.atlases[font_size]
+        quads = array('f')
+        x = y = 0
+        for character in text:
+            if character == '\n':
+                x = 0
+                y -= self.line_height
+                continue
+            if character not in glyphs:
+                continue
+            (width, height, ascent, u0, v0, u1, v1) = glyphs[character]
+            top = y - ascent
+            quads.extend([x, top, u0, v0,
+                          x + width, top, u1, v0,
+                          x + width, top + height, u1, v1,
+                          x, top + height, u0, v1])
+            x += width
+        self.label_cache[key] = quads
+        return quads
+
+    def add_label(self, text, x_pos, y_pos, font_size):
+        """Add a label at (x_pos, y_pos) to the next batch of font_size."""
+        quads = self.get_label(text, font_size)
+        batch = self.batches.setdefault(font_size, array('f'))
+        for vertex in range(0, len(quads), 4):
+            batch.extend([quads[vertex] + x_pos, quads[vertex + 1] + y_pos,
+                          quads[vertex + 2], quads[vertex + 3]])
+
+    def draw_labels(self):
+        """Draw the batched labels with one call for each font size.
+
+        The batches are emptied afterwards. Needs a current OpenGL context.
+        """
+        if self.vertex_buffer is None:
+            self.vertex_buffer = GL.glGenBuffers(1)
+        stride = 4 * array('f').itemsize
+        GL.glColor3f(0.0, 0.0, 0.0)  # text is black
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glEnable(GL.GL_BLEND)
+        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vertex_buffer)
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glEnableClientState(GL.GL_TEXTURE_COORD_ARRAY)
+        for font_size, batch in self.batches.items():
+            if not batch:
+                continue
+            texture_id, glyphs = self.atlases[font_size]
+            GL.glBindTexture(GL.GL_TEXTURE_2D, texture_id)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, len(batch) * batch.itemsize,
+                            batch.tobytes(), GL.GL_STREAM_DRAW)
+            GL.glVertexPointer(2, GL.GL_FLOAT, stride, ctypes.c_void_p(0))
+            GL.glTexCoordPointer(2, GL.GL_FLOAT, stride,
+                                 ctypes.c_void_p(2 * batch.itemsize))
+            GL.glDrawArrays(GL.GL_QUADS, 0, len(batch) // 4)
+        GL.glDisableClientState(GL.GL_TEXTURE_COORD_ARRAY)
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glDisable(GL.GL_BLEND)
+        GL.glDisable(GL.GL_TEXTURE_2D)
+        self.batches = {}
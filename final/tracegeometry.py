@@ -0,0 +1,244 @@
+"""Build the vertices of the monitored signal traces for drawing.
+
+Used in the Logic Simulator project by the canvas of the graphical user
+interface, which keeps the vertices in OpenGL vertex buffers. The vertices
+are built from the traces of the monitors and extended as cycles are
+recorded, so the traces are not rebuilt on every repaint. For traces zoomed
+out so far that many cycles fall into one pixel, a summary of each block of
+cycles is kept as well, so drawing the visible part of a trace costs about
+the same however long the trace is.
+
+Classes
+-------
+TraceGeometry - builds and extends the vertices of each trace.
+"""
+from array import array
+
+
+class TraceGeometry:
+
+    """Build and extend the vertices of each monitored signal trace.
+
+    Each trace is one line strip of (x, y) vertices, where x is the cycle
+    number and y is 1 for a HIGH level and 0 for a LOW level, so the canvas
+    places and scales a trace with its transform alone. Each run of cycles
+    at the same level is a horizontal line, and the strip joins the runs
+    with vertical lines. BLANK signals before the first signal are not
+    drawn, and later BLANK signals continue the previous level. The vertices
+    are doubles, as a float holds cycle numbers exactly only up to 2**24.
+
+    Each trace also has a mip-map of summaries: the first summary gives the
+    levels in each block of summary_cycles cycles, and each further summary
+    combines pairs of blocks of the one before, doubling the block size. A
+    block is LOW_BLOCK or HIGH_BLOCK if every cycle in it is at that level,
+    MIXED_BLOCK if it has both levels, and EMPTY_BLOCK if it has neither.
+
+    Parameters
+    ----------
+    monitors: instance of the monitors.Monitors() class.
+
+    Public methods
+    --------------
+    update(self): Adds the cycles recorded since the last update, and returns
+                  where the vertices of each trace have changed.
+
+    get_vertices(self, monitor): Returns the vertices of a trace.
+
+    find_vertex(self, vertices, cycle): Returns the number of vertices at or
+                                        before a cycle.
+
+    get_vertex_range(self, monitor, first_cycle, last_cycle): Returns the
+                     vertices to draw for a range of cycles.
+
+    get_summary_vertices(self, monitor, cycles_per_pixel, first_cycle,
+                         last_cycle): Returns the vertices of the summary
+                                      blocks for a range of cycles.
+    """
+
+    # Number of cycles in each block of the first summary of a trace
+    summary_cycles = 16
+
+    block_types = [LOW_BLOCK, HIGH_BLOCK, MIXED_BLOCK, EMPTY_BLOCK] = range(4)
+
+    # The block type of two combined blocks, at [first * 4 + second]
+    combined_blocks = bytes([LOW_BLOCK, MIXED_BLOCK, MIXED_BLOCK, LOW_BLOCK,
+                             MIXED_BLOCK, HIGH_BLOCK, MIXED_BLOCK, HIGH_BLOCK,
+                             MIXED_BLOCK, MIXED_BLOCK, MIXED_BLOCK,
+                             MIXED_BLOCK, LOW_BLOCK, HIGH_BLOCK, MIXED_BLOCK,
+                             EMPTY_BLOCK])
+
+    def __init__(self, monitors):
+        """Initialise the vertices of the traces."""
+        self.monitors = monitors
+        devices = monitors.devices
+
+        # Level drawn for each signal, or None if the signal is not drawn
+        self.signal_levels = {
+            devices.LOW: 0, devices.HIGH: 1, devices.RISING: 1,
+            devices.FALLING: 0, devices.BLANK: None}
+
+        # The following dictionaries are keyed by (device_id, output_id)
+        self.vertices = {}  # array('d') of x, y pairs for each trace
+        self.traces = {}  # the trace object the vertices were built from
+        self.cycles = {}  # number of cycles the vertices were built for
+        self.summaries = {}  # [bytearray of block types] for each trace
+
+    def update(self):
+        """Add the cycles recorded since the last update.
+
+        The vertices of a trace are rebuilt if its monitor has been made or
+        reset since then. Return {monitor: position of the first changed
+        float in its vertices} for the traces that have changed.
+        """
+        changed = {}
+        monitors_dictionary = self.monitors.monitors_dictionary
+        for monitor in list(self.vertices):
+            if monitor not in monitors_dictionary:
+                del self.vertices[monitor]
+                del self.traces[monitor]
+                del self.cycles[monitor]
+                del self.summaries[monitor]
+
+        for monitor, trace in monitors_dictionary.items():
+            if self.traces.get(monitor) is not trace:
+                self.vertices[monitor] = array('d')
+                self.traces[monitor] = trace
+                self.cycles[monitor] = 0
+                self.summaries[monitor] = [bytearray()]
+                changed[monitor] = 0
+            cycles = len(trace)
+            if cycles == self.cycles[monitor]:
+                continue
+
+            vertices = self.vertices[monitor]
+            first_changed = len(vertices)
+            run_list = self.monitors.get_signal_runs(
+                *monitor, start=self.cycles[monitor])
+            for run_start, run_stop, signal in run_list:
+                level = self.signal_levels[signal]
+                if not vertices:
+                    if level is None:
+                        continue
+                elif level is None or level == vertices[-1]:
+                    # Extend the last run to the end of this one
+                    vertices[-2] = run_stop
+                    first_changed = min(first_changed, len(vertices) - 2)
+                    continue
+                vertices.extend([run_start, level, run_stop, level])
+            self.update_summaries(monitor, run_list)
+            self.cycles[monitor] = cycles
+            if first_changed < len(vertices):
+                changed[monitor] = min(changed.get(monitor, first_changed),
+                                       first_changed)
+        return changed
+
+    def update_summaries(self, monitor, run_list):
+        """Add the runs in run_list to the summaries of a trace."""
+        summaries = self.summaries[monitor]
+        blocks = summaries[0]
+        size = self.summary_cycles
+        first_changed = len(blocks)
+        combined_blocks = self.combined_blocks
+        if run_list:
+            first_changed = min(first_changed, run_list[0][0] // size)
+        for run_start, run_stop, signal in run_list:
+            block_type = self.signal_levels[signal]
+            if block_type is None:
+                block_type = self.EMPTY_BLOCK
+            first_block = run_start // size
+            last_block = (run_stop - 1) // size
+            if last_block >= len(blocks):
+                blocks.extend(bytes([self.EMPTY_BLOCK]) *
+                              (last_block + 1 - len(blocks)))
+            # The blocks at the ends of the run are combined with the other
+            # runs in them, while blocks inside it are only of its type
+            blocks[first_block] = combined_blocks[
+                blocks[first_block] * 4 + block_type]
+            if last_block != first_block:
+                blocks[first_block + 1:last_block] = bytes(
+                    [block_type]) * (last_block - first_block - 1)
+                blocks[last_block] = combined_blocks[
+                    blocks[last_block] * 4 + block_type]
+
+        # Combine the changed pairs of blocks into each larger summary
+        level = 1
+        while len(summaries[level - 1]) > 1:
+            smaller_blocks = summaries[level - 1]
+            if level == len(summaries):
+                summaries.append(bytearray())
+            blocks = summaries[level]
+            first_changed //= 2
+            del blocks[first_changed:]
+            for block in range(2 * first_changed, len(smaller_blocks), 2):
+                if block + 1 < len(smaller_blocks):
+                    blocks.append(self.combined_blocks[
+                        smaller_blocks[block] * 4 + smaller_blocks[block + 1]])
+                else:
+                    blocks.append(smaller_blocks[block])
+            level += 1
+
+    def get_vertices(self, monitor):
+        """Return the vertices of the trace of a monitor.
+
+        Return None if the monitor has no vertices.
+        """
+        return self.vertices.get(monitor)
+
+    def find_vertex(self, vertices, cycle):
+        """Return the number of vertices with an x position up to cycle."""
+        low = 0
+        high = len(vertices) // 2
+        while low < high:
+            middle = (low + high) // 2
+            if vertices[2 * middle] <= cycle:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get_vertex_range(self, monitor, first_cycle, last_cycle):
+        """Return the vertices to draw for the cycles of a trace in a range.
+
+        Return (first vertex, number of vertices), covering the runs from the
+        one holding at first_cycle to the one holding at last_cycle.
+        """
+        vertices = self.vertices[monitor]
+        first_vertex = max(self.find_vertex(vertices, first_cycle) - 1, 0)
+        stop_vertex = min(self.find_vertex(vertices, last_cycle) + 1,
+                          len(vertices) // 2)
+        return (first_vertex, max(stop_vertex - first_vertex, 0))
+
+    def get_summary_vertices(self, monitor, cycles_per_pixel, first_cycle,
+                             last_cycle):
+        """Return line strip vertices for the summary blocks in a range.
+
+        The largest blocks of at most cycles_per_pixel cycles are used, so
+        about one block is drawn per pixel. A block at one level is drawn as
+        a horizontal line, and a MIXED_BLOCK as a vertical line from LOW to
+        HIGH. Return an array('d') of x, y pairs.
+        """
+        summaries = self.summaries[monitor]
+        level = 0
+        size = self.summary_cycles
+        while level + 1 < len(summaries) and 2 * size <= cycles_per_pixel:
+            level += 1
+            size *= 2
+        blocks = summaries[level]
+        cycles = self.cycles[monitor]
+
+        vertices = array('d')
+        for block in range(max(first_cycle // size, 0),
+                           min(last_cycle // size + 1, len(blocks))):
+            block_type = blocks[block]
+            x = block * size
+            if block_type == self.MIXED_BLOCK:
+                vertices.extend([x, 0, x, 1])
+            elif block_type == self.EMPTY_BLOCK:
+                continue
+            elif len(vertices) >= 4 and vertices[-1] == block_type and \
+                    vertices[-3] == block_type:
+                vertices[-2] = min(x + size, cycles)
+            else:
+                vertices.extend([x, block_type,
+                                 min(x + size, cycles), block_type])
+        return vertices
@@ -253,8 +253,14 @@ class UserInterface:
                 self.monitors.record_signals()
             else:
                 print("Error! Network oscillating.")
+                if self.network.oscillating_devices:
+                    print("Oscillating devices: " +
+                          self.network.get_oscillating_names())
                 return False
-        self.monitors.display_signals()
+        if self.monitors.vcd_writer is None:
+            self.monitors.display_signals()
+        else:  # the signals are being written to a VCD file instead
+            self.monitors.vcd_writer.flush()
         return True
 
     def run_command(self):
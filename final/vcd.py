@@ -0,0 +1,129 @@
+"""Write monitored signals to a Value Change Dump file.
+
+Used in the Logic Simulator project to stream the signals of the monitors to
+a file as the simulation runs, so that long simulations can be viewed in a
+waveform viewer without keeping their traces in memory.
+
+Classes
+-------
+VcdWriter - writes signal changes to a VCD file.
+"""
+
+
+class VcdWriter:
+
+    """Write signal changes to a VCD file.
+
+    The file declares one wire for each monitored signal, named with
+    Devices.get_signal_name. Each simulation cycle is one unit of VCD time,
+    and a cycle is only written if a signal changes in it. Changes are
+    buffered and written to the file every flush_cycles cycles.
+
+    Parameters
+    ----------
+    path: path of the VCD file to write.
+    devices: instance of the devices.Devices() class.
+    flush_cycles: number of cycles to buffer between writes to the file.
+
+    Public methods
+    --------------
+    get_identifier(self, number): Returns the VCD identifier code of the
+                                  numbered signal.
+
+    write_header(self, monitor_list): Declares the monitored signals.
+
+    write_cycle(self, signal_list): Records the signals of one cycle, writing
+                                    the ones that have changed.
+
+    flush(self): Writes the buffered changes to the file.
+
+    close(self): Writes the end time and closes the file.
+    """
+
+    def __init__(self, path, devices, flush_cycles=1000):
+        """Open the file and initialise the buffer."""
+        self.devices = devices
+        self.flush_cycles = flush_cycles
+        self.vcd_file = open(path, 'w')
+
+        self.monitor_list = []  # [(device_id, output_id)] in the file
+        self.identifiers = []  # VCD identifier code of each monitor
+        self.values = []  # last value written for each monitor
+        self.cycle = 0  # number of cycles recorded
+        self.buffer = []  # lines not yet written to the file
+
+        # RISING and FALLING signals are written as the level they move to,
+        # and BLANK signals as unknown
+        self.value_characters = {
+            devices.LOW: "0", devices.HIGH: "1", devices.RISING: "1",
+            devices.FALLING: "0", devices.BLANK: "x"}
+
+    def get_identifier(self, number):
+        """Return the VCD identifier code of the numbered signal.
+
+        Identifier codes are written in base 94 with the printable ASCII
+        characters from '!' to '~'.
+        """
+        identifier = ""
+        while True:
+            identifier += chr(33 + number % 94)
+            number //= 94
+            if number == 0:
+                return identifier
+
+    def write_header(self, monitor_list):
+        """Declare the signals of monitor_list, a list of monitor keys.
+
+        Signals monitored after the header is written are not in the file.
+        """
+        self.monitor_list = list(monitor_list)
+        self.identifiers = [self.get_identifier(number)
+                            for number in range(len(self.monitor_list))]
+        self.values = [None] * len(self.monitor_list)
+
+        lines = ["$version Logic Simulator $end",
+                 "$timescale 1 ns $end",
+                 "$scope module logsim $end"]
+        for (device_id, output_id), identifier in zip(self.monitor_list,
+                                                      self.identifiers):
+            lines.append("$var wire 1 {} {} $end".format(
+                identifier, self.devices.get_signal_name(device_id,
+                                                         output_id)))
+        lines.extend(["$upscope $end", "$enddefinitions $end"])
+        self.vcd_file.write("\n".join(lines) + "\n")
+
+    def write_cycle(self, signal_list):
+        """Record the signals of one cycle, in the order of monitor_list.
+
+        Only the signals that have changed since the last cycle are written.
+        """
+        changes = []
+        for number, signal in enumerate(signal_list):
+            value = self.value_characters[signal]
+            if value != self.values[number]:
+                self.values[number] = value
+                changes.append(value + self.identifiers[number])
+
+        if self.cycle == 0:  # the first cycle gives every initial value
+            self.buffer.append("#0\n$dumpvars\n")
+            self.buffer.extend(change + "\n" for change in changes)
+            self.buffer.append("$end\n")
+        elif changes:
+            self.buffer.append("#{}\n".format(self.cycle))
+            self.buffer.extend(change + "\n" for change in changes)
+
+        self.cycle += 1
+        if self.cycle % self.flush_cycles == 0:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered changes to the file."""
+        self.vcd_file.write("".join(self.buffer))
+        self.buffer = []
+        self.vcd_file.flush()
+
+    def close(self):
+        """Write the time at the end of the last cycle and close the file."""
+        self.buffer.append("#{}\n".format(self.cycle))
+        self.flush()
+        self.vcd_file.close()
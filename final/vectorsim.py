@@ -0,0 +1,315 @@
+"""Execute the network with NumPy arrays instead of Device objects.
+
+Used in the Logic Simulator project as the VECTORIZED engine of the
+network.Network() class. The gates are compiled into arrays of gate kinds,
+input signal indices and output signal indices, so that all the gates at one
+level of the network are evaluated with a few NumPy operations.
+
+Classes
+-------
+VectorEngine - compiles the gates into arrays and executes the network.
+"""
+import numpy as np
+
+
+class VectorEngine:
+
+    """Compile the gates into arrays and execute the network.
+
+    Every output in the network is given an index into the signal level
+    arrays. Two extra indices hold constant LOW and HIGH levels, which pad the
+    inputs of gates with fewer than max_gate_inputs inputs. The network's
+    compiled schedule is split into steps: each batch of gates outside
+    feedback loops at the same level is evaluated at once, while D-types and
+    feedback loops are evaluated device by device on the level arrays. Gate
+    and D-type outputs are written back to their Device objects at the end of
+    each cycle.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class.
+    network: instance of the network.Network() class.
+
+    Public methods
+    --------------
+    compile_network(self): Builds the gate arrays and steps from the schedule.
+
+    execute_network(self): Executes all the devices in the network for one
+                           simulation cycle.
+
+    settle_loop(self, device_list, loop_indices): Evaluates a feedback loop
+                until its levels settle or repeat.
+
+    evaluate_gates(self, gate_batch): Evaluates a batch of gates at once.
+
+    evaluate_device(self, device): Evaluates one gate or D-type on the level
+                                   arrays and returns True if it changed.
+    """
+
+    def __init__(self, names, devices, network):
+        """Initialise the compiled arrays."""
+        self.names = names
+        self.devices = devices
+        self.network = network
+
+        self.schedule = None  # the network schedule the arrays were built for
+        self.connected = False  # True if every input is connected
+        self.net_index = {}  # {(device_id, output_id): index in level arrays}
+        self.input_indices = {}  # {device_id: [index of each input signal]}
+        self.levels = None  # signal levels, 1 for HIGH and 0 for LOW
+        self.start_levels = None  # signal levels at the start of the cycle
+
+        # steps stores [(gate_batch, None, None)] for batches of gates, and
+        # [(None, device_list, loop_indices)] for devices evaluated one at a
+        # time, where loop_indices is an array of the output indices of a
+        # feedback loop, or None if the devices are not a feedback loop
+        self.steps = []
+
+    def compile_network(self):
+        """Build the gate arrays and evaluation steps from the schedule.
+
+        Return True if every input in the network is connected.
+        """
+        devices = self.devices
+        network = self.network
+        if network.schedule is None:
+            network.compile_network()
+        self.schedule = network.schedule
+        self.connected = network.check_network()
+        if not self.connected:
+            return False
+
+        self.net_index = {}
+        for device in devices.devices_list:
+            for output_id in device.outputs:
+                self.net_index[(device.device_id, output_id)] = len(
+                    self.net_index)
+        low_index = len(self.net_index)
+        high_index = low_index + 1
+
+        self.input_indices = {}
+        for device in devices.devices_list:
+            self.input_indices[device.device_id] = [
+                self.net_index[connected_output]
+                for connected_output in device.inputs.values()]
+
+        self.levels = np.zeros(high_index + 1, dtype=np.uint8)
+        self.levels[high_index] = 1
+        for (device_id, output_id), index in self.net_index.items():
+            signal = devices.get_device(device_id).outputs[output_id]
+            self.levels[index] = network.get_signal_level(signal)
+
+        # Group gates outside feedback loops by level. Switches are set
+        # through their Device objects before the steps run.
+        self.steps = []
+        batch = []
+        batch_level = None
+        for (device_id_list, is_feedback_loop), level in zip(
+                network.schedule, network.schedule_levels):
+            device = devices.get_device(device_id_list[0])
+            if device.device_kind == devices.SWITCH:
+                continue
+            if not is_feedback_loop and \
+                    device.device_kind in devices.gate_types:
+                if level != batch_level and batch:
+                    self.steps.append(
+                        (self.make_gate_batch(batch), None, None))
+                    batch = []
+                batch.append(device)
+                batch_level = level
+                continue
+            if batch:
+                self.steps.append((self.make_gate_batch(batch), None, None))
+                batch = []
+            device_list = [devices.get_device(device_id)
+                           for device_id in device_id_list]
+            loop_indices = None
+            if is_feedback_loop:
+                loop_indices = np.array([
+                    self.net_index[(device.device_id, output_id)]
+                    for device in device_list
+                    for output_id in device.outputs], dtype=np.intp)
+            self.steps.append((None, device_list, loop_indices))
+        if batch:
+            self.steps.append((self.make_gate_batch(batch), None, None))
+
+        # gate_and_d_type_outputs stores {index: (device, output_id)} for the
+        # outputs written back only when their level changes
+        self.gate_and_d_type_outputs = {}
+        for device in devices.devices_list:
+            if device.device_kind in devices.gate_types or \
+                    device.device_kind == devices.D_TYPE:
+                for output_id in device.outputs:
+                    self.gate_and_d_type_outputs[self.net_index[
+                        (device.device_id, output_id)]] = (device, output_id)
+        self.other_devices = [
+            device for device in devices.devices_list
+            if device.device_kind not in devices.gate_types and
+            device.device_kind != devices.D_TYPE]
+        return True
+
+    def make_gate_batch(self, gate_list):
+        """Return the arrays for evaluating a list of gates at once.
+
+        The arrays are the input signal indices, padded to max_gate_inputs,
+        the output signal indices and one mask for each kind of gate.
+        """
+        devices = self.devices
+        low_index = len(self.net_index)
+        high_index = low_index + 1
+
+        # Inputs of AND and NAND gates are padded with HIGH, other gates are
+        # padded with LOW, so the padding never changes the result
+        inputs = np.full((len(gate_list), devices.max_gate_inputs), low_index,
+                         dtype=np.intp)
+        for number, device in enumerate(gate_list):
+            if device.device_kind in [devices.AND, devices.NAND]:
+                inputs[number, :] = high_index
+            input_indices = self.input_indices[device.device_id]
+            inputs[number, :len(input_indices)] = input_indices
+
+        outputs = np.array([self.net_index[(device.device_id, None)]
+                            for device in gate_list], dtype=np.intp)
+        kinds = np.array([device.device_kind for device in gate_list])
+        return (inputs, outputs, kinds == devices.AND, kinds == devices.OR,
+                kinds == devices.NAND, kinds == devices.NOR)
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        Return True if successful and the network does not oscillate.
+        """
+        devices = self.devices
+        network = self.network
+        if self.schedule is None or self.schedule is not network.schedule:
+            self.compile_network()
+        if not self.connected:
+            return False
+
+        network.update_clocks()
+        network.update_rc()
+        network.update_siggen()
+        for switch_id in devices.devices_by_kind.get(devices.SWITCH, []):
+            network.evaluate_device(switch_id)
+
+        levels = self.levels
+        self.start_levels = levels.copy()
+        for device in self.other_devices:
+            for output_id, signal in device.outputs.items():
+                index = self.net_index[(device.device_id, output_id)]
+                # RISING and FALLING are moving away from their start level
+                self.start_levels[index] = signal in [devices.HIGH,
+                                                      devices.FALLING]
+                levels[index] = network.get_signal_level(signal)
+
+        network.oscillating_devices = []
+        for gate_batch, device_list, loop_indices in self.steps:
+            if gate_batch is not None:
+                self.evaluate_gates(gate_batch)
+                continue
+            if loop_indices is None:
+                self.evaluate_device(device_list[0])
+                continue
+            if not self.settle_loop(device_list, loop_indices):
+                network.oscillating_devices = [device.device_id
+                                               for device in device_list]
+                return False
+
+        # Write the settled levels back to the Device objects
+        changed = np.nonzero(levels != self.start_levels)[0]
+        for index in changed.tolist():
+            if index in self.gate_and_d_type_outputs:
+                (device, output_id) = self.gate_and_d_type_outputs[index]
+                device.outputs[output_id] = int(levels[index])
+        for device in self.other_devices:
+            for output_id in device.outputs:
+                device.outputs[output_id] = int(
+                    levels[self.net_index[(device.device_id, output_id)]])
+
+        network.steady_state = True
+        return True
+
+    def settle_loop(self, device_list, loop_indices):
+        """Evaluate the devices of a feedback loop until their levels settle.
+
+        The loop's output levels are stored after each iteration, so the loop
+        is known to oscillate as soon as they repeat. Return True if the
+        levels settle within the network's iteration limit.
+        """
+        previous_states = set()
+        for iteration in range(self.network.get_iteration_limit()):
+            steady_state = True
+            for device in device_list:
+                if self.evaluate_device(device):
+                    steady_state = False
+            if steady_state:
+                return True
+            state = self.levels[loop_indices].tobytes()
+            if state in previous_states:
+                return False
+            previous_states.add(state)
+        return False
+
+    def evaluate_gates(self, gate_batch):
+        """Evaluate a batch of gates at once on the level arrays."""
+        (inputs, outputs, is_and, is_or, is_nand, is_nor) = gate_batch
+        input_levels = self.levels[inputs]
+        all_high = input_levels.all(axis=1)
+        any_high = input_levels.any(axis=1)
+        self.levels[outputs] = np.where(
+            is_and, all_high, np.where(
+                is_nand, ~all_high, np.where(
+                    is_or, any_high, np.where(
+                        is_nor, ~any_high, input_levels.sum(axis=1) & 1))))
+
+    def evaluate_device(self, device):
+        """Evaluate one gate or D-type on the level arrays.
+
+        Return True if its outputs changed.
+        """
+        devices = self.devices
+        levels = self.levels
+        input_levels = [int(levels[index])
+                        for index in self.input_indices[device.device_id]]
+
+        if device.device_kind == devices.D_TYPE:
+            input_ids = list(device.inputs)
+            [clock_index, data_index] = [
+                self.input_indices[device.device_id][input_ids.index(
+                    input_id)]
+                for input_id in [devices.CLK_ID, devices.DATA_ID]]
+            if self.start_levels[clock_index] == 0 and \
+                    levels[clock_index] == 1:
+                # Store the data level from the start of the cycle
+                device.dtype_memory = int(self.start_levels[data_index])
+            input_levels = dict(zip(input_ids, input_levels))
+            if input_levels[devices.SET_ID]:
+                device.dtype_memory = devices.HIGH
+            if input_levels[devices.CLEAR_ID]:
+                device.dtype_memory = devices.LOW
+            outputs = {devices.Q_ID: device.dtype_memory,
+                       devices.QBAR_ID: 1 - device.dtype_memory}
+
+        elif device.device_kind in [devices.AND, devices.NAND]:
+            level = int(all(input_levels))
+            if device.device_kind == devices.NAND:
+                level = 1 - level
+            outputs = {None: level}
+
+        elif device.device_kind in [devices.OR, devices.NOR]:
+            level = int(any(input_levels))
+            if device.device_kind == devices.NOR:
+                level = 1 - level
+            outputs = {None: level}
+
+        else:  # XOR
+            outputs = {None: sum(input_levels) & 1}
+
+        changed = False
+        for output_id, level in outputs.items():
+            index = self.net_index[(device.device_id, output_id)]
+            if levels[index] != level:
+                levels[index] = level
+                changed = True
+        return changed
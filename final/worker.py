@@ -0,0 +1,197 @@
+"""Run the simulation on a background thread.
+
+Used in the Logic Simulator project by the graphical user interface, so that
+long runs and continuous mode do not block the window. The thread runs the
+network and publishes the monitored signals of each cycle through a queue,
+and the user interface records them in the monitors as it polls the queue.
+
+Classes
+-------
+SimulationWorker - runs simulation cycles on a background thread.
+"""
+import queue
+import threading
+import time
+from array import array
+
+
+class SimulationWorker:
+
+    """Run simulation cycles on a background thread.
+
+    The thread executes the network and reads the monitored signals after
+    each cycle, but never changes the monitors: the signals are published in
+    chunks, at most every publish_interval seconds, and are recorded with
+    Monitors.record_cycles() by the thread that polls get_messages(). While
+    the thread runs, other threads may set switches and make or remove
+    monitors, but must not execute the network.
+
+    The thread either waits cycle_interval seconds after each cycle, or, if
+    it has a frame_budget, runs as many cycles as fit in frame_budget seconds
+    of each frame of publish_interval seconds and waits for the rest of the
+    frame, leaving the interpreter to the user interface.
+
+    Each message is a tuple whose first item is one of message_types:
+    (SIGNALS, cycles, {monitor: array of signals}) for a chunk of cycles,
+    (OSCILLATING, oscillating device names) if the network oscillates, and
+    (FINISHED, cycles run, True if cancelled) when the thread ends.
+
+    Parameters
+    ----------
+    network: instance of the network.Network() class.
+    monitors: instance of the monitors.Monitors() class.
+    publish_interval: seconds between chunks of signals.
+
+    Public methods
+    --------------
+    start(self, cycles=None, cycle_interval=0, frame_budget=None): Starts
+                  running cycles on a new thread.
+
+    set_cycle_interval(self, cycle_interval): Sets the seconds to wait after
+                                              each cycle.
+
+    set_frame_budget(self, frame_budget): Sets the seconds of each frame to
+                                          run cycles for.
+
+    cancel(self): Asks the thread to stop after the current cycle.
+
+    is_running(self): Returns True while the thread is running.
+
+    join(self, timeout=None): Waits for the thread to end.
+
+    get_messages(self): Returns the messages published since the last call.
+
+    run(self, cycles): Runs the cycles, publishing the signals. This is the
+                       target of the thread.
+
+    publish_signals(self, cycles, chunk): Publishes a chunk of signals.
+    """
+
+    message_types = [SIGNALS, OSCILLATING, FINISHED] = range(3)
+
+    def __init__(self, network, monitors, publish_interval=1 / 60):
+        """Initialise the queue and the thread state."""
+        self.network = network
+        self.monitors = monitors
+        self.publish_interval = publish_interval
+
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.cycle_interval = 0
+        self.frame_budget = None
+        self.thread = None
+
+    def start(self, cycles=None, cycle_interval=0, frame_budget=None):
+        """Start running cycles on a new thread.
+
+        If cycles is None, the thread runs until cancelled. The thread waits
+        cycle_interval seconds after each cycle, unless frame_budget is not
+        None. Return False if a thread is already running.
+        """
+        if self.is_running():
+            return False
+        self.cancel_event.clear()
+        self.cycle_interval = cycle_interval
+        self.frame_budget = frame_budget
+        self.thread = threading.Thread(target=self.run, args=(cycles,),
+                                       daemon=True)
+        self.thread.start()
+        return True
+
+    def set_cycle_interval(self, cycle_interval):
+        """Set the seconds to wait after each cycle."""
+        self.cycle_interval = cycle_interval
+
+    def set_frame_budget(self, frame_budget):
+        """Set the seconds of each frame to run cycles for.
+
+        If frame_budget is None, the thread waits cycle_interval seconds
+        after each cycle instead.
+        """
+        self.frame_budget = frame_budget
+
+    def cancel(self):
+        """Ask the thread to stop after the current cycle."""
+        self.cancel_event.set()
+
+    def is_running(self):
+        """Return True while the thread is running."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def join(self, timeout=None):
+        """Wait for the thread to end, or for timeout seconds."""
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def get_messages(self):
+        """Return a list of the messages published since the last call."""
+        message_list = []
+        while True:
+            try:
+                message_list.append(self.messages.get_nowait())
+            except queue.Empty:
+                return message_list
+
+    def run(self, cycles):
+        """Run the cycles, or until cancelled if cycles is None.
+
+        The signals of each monitor are collected until publish_interval
+        seconds have passed, frame_budget seconds have passed or the
+        monitors change, then published. The thread stops early if the
+        network oscillates.
+        """
+        cycles_run = 0
+        chunk = {}  # {monitor: array of signals}
+        chunk_cycles = 0
+        chunk_monitors = None
+        last_publish = time.perf_counter()
+        try:
+            while cycles is None or cycles_run < cycles:
+                if self.cancel_event.is_set():
+                    break
+                if not self.network.execute_network():
+                    self.publish_signals(chunk_cycles, chunk)
+                    chunk_cycles = 0
+                    self.messages.put(
+                        (self.OSCILLATING,
+                         self.network.get_oscillating_names()))
+                    break
+
+                monitor_list = list(self.monitors.monitors_dictionary)
+                if monitor_list != chunk_monitors:
+                    self.publish_signals(chunk_cycles, chunk)
+                    chunk = {monitor: array('b') for monitor in monitor_list}
+                    chunk_cycles = 0
+                    chunk_monitors = monitor_list
+                for (device_id, output_id), signals in chunk.items():
+                    signals.append(self.network.get_output_signal(
+                        device_id, output_id))
+                chunk_cycles += 1
+                cycles_run += 1
+
+                now = time.perf_counter()
+                frame_budget = self.frame_budget
+                if frame_budget is not None and \
+                        now - last_publish >= frame_budget:
+                    self.publish_signals(chunk_cycles, chunk)
+                    chunk = {monitor: array('b') for monitor in monitor_list}
+                    chunk_cycles = 0
+                    self.cancel_event.wait(
+                        last_publish + self.publish_interval - now)
+                    last_publish = time.perf_counter()
+                elif now - last_publish >= self.publish_interval:
+                    self.publish_signals(chunk_cycles, chunk)
+                    chunk = {monitor: array('b') for monitor in monitor_list}
+                    chunk_cycles = 0
+                    last_publish = now
+                if self.cycle_interval and frame_budget is None:
+                    self.cancel_event.wait(self.cycle_interval)
+        finally:
+            self.publish_signals(chunk_cycles, chunk)
+            self.messages.put((self.FINISHED, cycles_run,
+                               self.cancel_event.is_set()))
+
+    def publish_signals(self, cycles, chunk):
+        """Publish a chunk of signals, if it holds any cycles."""
+        if cycles:
+            self.messages.put((self.SIGNALS, cycles, chunk))